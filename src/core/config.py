@@ -14,6 +14,10 @@ def _get_int(name: str, default: int) -> int:
         return default
 
 
+def _get_bool(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "y")
+
+
 def _get_color(name: str, default: str) -> str:
     # Acepta #RRGGBB. Si viene vacío o inválido, cae al default.
     v = (os.getenv(name, default) or "").strip()
@@ -90,6 +94,13 @@ class AppConfig:
     input_bg: str
     input_text_color: str
 
+    # Grid de jobs: filas por página (keyset)
+    jobs_page_size: int = 500
+    # Índice de búsqueda en memoria (filtra el grid sin ir a la DB)
+    jobs_local_index: bool = False
+    # Cada cuántos segundos se traen solo los cambios (0 = nunca)
+    jobs_sync_seconds: int = 30
+
     @staticmethod
     def from_env() -> "AppConfig":
         # 👇 Cargar env una sola vez, aquí (o en tu main al inicio; elige uno)
@@ -116,4 +127,8 @@ class AppConfig:
             button_text_color=_get_color("BUTTON_TEXT_COLOR", "#FFFFFF"),
             input_bg=_get_color("INPUT_BG", "#FFFFFF"),
             input_text_color=_get_color("INPUT_TEXT_COLOR", "#111111"),
+
+            jobs_page_size=max(50, _get_int("JOBS_PAGE_SIZE", 500)),
+            jobs_local_index=_get_bool("JOBS_LOCAL_INDEX"),
+            jobs_sync_seconds=max(0, _get_int("JOBS_SYNC_SECONDS", 30)),
         )
\ No newline at end of file
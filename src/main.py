@@ -1,9 +1,41 @@
-﻿from src.core.config import AppConfig
+﻿import tkinter as tk
+from tkinter import messagebox
+
+from src.core.config import AppConfig
+from src.storage.database import Database, DatabaseUnavailableError
+from src.storage.statements import get_statements
 from src.ui.views.login_view import LoginWindow
 
+
+def _startup_error(title: str, message: str) -> None:
+    # Todavía no hay ventana: una raíz oculta solo para el mensaje
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showerror(title, message, parent=root)
+    root.destroy()
+
+
 def main():
     config = AppConfig.from_env()
-    app = LoginWindow(config)
+    db = Database()
+
+    # USERS_TABLE / COL_* contra el esquema una sola vez, antes del login
+    try:
+        get_statements().validate_users(db)
+    except ValueError as e:
+        _startup_error("Configuración de usuarios", str(e))
+        db.close()
+        return
+    except DatabaseUnavailableError as e:
+        _startup_error("DB no disponible", str(e))
+        db.close()
+        return
+    except Exception as e:
+        _startup_error("Error", f"No se pudo conectar/consultar la DB:\n{e}")
+        db.close()
+        return
+
+    app = LoginWindow(config, db)
     app.run()
 
 if __name__ == "__main__":
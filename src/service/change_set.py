@@ -0,0 +1,211 @@
+# src/service/change_set.py
+from dataclasses import dataclass, replace
+from typing import Dict, List
+
+from src.storage.database import Database
+from src.storage.groups_repository import GroupInfo, GroupsRepository
+from src.storage.jobs_repository import OUTCOME_INVALID, OUTCOME_UPDATED, JobInfo, JobsRepository
+
+
+class ChangeSetError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Conflict:
+    entity: str         # "jobs" | "groups"
+    key: str            # Id del job / GroupCode
+    message: str
+
+
+class ChangeConflictError(ChangeSetError):
+    """Lo guardado cambió desde que se empezó a editar: no se escribió nada."""
+
+    def __init__(self, conflicts: List[Conflict]):
+        self.conflicts = conflicts
+        lines = [f"{c.entity} {c.key}: {c.message}" for c in conflicts[:20]]
+        if len(conflicts) > 20:
+            lines.append(f"... y {len(conflicts) - 20} más")
+        super().__init__("Conflictos con lo guardado:\n" + "\n".join(lines))
+
+
+@dataclass(frozen=True)
+class _PendingJob:
+    base: JobInfo       # lo que estaba guardado al empezar a editar
+    new: JobInfo
+
+
+@dataclass(frozen=True)
+class _PendingGroup:
+    base: GroupInfo
+    new: GroupInfo
+
+
+@dataclass(frozen=True)
+class SaveResult:
+    jobs: List[int]     # Id de los jobs que cambiaron
+    groups: List[str]   # GroupCode de los grupos que cambiaron
+
+
+class ChangeSet:
+    """
+    Ediciones pendientes de jobs y grupos (modo borrador del grid).
+    - stage_job / stage_group guardan el cambio en memoria junto con lo que estaba
+      guardado al empezar (base); volver al valor original lo saca de la lista.
+    - save() escribe todo en una transacción: lee lo guardado con lock, compara con
+      la base (conflicto = alguien más lo cambió o lo borró) y, si no hay conflictos,
+      aplica grupos y jobs en lote con el audit en un executemany por tabla.
+      Con conflictos no escribe nada: se descartan esos cambios y se vuelve a guardar.
+    """
+
+    def __init__(self, db: Database, jobs_repo: JobsRepository, groups_repo: GroupsRepository):
+        self.db = db
+        self.jobs_repo = jobs_repo
+        self.groups_repo = groups_repo
+        self._jobs: Dict[int, _PendingJob] = {}
+        self._groups: Dict[str, _PendingGroup] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs) + len(self._groups)
+
+    @property
+    def job_ids(self) -> List[int]:
+        return sorted(self._jobs)
+
+    @property
+    def group_codes(self) -> List[str]:
+        return sorted(self._groups)
+
+    # ---------------- staging ----------------
+
+    def stage_job(self, job_id: int, type_: str, job_name: str, group_code: str, severity: int) -> bool:
+        """Cambio pendiente de un job. Retorna True si quedó pendiente (False = igual a lo guardado)."""
+        error = self.jobs_repo.check_values(type_, job_name, group_code, severity)
+        if error:
+            raise ChangeSetError(error)
+
+        job_id = int(job_id)
+        pending = self._jobs.get(job_id)
+        if pending is not None:
+            base = pending.base
+        else:
+            base = self.jobs_repo.get_jobs_by_ids([job_id]).get(job_id)
+            if base is None:
+                raise ChangeSetError(f"El job {job_id} ya no existe.")
+
+        new = replace(base, type=type_, job_name=job_name, group_code=group_code, severity=str(int(severity)))
+        if self._stored(new) == self._stored(base):
+            self._jobs.pop(job_id, None)
+            return False
+
+        if new.group_code != base.group_code:
+            group = self.groups_repo.get_groups_by_codes([new.group_code]).get(new.group_code)
+            if group is None:
+                raise ChangeSetError(f"El grupo {new.group_code} no existe.")
+            new = replace(new, group_name=group.group_name, service_name=group.service_name)
+        self._jobs[job_id] = _PendingJob(base, new)
+        return True
+
+    def stage_group(self, group_code: str, group_name: str, service_name: str) -> bool:
+        if not (group_name or "").strip():
+            raise ChangeSetError("GroupName es requerido.")
+
+        pending = self._groups.get(group_code)
+        if pending is not None:
+            base = pending.base
+        else:
+            base = self.groups_repo.get_groups_by_codes([group_code]).get(group_code)
+            if base is None:
+                raise ChangeSetError(f"El grupo {group_code} ya no existe.")
+
+        new = replace(base, group_name=group_name, service_name=service_name)
+        if new == base:
+            self._groups.pop(group_code, None)
+            return False
+        self._groups[group_code] = _PendingGroup(base, new)
+        return True
+
+    def discard(self, job_ids=(), group_codes=()) -> None:
+        for job_id in job_ids:
+            self._jobs.pop(int(job_id), None)
+        for code in group_codes:
+            self._groups.pop(code, None)
+
+    def clear(self) -> None:
+        self._jobs.clear()
+        self._groups.clear()
+
+    # ---------------- vista ----------------
+
+    def is_pending(self, job) -> bool:
+        """El job (JobInfo / JobRow) o su grupo tienen cambios sin guardar."""
+        return int(job.id) in self._jobs or job.group_code in self._groups
+
+    def overlay_job(self, job):
+        """Cómo queda el job con los cambios pendientes (el mismo objeto si no hay)."""
+        pending = self._jobs.get(int(job.id))
+        out = pending.new if pending is not None else job
+        group = self._groups.get(out.group_code)
+        if group is not None:
+            if not isinstance(out, JobInfo):
+                out = out.to_info()  # JobRow del índice local
+            out = replace(out, group_name=group.new.group_name, service_name=group.new.service_name)
+        return out
+
+    def overlay_group(self, group: GroupInfo) -> GroupInfo:
+        pending = self._groups.get(group.group_code)
+        return pending.new if pending is not None else group
+
+    # ---------------- guardado ----------------
+
+    @staticmethod
+    def _stored(j: JobInfo) -> tuple:
+        # Columnas que se escriben (GroupName/ServiceName son del grupo)
+        return j.type, j.job_name, j.group_code, str(j.severity)
+
+    def save(self) -> SaveResult:
+        if not self:
+            return SaveResult([], [])
+
+        with self.db.transaction():
+            conflicts: List[Conflict] = []
+
+            current_groups = self.groups_repo.get_groups_by_codes(self._groups, for_update=True)
+            for code, p in sorted(self._groups.items()):
+                cur = current_groups.get(code)
+                if cur is None:
+                    conflicts.append(Conflict("groups", code, "ya no existe."))
+                elif cur != p.base:
+                    conflicts.append(Conflict("groups", code, "lo cambió otro usuario."))
+
+            current_jobs = self.jobs_repo.get_jobs_by_ids(self._jobs, for_update=True)
+            for job_id, p in sorted(self._jobs.items()):
+                cur = current_jobs.get(job_id)
+                if cur is None:
+                    conflicts.append(Conflict("jobs", str(job_id), "ya no existe."))
+                elif self._stored(cur) != self._stored(p.base):
+                    conflicts.append(Conflict("jobs", str(job_id), "lo cambió otro usuario."))
+
+            if conflicts:
+                raise ChangeConflictError(conflicts)
+
+            groups = self.groups_repo.update_groups(
+                (p.new.group_code, p.new.group_name, p.new.service_name) for p in self._groups.values()
+            )
+            outcomes = self.jobs_repo.update_jobs(
+                (p.new.id, p.new.type, p.new.job_name, p.new.group_code, p.new.severity)
+                for p in self._jobs.values()
+            )
+            invalid = [o for o in outcomes if o.status == OUTCOME_INVALID]
+            if invalid:
+                raise ChangeSetError(invalid[0].error)
+
+        self.clear()
+        return SaveResult([o.id for o in outcomes if o.status == OUTCOME_UPDATED], groups)
+
+    def discard_conflicts(self, conflicts: List[Conflict]) -> None:
+        """Descarta los cambios en conflicto (el resto sigue pendiente)."""
+        self.discard(
+            job_ids=[int(c.key) for c in conflicts if c.entity == "jobs"],
+            group_codes=[c.key for c in conflicts if c.entity == "groups"],
+        )
@@ -0,0 +1,321 @@
+# src/service/export_service.py
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow solo CSV / JSONL
+    pa = None
+    pq = None
+
+from src.storage.export_repository import COLUMNS, EXPORT_KINDS, ExportRepository
+
+
+class ExportServiceError(Exception):
+    pass
+
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_PARQUET)
+
+PAGES_PER_PART = 10  # Parquet: páginas (row groups) por archivo part-NNNNN.parquet
+
+_PA_TYPES = {"int": "int64", "str": "string", "datetime": "string"}
+
+
+@dataclass
+class ExportSummary:
+    kind: str
+    path: str
+    format: str
+    gzip: bool
+    rows: int = 0
+    resumed_from: int = 0        # filas que ya estaban escritas de un export anterior
+    cancelled: bool = False
+
+
+def _text(v: Any) -> Any:
+    """Valores de la DB a tipos de JSON/CSV (fechas ISO, uuid / bytes como texto)."""
+    if v is None or isinstance(v, (int, float, str)):
+        return v
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ", timespec="milliseconds")
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, (bytes, bytearray)):
+        return v.hex()
+    return str(v)
+
+
+def parse_date(value: Optional[str], end: bool = False) -> Optional[datetime]:
+    """YYYY-MM-DD[ HH:MM] -> datetime; con end=True un día completo incluye ese día (< d + 1)."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportServiceError(f"Fecha inválida: {value!r} (usa YYYY-MM-DD).")
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+class _TextWriter:
+    """
+    CSV / JSONL. Cada página se agrega al archivo en un solo write (con gzip, como
+    un miembro gzip propio: un .gz de varios miembros es válido para gzip/zcat/pandas).
+    Después de cada página el archivo termina en un límite seguro: el checkpoint
+    guarda ese tamaño y al retomar se trunca ahí.
+    """
+
+    def __init__(self, path: str, fmt: str, use_gzip: bool, columns: Sequence[str], offset: Optional[int]):
+        self.fmt = fmt
+        self.gzip = use_gzip
+        self.columns = list(columns)
+        if offset is None:
+            self.f = open(path, "wb")
+            if fmt == FORMAT_CSV:
+                # BOM + encabezado: Excel lo abre con los acentos bien
+                self._write_raw(("\ufeff" + self._csv_lines([self.columns])).encode("utf-8"))
+        else:
+            self.f = open(path, "r+b")
+            self.f.truncate(offset)
+            self.f.seek(offset)
+
+    def _csv_lines(self, rows) -> str:
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(rows)
+        return buf.getvalue()
+
+    def _write_raw(self, data: bytes) -> None:
+        self.f.write(gzip.compress(data) if self.gzip else data)
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def write_page(self, rows: List[tuple]) -> None:
+        if self.fmt == FORMAT_CSV:
+            text = self._csv_lines([[_text(v) for v in r] for r in rows])
+        else:
+            text = "".join(
+                json.dumps(dict(zip(self.columns, map(_text, r))), ensure_ascii=False) + "\n" for r in rows
+            )
+        self._write_raw(text.encode("utf-8"))
+
+    @property
+    def durable(self) -> bool:
+        return True
+
+    def position(self) -> Dict[str, Any]:
+        return {"offset": self.f.tell()}
+
+    def close(self) -> None:
+        self.f.close()
+
+    abort = close
+
+
+class _ParquetWriter:
+    """
+    Parquet en un directorio de partes (part-00000.parquet, ...), PAGES_PER_PART
+    páginas (row groups) por parte. Una parte recién sirve cuando se cierra (el
+    footer va al final), así que el checkpoint se guarda al cerrar cada parte.
+    """
+
+    def __init__(self, path: str, use_gzip: bool, columns: Sequence[Tuple[str, str]], parts: Optional[int]):
+        if pa is None:
+            raise ExportServiceError("Para exportar Parquet instala pyarrow (o elige CSV / JSONL).")
+        self.path = path
+        self.compression = "gzip" if use_gzip else "snappy"
+        self.columns = list(columns)
+        self.schema = pa.schema([(name, _PA_TYPES[kind]) for name, kind in self.columns])
+        self.parts = parts or 0
+        self._writer = None
+        self._pages = 0
+
+        os.makedirs(path, exist_ok=True)
+        # Partes que quedaron después del checkpoint (o de un export anterior)
+        for leftover in glob.glob(os.path.join(path, "part-*.parquet")):
+            if int(os.path.basename(leftover)[5:10]) >= self.parts:
+                os.remove(leftover)
+
+    def write_page(self, rows: List[tuple]) -> None:
+        if self._writer is None:
+            part = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            self._writer = pq.ParquetWriter(part, self.schema, compression=self.compression)
+        arrays = [
+            pa.array([_text(r[i]) for r in rows], type=self.schema.field(i).type)
+            for i in range(len(self.columns))
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self._pages += 1
+        if self._pages >= PAGES_PER_PART:
+            self.flush_part()
+
+    def flush_part(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self._pages = 0
+        self.parts += 1
+
+    @property
+    def durable(self) -> bool:
+        """Todo lo escrito está en partes cerradas."""
+        return self._writer is None
+
+    def position(self) -> Dict[str, Any]:
+        return {"parts": self.parts}
+
+    def close(self) -> None:
+        self.flush_part()
+
+    def abort(self) -> None:
+        # La parte abierta no cuenta: al retomar se borra y se vuelve a escribir
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ExportService:
+    """
+    Export de jobs (con GroupName/ServiceName), grupos o audit log a CSV, JSONL o
+    Parquet, con gzip opcional.
+    - Lee de a páginas keyset (ExportRepository): memoria constante aunque el audit
+      tenga millones de filas.
+    - Filtros: search (la misma sintaxis del grid para jobs), date_from / date_to
+      (CreatedAtUtc / event_time_utc) y entity_name (audit).
+    - Reanudable: <path>.export.json guarda la última clave escrita; si el export se
+      corta o se cancela, correrlo de nuevo con los mismos parámetros sigue desde ahí.
+    """
+
+    def __init__(self, export_repo: ExportRepository):
+        self.export_repo = export_repo
+
+    @staticmethod
+    def checkpoint_path(path: str) -> str:
+        return path.rstrip("/\\") + ".export.json"
+
+    @staticmethod
+    def infer_format(path: str) -> Tuple[str, bool]:
+        """(formato, gzip) según la extensión: .csv, .jsonl, .parquet, con .gz opcional."""
+        lower = path.lower()
+        use_gzip = lower.endswith(".gz")
+        if use_gzip:
+            lower = lower[:-3]
+        for fmt in EXPORT_FORMATS:
+            if lower.endswith("." + fmt):
+                return fmt, use_gzip
+        if lower.endswith(".json"):
+            return FORMAT_JSONL, use_gzip
+        return FORMAT_CSV, use_gzip
+
+    def run(
+        self,
+        kind: str,
+        path: str,
+        fmt: Optional[str] = None,
+        use_gzip: Optional[bool] = None,
+        search: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        entity_name: Optional[str] = None,
+        progress: Optional[Callable[[ExportSummary], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> ExportSummary:
+        if kind not in EXPORT_KINDS:
+            raise ExportServiceError(f"Tipo de export inválido: {kind!r}")
+        inferred_fmt, inferred_gzip = self.infer_format(path)
+        fmt = fmt or inferred_fmt
+        use_gzip = inferred_gzip if use_gzip is None else bool(use_gzip)
+        if fmt not in EXPORT_FORMATS:
+            raise ExportServiceError(f"Formato inválido: {fmt!r}")
+
+        params = {
+            "kind": kind,
+            "format": fmt,
+            "gzip": use_gzip,
+            "search": search or "",
+            "date_from": _text(date_from),
+            "date_to": _text(date_to),
+            "entity_name": entity_name or "",
+        }
+        checkpoint = self._load_checkpoint(path, params)
+        summary = ExportSummary(kind=kind, path=path, format=fmt, gzip=use_gzip)
+        after = None
+        if checkpoint is not None:
+            after = checkpoint["last_key"]
+            summary.rows = summary.resumed_from = int(checkpoint["rows"])
+
+        columns = COLUMNS[kind]
+        try:
+            if fmt == FORMAT_PARQUET:
+                parts = checkpoint.get("parts") if checkpoint else None
+                writer = _ParquetWriter(path, use_gzip, columns, parts)
+            else:
+                offset = checkpoint.get("offset") if checkpoint else None
+                writer = _TextWriter(path, fmt, use_gzip, [c for c, _t in columns], offset)
+        except OSError as e:
+            raise ExportServiceError(f"No se pudo escribir {path}: {e}") from e
+
+        unsaved = 0  # filas escritas después del último checkpoint (parte Parquet abierta)
+        try:
+            for page in self.export_repo.pages(
+                kind, after=after, search=search, date_from=date_from, date_to=date_to, entity_name=entity_name,
+            ):
+                writer.write_page(page)
+                unsaved += len(page)
+                if writer.durable:
+                    summary.rows += unsaved
+                    unsaved = 0
+                    self._save_checkpoint(path, params, page[-1][0], summary.rows, writer.position())
+                if progress is not None:
+                    progress(summary)
+
+                if cancel is not None and cancel.is_set():
+                    summary.cancelled = True
+                    writer.abort()
+                    return summary
+        except BaseException:
+            writer.abort()
+            raise
+
+        writer.close()
+        summary.rows += unsaved
+        try:
+            os.remove(self.checkpoint_path(path))
+        except FileNotFoundError:
+            pass
+        if progress is not None:
+            progress(summary)
+        return summary
+
+    def _load_checkpoint(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """El checkpoint de un export anterior con los mismos parámetros (o None)."""
+        try:
+            with open(self.checkpoint_path(path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("params") != params or not os.path.exists(path):
+            return None
+        return data
+
+    def _save_checkpoint(self, path: str, params: Dict[str, Any], last_key: Any, rows: int, position: Dict[str, Any]) -> None:
+        # Escritura atómica: un corte no deja un checkpoint a medias
+        tmp = self.checkpoint_path(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "last_key": last_key, "rows": rows, **position}, f, ensure_ascii=False)
+        os.replace(tmp, self.checkpoint_path(path))
@@ -0,0 +1,401 @@
+# src/service/import_service.py
+import codecs
+import csv
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import openpyxl
+except ImportError:  # sin openpyxl solo se importan CSV
+    openpyxl = None
+
+from src.storage.import_repository import ImportRepository, StagedRow
+
+
+class ImportServiceError(Exception):
+    pass
+
+
+CHUNK_ROWS = 2000
+MAX_ERRORS = 1000  # errores que se guardan para mostrar (el contador sigue)
+READ_BLOCK = 64 * 1024  # lectura del archivo por bloques; el Sniffer solo ve el primero
+
+# Encabezado normalizado (minúsculas, sin espacios ni "_") -> campo
+HEADER_ALIASES = {
+    "type": "type",
+    "jobname": "job_name",
+    "job": "job_name",
+    "groupcode": "group_code",
+    "group": "group_code",
+    "severity": "severity",
+    "priority": "priority",
+    "incidentpriority": "priority",
+    "groupname": "group_name",
+    "servicename": "service_name",
+    "service": "service_name",
+}
+
+# Igual que AddJobWindow: Priority N -> Severity N + 1
+PRIORITY_TO_SEVERITY = {2: 3, 3: 4, 4: 5}
+SEVERITIES = set(PRIORITY_TO_SEVERITY.values())
+
+
+@dataclass(frozen=True)
+class RowError:
+    row_num: int
+    message: str
+
+
+@dataclass
+class ImportSummary:
+    file: str
+    total_rows: int = 0          # aproximado (para la barra de progreso)
+    rows_done: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+    groups_inserted: int = 0
+    groups_updated: int = 0
+    resumed_from: int = 0        # filas que ya estaban aplicadas de un import anterior
+    cancelled: bool = False
+    errors: List[RowError] = field(default_factory=list)
+
+
+def _normalize_header(h: Any) -> str:
+    return re.sub(r"[\s_]+", "", str(h or "").lower())
+
+
+def _cell(v: Any) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip()
+
+
+class _Validator:
+    """
+    Estado de validación a lo largo del archivo:
+    - grupos definidos en el archivo (GroupName/ServiceName en la fila) y los de la DB,
+    - claves (JobName, GroupCode) ya vistas, para rechazar duplicados.
+    """
+
+    def __init__(self, groups_repo):
+        self.groups_repo = groups_repo
+        self.file_groups: Dict[str, Tuple[str, str, str]] = {}   # code.lower() -> (code, name, service)
+        self.db_groups: Dict[str, Optional[str]] = {}            # code.lower() -> GroupCode en DB (o None)
+        self.seen: Dict[Tuple[str, str], int] = {}               # (job, group) en minúsculas -> fila
+
+    def skip(self, rows: List[Tuple[int, Dict[str, str]]]) -> None:
+        """Filas ya aplicadas (import retomado): solo reconstruye el estado."""
+        for row_num, r in rows:
+            code = r.get("group_code", "")
+            if code and r.get("group_name") and code.lower() not in self.file_groups:
+                self.file_groups[code.lower()] = (code, r["group_name"], r.get("service_name", ""))
+            if r.get("job_name") and code:
+                self.seen.setdefault((r["job_name"].lower(), code.lower()), row_num)
+
+    def validate(self, rows: List[Tuple[int, Dict[str, str]]]) -> Tuple[List[StagedRow], List[RowError]]:
+        staged: List[StagedRow] = []
+        errors: List[RowError] = []
+
+        # Definiciones de grupo del chunk primero: un job puede venir antes que la fila que define su grupo
+        bad_group_rows: Dict[int, str] = {}
+        for row_num, r in rows:
+            code, name = r.get("group_code", ""), r.get("group_name", "")
+            if not code or not name:
+                continue
+            definition = (code, name, r.get("service_name", ""))
+            current = self.file_groups.get(code.lower())
+            if current is None:
+                self.file_groups[code.lower()] = definition
+            elif current[1:] != definition[1:]:
+                bad_group_rows[row_num] = f"El grupo {code} está definido distinto en otra fila."
+
+        unknown = {
+            r.get("group_code", "").lower(): r.get("group_code", "")
+            for _n, r in rows
+            if r.get("group_code") and r["group_code"].lower() not in self.file_groups
+            and r["group_code"].lower() not in self.db_groups
+        }
+        if unknown:
+            found = self.groups_repo.get_groups_by_codes(unknown.values())
+            found_lower = {code.lower(): code for code in found}
+            for key in unknown:
+                self.db_groups[key] = found_lower.get(key)
+
+        for row_num, r in rows:
+            message = bad_group_rows.get(row_num) or self._check(r)
+            if message:
+                errors.append(RowError(row_num, message))
+                continue
+
+            code_key = r["group_code"].lower()
+            key = (r["job_name"].lower(), code_key)
+            first = self.seen.get(key)
+            if first is not None and first != row_num:
+                errors.append(RowError(row_num, f"Job duplicado en el archivo (fila {first})."))
+                continue
+            self.seen[key] = row_num
+
+            defined = self.file_groups.get(code_key)
+            if defined is not None:
+                code, group_name, service_name = defined
+            else:
+                code, group_name, service_name = self.db_groups[code_key], None, None
+
+            staged.append(StagedRow(
+                row_num=row_num,
+                type=r["type"],
+                job_name=r["job_name"],
+                group_code=code,
+                severity=self._severity(r),
+                group_name=group_name,
+                service_name=service_name,
+            ))
+
+        return staged, errors
+
+    @staticmethod
+    def _severity(r: Dict[str, str]) -> Optional[int]:
+        raw = r.get("severity", "")
+        if raw:
+            return int(raw) if raw.isdigit() else None
+        digits = re.sub(r"\D", "", r.get("priority", ""))  # "Priority 2", "P2", "2"
+        return PRIORITY_TO_SEVERITY.get(int(digits)) if digits else None
+
+    def _check(self, r: Dict[str, str]) -> str:
+        if not r.get("type"):
+            return "Type es requerido."
+        if not r.get("job_name"):
+            return "JobName es requerido."
+        if not r.get("group_code"):
+            return "GroupCode es requerido."
+        if self._severity(r) not in SEVERITIES:
+            raw = r.get("severity") or r.get("priority") or ""
+            return f"Priority/Severity inválida: {raw!r}"
+        code_key = r["group_code"].lower()
+        if code_key not in self.file_groups and self.db_groups.get(code_key) is None:
+            return f"El grupo {r['group_code']} no existe (agregá GroupName/ServiceName para crearlo)."
+        return ""
+
+
+class ImportService:
+    """
+    Import masivo de jobs (y sus grupos) desde CSV o XLSX.
+    - Columnas (encabezado, sin importar mayúsculas/espacios): Type, JobName, GroupCode,
+      Severity o Priority, y opcionales GroupName/ServiceName (crean o actualizan el grupo).
+    - Un job existente (mismo JobName + GroupCode) se actualiza; si no, se crea.
+    - Se aplica de a chunk_rows filas, cada chunk en su transacción: un corte o
+      cancelar deja lo aplicado, y volver a importar el mismo archivo sigue desde ahí.
+    - Las filas inválidas no frenan el import: se cuentan y se listan (hasta MAX_ERRORS).
+    """
+
+    def __init__(self, import_repo: ImportRepository, groups_repo):
+        self.import_repo = import_repo
+        self.groups_repo = groups_repo
+
+    def run(
+        self,
+        path: str,
+        progress: Optional[Callable[[ImportSummary], None]] = None,
+        cancel: Optional[threading.Event] = None,
+        chunk_rows: int = CHUNK_ROWS,
+    ) -> ImportSummary:
+        file_name = os.path.basename(path)
+        try:
+            import_key, encoding = self._fingerprint(path)
+            with self._open(path, encoding) as (rows, estimate):
+                return self._run(import_key, file_name, rows, estimate, progress, cancel, chunk_rows)
+        except OSError as e:
+            raise ImportServiceError(f"No se pudo leer el archivo: {e}") from e
+
+    def _run(
+        self,
+        import_key: str,
+        file_name: str,
+        rows: Iterator[Tuple[int, Dict[str, str]]],
+        estimate: Callable[[], int],
+        progress: Optional[Callable[[ImportSummary], None]],
+        cancel: Optional[threading.Event],
+        chunk_rows: int,
+    ) -> ImportSummary:
+        summary = ImportSummary(file=file_name, total_rows=estimate())
+        checkpoint: Dict[str, Any] = {"file": file_name, "rows_done": 0}
+        previous = self.import_repo.last_checkpoint(import_key)
+        if previous and not previous.get("done"):
+            checkpoint = previous
+            for name in ("inserted", "updated", "unchanged", "invalid", "groups_inserted", "groups_updated"):
+                setattr(summary, name, int(previous.get(name, 0)))
+            summary.resumed_from = int(previous.get("rows_done", 0))
+
+        validator = _Validator(self.groups_repo)
+        pending_skip = summary.resumed_from
+
+        for chunk in self._chunks(rows, chunk_rows):
+            if pending_skip:
+                skipped, chunk = chunk[:pending_skip], chunk[pending_skip:]
+                validator.skip(skipped)
+                pending_skip -= len(skipped)
+                summary.rows_done += len(skipped)
+                if not chunk:
+                    continue
+
+            if cancel is not None and cancel.is_set():
+                summary.cancelled = True
+                return summary
+
+            staged, errors = validator.validate(chunk)
+            room = MAX_ERRORS - len(summary.errors)
+            if room > 0:
+                summary.errors.extend(errors[:room])
+
+            checkpoint["rows_done"] = summary.rows_done + len(chunk)
+            checkpoint["invalid"] = int(checkpoint.get("invalid", 0)) + len(errors)
+            result = self.import_repo.apply_chunk(import_key, staged, checkpoint)
+
+            summary.rows_done += len(chunk)
+            summary.invalid += len(errors)
+            summary.inserted += result.inserted
+            summary.updated += result.updated
+            summary.unchanged += result.unchanged
+            summary.groups_inserted += result.groups_inserted
+            summary.groups_updated += result.groups_updated
+            summary.total_rows = estimate()
+            if progress is not None:
+                progress(summary)
+
+        self.import_repo.finish(import_key, checkpoint)
+        summary.total_rows = summary.rows_done
+        if progress is not None:
+            progress(summary)
+        return summary
+
+    # ---------------- lectura ----------------
+
+    @staticmethod
+    def _chunks(rows: Iterator[Tuple[int, Dict[str, str]]], size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        chunk: List[Tuple[int, Dict[str, str]]] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _fingerprint(path: str) -> Tuple[str, str]:
+        """
+        (import_key, encoding) en una sola pasada por bloques: import_key = hash del
+        contenido (el mismo archivo retoma su import); UTF-8 si todo decodifica, si
+        no cp1252.
+        """
+        digest = hashlib.sha1()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        utf8 = True
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(READ_BLOCK), b""):
+                digest.update(block)
+                if utf8:
+                    try:
+                        decoder.decode(block)
+                    except UnicodeDecodeError:
+                        utf8 = False
+        if utf8:
+            try:
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                utf8 = False
+        return digest.hexdigest()[:32], "utf-8-sig" if utf8 else "cp1252"
+
+    @contextmanager
+    def _open(self, path: str, encoding: str) -> Iterator[Tuple[Iterator[Tuple[int, Dict[str, str]]], Callable[[], int]]]:
+        """
+        (filas (número de fila en el archivo, campos), estimate() = filas totales
+        aproximadas para la barra de progreso). El archivo se lee a medida que se
+        consumen las filas y se cierra al salir.
+        """
+        if path.lower().endswith((".xlsx", ".xlsm")):
+            with self._open_xlsx(path) as opened:
+                yield opened
+        else:
+            with self._open_csv(path, encoding) as opened:
+                yield opened
+
+    @staticmethod
+    def _map_rows(raw_rows: Iterator[List[Any]]) -> Iterator[Tuple[int, Dict[str, str]]]:
+        header: Optional[List[Optional[str]]] = None
+        for row_num, raw in enumerate(raw_rows, start=1):
+            values = [_cell(v) for v in raw]
+            if not any(values):
+                continue
+
+            if header is None:
+                header = [HEADER_ALIASES.get(_normalize_header(h)) for h in values]
+                missing = {"type", "job_name", "group_code"} - set(header)
+                if missing or not ({"severity", "priority"} & set(header)):
+                    raise ImportServiceError(
+                        "Encabezado inválido: se esperan las columnas Type, JobName, GroupCode "
+                        "y Severity o Priority (GroupName/ServiceName opcionales)."
+                    )
+                continue
+
+            yield row_num, {
+                name: values[i] if i < len(values) else ""
+                for i, name in enumerate(header)
+                if name is not None
+            }
+
+        if header is None:
+            raise ImportServiceError("El archivo está vacío.")
+
+    @contextmanager
+    def _open_csv(self, path: str, encoding: str):
+        with open(path, encoding=encoding, errors="replace", newline="") as f:
+            try:
+                dialect = csv.Sniffer().sniff(f.read(READ_BLOCK), delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+
+            # Registros contados al leerlos (un campo entre comillas puede tener saltos
+            # de línea); el total se estima por la proporción de bytes ya leídos
+            size = os.fstat(f.fileno()).st_size
+            read = [0]
+
+            def raw_rows() -> Iterator[List[str]]:
+                for raw in csv.reader(f, dialect):
+                    read[0] += 1
+                    yield raw
+
+            def estimate() -> int:
+                done = f.buffer.tell()
+                if not read[0] or not done or done >= size:
+                    return max(0, read[0] - 1)
+                return max(0, int(read[0] * size / done) - 1)
+
+            yield self._map_rows(raw_rows()), estimate
+
+    @contextmanager
+    def _open_xlsx(self, path: str):
+        if openpyxl is None:
+            raise ImportServiceError("Para importar XLSX instala openpyxl (o guarda el archivo como CSV).")
+        try:
+            # Con la ruta (no bytes en memoria): read_only lee las hojas del zip a demanda
+            wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportServiceError(f"No se pudo abrir el XLSX: {e}") from e
+
+        try:
+            ws = wb.worksheets[0]
+            total = max(0, (ws.max_row or 1) - 1)
+            yield self._map_rows(ws.iter_rows(values_only=True)), lambda: total
+        finally:
+            wb.close()
@@ -1,12 +1,15 @@
 ﻿import json
 import socket
 import uuid
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Iterable
+
+from src.storage.statements import get_statements
 
 
 class AuditLogRepository:
     def __init__(self, db):
         self.db = db
+        self.sql = get_statements()
 
     @staticmethod
     def _default_host() -> Optional[str]:
@@ -30,42 +33,81 @@ class AuditLogRepository:
         correlation_id: Optional[uuid.UUID] = None,
     ) -> None:
 
-        sql = """
-        INSERT INTO dbo.wt_audit_log
-        (
-          actor_user_id, action, entity_name, entity_id,
-          summary, old_values_json, new_values_json,
-          source_host, source_ip, correlation_id
+        sql = self.sql["audit.insert"]
+
+        if correlation_id is None:
+            correlation_id = uuid.uuid4()
+
+        if source_host is None:
+            source_host = self._default_host()
+
+        params = self._params(
+            actor_user_id, action, entity_name, entity_id, summary,
+            old_values, new_values, source_host, source_ip, correlation_id,
         )
-        VALUES
-        (
-          ?, ?, ?, ?,
-          ?, ?, ?,
-          ?, ?, ?
-        );
-        """
 
+        # Si hay una db.transaction() abierta, se une a ella (mismo commit que el cambio)
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            conn.commit()
+
+    @staticmethod
+    def _params(
+        actor_user_id, action, entity_name, entity_id, summary,
+        old_values, new_values, source_host, source_ip, correlation_id,
+    ) -> tuple:
         old_json = json.dumps(old_values, ensure_ascii=False) if old_values is not None else None
         new_json = json.dumps(new_values, ensure_ascii=False) if new_values is not None else None
+        return (
+            actor_user_id,
+            action,
+            entity_name,
+            entity_id,
+            summary,
+            old_json,
+            new_json,
+            source_host,
+            source_ip,
+            str(correlation_id),
+        )
 
+    def insert_many(
+        self,
+        entries: Iterable[Dict[str, Any]],
+        *,
+        actor_user_id: Optional[int],
+        source_host: Optional[str] = None,
+        source_ip: Optional[str] = None,
+        correlation_id: Optional[uuid.UUID] = None,
+    ) -> int:
+        """
+        Audit de un lote en un solo executemany (fast_executemany en SQL Server).
+        entries: dicts con action, entity_name, entity_id, summary, old_values, new_values.
+        Todas las filas comparten correlation_id: así se ve qué cambió junto.
+        Retorna la cantidad de filas escritas.
+        """
         if correlation_id is None:
             correlation_id = uuid.uuid4()
 
         if source_host is None:
             source_host = self._default_host()
 
+        params = [
+            self._params(
+                actor_user_id, e["action"], e["entity_name"], e.get("entity_id"), e.get("summary"),
+                e.get("old_values"), e.get("new_values"), source_host, source_ip, correlation_id,
+            )
+            for e in entries
+        ]
+        if not params:
+            return 0
+
         with self.db.get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(sql, (
-                actor_user_id,
-                action,
-                entity_name,
-                entity_id,
-                summary,
-                old_json,
-                new_json,
-                source_host,
-                source_ip,
-                str(correlation_id),
-            ))
-            conn.commit()
\ No newline at end of file
+            if self.db.dialect == "mssql":
+                cur.fast_executemany = True
+            cur.executemany(self.sql["audit.insert"], params)
+            conn.commit()
+
+        return len(params)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.storage.database import Database, _get_bool, _get_int
+from src.storage.statements import get_statements
+
+
+MODE_ROWVERSION = "rowversion"
+MODE_AUDIT = "audit"
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """
+    Hasta dónde llegó el cliente: rowversion (bytes) o último audit_id (int).
+    gaps (solo audit): rangos (desde, hasta, visto_en) de audit_id <= value que
+    todavía no se veían (transacciones en vuelo o revertidas); se releen después.
+    """
+    mode: str
+    value: Any
+    gaps: Tuple[Tuple[int, int, float], ...] = ()
+
+
+@dataclass(frozen=True)
+class Delta:
+    items: list                 # filas insertadas/actualizadas (JobInfo / GroupInfo)
+    watermark: Watermark        # pasar en la próxima llamada a changes_since
+    removed: list = field(default_factory=list)  # claves que ya no se listan (jobs retirados o purgados)
+
+
+class ChangeTracker:
+    """
+    "Qué cambió desde X" para Jobs_information y Groups.
+    - rowversion: si ambas tablas tienen una columna RowVer ROWVERSION (ver README).
+      El watermark es MIN_ACTIVE_ROWVERSION(), así no se saltea lo que estaba en vuelo.
+    - audit: si no (o en SQLite), usa wt_audit_log: los repositorios auditan cada
+      alta/cambio en la misma transacción. MAX(audit_id) solo no alcanza: la
+      identidad se asigna al insertar, no al confirmar, y una transacción larga
+      puede confirmar un audit_id menor que otro ya leído. Los audit_id que faltan
+      debajo del tope quedan en Watermark.gaps y se releen en cada llamada hasta
+      que aparecen o pasan DELTA_AUDIT_GAP_SECONDS (default 600: se revirtieron).
+    DB_ROWVERSION=0 fuerza el modo audit.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.sql = get_statements()
+        self._mode: Optional[str] = None
+        self._lock = threading.Lock()
+        self.gap_seconds = max(0, _get_int("DELTA_AUDIT_GAP_SECONDS", 600))
+        # current(): cuántos audit_id hacia atrás se revisan buscando huecos
+        self.gap_scan = max(0, _get_int("DELTA_AUDIT_GAP_SCAN", 10000))
+
+    @property
+    def mode(self) -> str:
+        if self._mode is None:
+            with self._lock:
+                if self._mode is None:
+                    self._mode = self._detect_mode()
+        return self._mode
+
+    def _detect_mode(self) -> str:
+        if self.db.dialect != "mssql" or not _get_bool("DB_ROWVERSION", "1"):
+            return MODE_AUDIT
+        with self.db.get_connection() as conn:
+            row = conn.cursor().execute(self.sql["delta.rowversion_columns"]).fetchone()
+        return MODE_ROWVERSION if row and int(row[0]) == 2 else MODE_AUDIT
+
+    def current(self) -> Watermark:
+        """Watermark de "ahora": tomarlo antes de la carga completa inicial."""
+        if self.mode == MODE_ROWVERSION:
+            with self.db.get_connection() as conn:
+                row = conn.cursor().execute(self.sql["delta.rowversion_now"]).fetchone()
+            return Watermark(MODE_ROWVERSION, row[0])
+
+        # Lo que estaba en vuelo debajo del tope tampoco entra en la carga completa
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            hi = int(cur.execute(self.sql["delta.audit_now"]).fetchone()[0] or 0)
+            lo = max(0, hi - self.gap_scan)
+            seen = sorted(int(r[0]) for r in cur.execute(self.sql["delta.audit_rows"], (lo, hi)).fetchall())
+        now = time.monotonic()
+        return Watermark(MODE_AUDIT, hi, tuple((a, b, now) for a, b in _missing(lo + 1, hi, seen)))
+
+    def _check(self, since: Watermark) -> None:
+        if since.mode != self.mode:
+            raise ValueError(f"Watermark de otro modo ({since.mode}); se esperaba {self.mode}.")
+
+    def rowversion_range(self, since: Watermark) -> Tuple[Any, Any, Watermark]:
+        """(desde, hasta) para WHERE RowVer >= desde AND RowVer < hasta, y el nuevo watermark."""
+        self._check(since)
+        now = self.current()
+        return since.value, now.value, now
+
+    def audit_changes(self, entity_names: Tuple[str, ...], since: Watermark) -> Tuple[Dict[str, List[str]], Watermark]:
+        """
+        entity_id distintos por entity_name auditados después de `since`: los
+        audit_id > since.value y los que estaban en since.gaps y ya aparecieron.
+        """
+        self._check(since)
+        now = time.monotonic()
+        gaps = [g for g in since.gaps if now - g[2] < self.gap_seconds]
+
+        # Primero el tope, después el rango (lo, hi]; lo baja hasta el hueco más viejo
+        lo = min([a - 1 for a, _b, _t in gaps] + [since.value])
+        rows = []
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            hi = int(cur.execute(self.sql["delta.audit_now"]).fetchone()[0] or 0)
+            if hi > since.value or gaps:
+                rows = cur.execute(self.sql["delta.audit_rows"], (lo, max(hi, since.value))).fetchall()
+
+        changed: Dict[str, set] = {name: set() for name in entity_names}
+        seen = []
+        for audit_id, name, entity_id in rows:
+            audit_id = int(audit_id)
+            if audit_id <= since.value and not any(a <= audit_id <= b for a, b, _t in gaps):
+                continue  # ya se había leído
+            seen.append(audit_id)
+            if name in changed and entity_id is not None:
+                changed[name].add(str(entity_id))
+
+        # Huecos que siguen abiertos (conservan cuándo se vieron) + los nuevos
+        seen.sort()
+        still = [(x, y, t) for a, b, t in gaps for x, y in _missing(a, b, seen)]
+        still += [(x, y, now) for x, y in _missing(since.value + 1, hi, seen)]
+        watermark = Watermark(MODE_AUDIT, max(hi, since.value), tuple(still))
+        return {name: sorted(ids) for name, ids in changed.items()}, watermark
+
+
+def _missing(lo: int, hi: int, seen: Sequence[int]) -> Iterable[Tuple[int, int]]:
+    """Rangos [desde, hasta] de lo..hi que no están en seen (ordenado)."""
+    nxt = lo
+    for x in seen[bisect_left(seen, lo):bisect_right(seen, hi)]:
+        if x > nxt:
+            yield nxt, x - 1
+        nxt = x + 1
+    if nxt <= hi:
+        yield nxt, hi
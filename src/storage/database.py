@@ -1,9 +1,534 @@
 ﻿import os
-import pyodbc
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
 from dotenv import load_dotenv
 
+try:
+    import pyodbc
+except ImportError:  # sin driver ODBC (dev box): solo queda DB_BACKEND=sqlite
+    pyodbc = None
+
+from src.storage.read_cache import ReadCache
+
 load_dotenv()
 
+
+def _get_int(name: str, default: int) -> int:
+    raw = os.getenv(name, str(default)).strip()
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _get_bool(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip() in ("1", "true", "True", "yes", "YES")
+
+
+# Sin límite para los iter_*: TOP (?) sigue siendo el mismo statement/plan
+NO_LIMIT = 2147483647
+
+
+def fetch_batches(cur, batch_size: int) -> Iterator[list]:
+    """Trae el resultado de a `batch_size` filas (fetchmany) en vez de todo junto."""
+    cur.arraysize = batch_size
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class QueryTimeoutError(Exception):
+    pass
+
+
+class QueryCancelledError(Exception):
+    pass
+
+
+class DatabaseUnavailableError(Exception):
+    pass
+
+
+# Presupuesto (segundos) por tipo de operación; 0 = sin límite.
+# Se puede ajustar con DB_TIMEOUT_SEARCH, DB_TIMEOUT_LIST, etc.
+OPERATION_TIMEOUTS = {
+    "search": 10,
+    "list": 30,
+    "save": 30,
+    "login": 15,
+}
+
+
+# Nivel de aislamiento por tipo de operación (DB_ISOLATION_SEARCH, DB_ISOLATION_LIST, ...).
+# Listados y búsquedas leen un snapshot y no esperan locks de otros operadores;
+# los guardados (y sus snapshots de audit) usan lecturas con lock.
+OPERATION_ISOLATION = {
+    "search": "SNAPSHOT",
+    "list": "SNAPSHOT",
+    "save": "READ COMMITTED",
+    "login": "READ COMMITTED",
+}
+
+ISOLATION_LEVELS = (
+    "READ UNCOMMITTED",
+    "READ COMMITTED",
+    "REPEATABLE READ",
+    "SNAPSHOT",
+    "SERIALIZABLE",
+)
+
+
+def _get_isolation(name: str, default: str) -> str:
+    v = " ".join(os.getenv(name, default).upper().replace("_", " ").split())
+    return v if v in ISOLATION_LEVELS else default
+
+
+def _sqlstate(exc: BaseException) -> str:
+    args = getattr(exc, "args", ())
+    return str(args[0]) if args else ""
+
+
+def _translate_error(exc: BaseException) -> Optional[Exception]:
+    if pyodbc is None or not isinstance(exc, pyodbc.Error):
+        return None
+    state = _sqlstate(exc)
+    if state == "HYT00":
+        return QueryTimeoutError("La consulta excedió el tiempo límite. Intenta de nuevo o acota la búsqueda.")
+    if state == "HY008":
+        return QueryCancelledError("La consulta fue cancelada.")
+    return None
+
+
+class CancelToken:
+    """
+    Permite cancelar en el servidor (SQLCancel) la consulta en curso desde otro hilo.
+    Uso en repositorios:
+        with cancel.watch(cur):
+            rows = cur.execute(sql, params).fetchall()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursor = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            cur = self._cursor
+
+        if cur is not None:
+            try:
+                cur.cancel()
+            except Exception:
+                pass
+
+    @contextmanager
+    def watch(self, cur) -> Iterator[None]:
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledError("La consulta fue cancelada.")
+            self._cursor = cur
+        try:
+            yield
+        except Exception as e:
+            if self.cancelled:
+                raise QueryCancelledError("La consulta fue cancelada.") from e
+            raise
+        finally:
+            with self._lock:
+                self._cursor = None
+
+
+class ConnectionPool:
+    """
+    Pool acotado y thread-safe de conexiones pyodbc.
+    - Nunca abre más de max_size conexiones (prestadas + libres).
+    - Cierra las conexiones libres que pasan idle_timeout segundos sin uso,
+      pero conserva al menos min_size.
+    - Al prestar una conexión que lleva más de ping_after segundos quieta,
+      corre un SELECT 1 y la descarta si ya no responde.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], "pyodbc.Connection"],
+        *,
+        min_size: int = 0,
+        max_size: int = 5,
+        idle_timeout: int = 300,
+        acquire_timeout: int = 15,
+        ping_after: int = 30,
+    ):
+        self._factory = factory
+        self.max_size = max(1, int(max_size))
+        self.min_size = min(max(0, int(min_size)), self.max_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after
+
+        # (conexión, último uso); a la derecha las más recientes
+        self._idle: Deque[Tuple["pyodbc.Connection", float]] = deque()
+        self._size = 0  # abiertas en total (libres + prestadas)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Estado de sesión conocido por conexión (p.ej. isolation level ya seteado)
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+
+    def acquire(self) -> "pyodbc.Connection":
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            raw = None
+            idle_for = 0.0
+
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError("El pool de conexiones está cerrado.")
+
+                now = time.monotonic()
+                expired = self._evict_idle_locked(now)
+
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    idle_for = now - last_used
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No hay conexiones libres en el pool (max={self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            self._close_all(expired)
+
+            if raw is None:
+                try:
+                    return self._factory()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if idle_for >= self.ping_after and not self._is_alive(raw):
+                self._discard(raw)
+                continue
+
+            return raw
+
+    def release(self, raw: "pyodbc.Connection", discard: bool = False) -> None:
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+                return
+
+        self._discard(raw)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        self._close_all(idle)
+
+    def _evict_idle_locked(self, now: float) -> List["pyodbc.Connection"]:
+        expired = []
+        while self._idle and self._size > self.min_size:
+            raw, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            expired.append(raw)
+        return expired
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _discard(self, raw: "pyodbc.Connection") -> None:
+        self._forget()
+        self._close_all([raw])
+
+    def session(self, raw: "pyodbc.Connection") -> Dict[str, Any]:
+        return self._sessions.setdefault(id(raw), {})
+
+    def _close_all(self, conns: List["pyodbc.Connection"]) -> None:
+        for raw in conns:
+            self._sessions.pop(id(raw), None)
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_alive(raw: "pyodbc.Connection") -> bool:
+        try:
+            cur = raw.cursor()
+            cur.execute("SELECT 1;").fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+
+class PooledConnection:
+    """
+    Conexión prestada por el pool. Se usa igual que la de pyodbc:
+    `with db.get_connection() as conn:` hace commit al salir sin error
+    (rollback si hubo excepción) y devuelve la conexión al pool.
+    """
+
+    def __init__(self, pool: ConnectionPool, raw: "pyodbc.Connection"):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._raw is None:
+            return False
+
+        discard = False
+        try:
+            if exc_type is None:
+                self._raw.commit()
+            else:
+                self._raw.rollback()
+        except Exception:
+            # Conexión rota: no vuelve al pool
+            discard = True
+            if exc_type is None:
+                raise
+        finally:
+            self.close(discard=discard)
+
+        # Timeout / cancelación de pyodbc -> errores propios con mensaje legible
+        translated = _translate_error(exc) if exc is not None else None
+        if translated is not None:
+            raise translated from exc
+        return False
+
+    def close(self, discard: bool = False) -> None:
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool.release(raw, discard=discard)
+
+
+class CircuitBreaker:
+    """
+    Corta el acceso a la DB tras `failure_threshold` fallos de conexión seguidos.
+    - closed: todo normal.
+    - open: get_connection() falla al instante con DatabaseUnavailableError.
+    - half_open: un hilo en segundo plano está probando la conexión.
+    El hilo de prueba reintenta cada `reset_timeout` segundos hasta que conecta.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, probe: Callable[[], None], failure_threshold: int = 3, reset_timeout: int = 10):
+        self._probe = probe
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = max(1, int(reset_timeout))
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def is_available(self) -> bool:
+        return self._state == self.CLOSED
+
+    def before_call(self) -> None:
+        if self._state != self.CLOSED:
+            raise DatabaseUnavailableError(
+                "Base de datos no disponible. Se está reintentando la conexión en segundo plano."
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state != self.CLOSED or self._failures < self.failure_threshold:
+                return
+            self._state = self.OPEN
+
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.reset_timeout)
+
+            with self._lock:
+                self._state = self.HALF_OPEN
+
+            try:
+                self._probe()
+            except Exception:
+                with self._lock:
+                    self._state = self.OPEN
+                continue
+
+            with self._lock:
+                self._state = self.CLOSED
+                self._failures = 0
+            return
+
+
+class _JoinedConnection:
+    """
+    Vista de la conexión de una transacción abierta (Database.transaction()).
+    Los repositorios la usan igual que una conexión normal, pero commit()
+    y el `with` no cierran nada: el commit lo hace la transacción externa.
+    """
+
+    def __init__(self, conn: PooledConnection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self) -> "_JoinedConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _OdbcBackend:
+    """SQL Server vía pyodbc."""
+
+    dialect = "mssql"
+    supports_isolation = True
+
+    def __init__(self, conn_str: str, connect_timeout: int):
+        if pyodbc is None:
+            raise RuntimeError("pyodbc no está disponible (falta el driver ODBC). Usa DB_BACKEND=sqlite para desarrollo.")
+        self.conn_str = conn_str
+        self.connect_timeout = connect_timeout
+        self.errors = (pyodbc.Error,)
+
+    def connect(self) -> "pyodbc.Connection":
+        return pyodbc.connect(self.conn_str, timeout=self.connect_timeout)
+
+
+class _Endpoint:
+    """
+    Destino de conexión (primario o réplica de lectura) con su propio pool
+    y su propio circuit breaker.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.conn_str = backend.conn_str
+        self._snapshot_enabled: Optional[bool] = None
+
+        self.breaker = CircuitBreaker(
+            self._probe,
+            failure_threshold=_get_int("DB_BREAKER_THRESHOLD", 3),
+            reset_timeout=_get_int("DB_BREAKER_RESET", 10),
+        )
+
+        self.pool = ConnectionPool(
+            self._connect,
+            min_size=_get_int("DB_POOL_MIN", 1),
+            max_size=_get_int("DB_POOL_MAX", 5),
+            idle_timeout=_get_int("DB_POOL_IDLE_TIMEOUT", 300),
+            acquire_timeout=_get_int("DB_POOL_ACQUIRE_TIMEOUT", 15),
+            ping_after=_get_int("DB_POOL_PING_AFTER", 30),
+        )
+
+    def _connect(self):
+        try:
+            raw = self.backend.connect()
+        except self.backend.errors:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return raw
+
+    def _probe(self) -> None:
+        self.backend.connect().close()
+
+    def _resolve_isolation(self, raw: "pyodbc.Connection", level: str) -> str:
+        # SNAPSHOT requiere ALLOW_SNAPSHOT_ISOLATION ON; si la DB no lo tiene, READ COMMITTED
+        # (que con READ_COMMITTED_SNAPSHOT ON tampoco bloquea). Se consulta una sola vez.
+        if level != "SNAPSHOT":
+            return level
+        if self._snapshot_enabled is None:
+            row = raw.execute(
+                "SELECT snapshot_isolation_state FROM sys.databases WHERE name = DB_NAME();"
+            ).fetchone()
+            # Cerrar la transacción implícita: no se puede pasar a SNAPSHOT con una abierta
+            raw.commit()
+            self._snapshot_enabled = bool(row and row[0] == 1)
+        return level if self._snapshot_enabled else "READ COMMITTED"
+
+    def _set_isolation(self, raw: "pyodbc.Connection", level: str) -> None:
+        if not self.backend.supports_isolation:
+            return
+        session = self.pool.session(raw)
+        level = self._resolve_isolation(raw, level)
+        if session.get("isolation") == level:
+            return
+        raw.execute(f"SET TRANSACTION ISOLATION LEVEL {level};")
+        session["isolation"] = level
+
+    def checkout(self, timeout: int, isolation: str) -> PooledConnection:
+        # Con el circuito abierto fallamos al instante en vez de esperar el login timeout
+        self.breaker.before_call()
+        raw = self.pool.acquire()
+        try:
+            # El timeout aplica a todo lo que se ejecute con esta conexión mientras esté prestada
+            raw.timeout = timeout
+            # Solo va al server cuando el nivel cambia respecto a la sesión
+            self._set_isolation(raw, isolation)
+        except Exception:
+            self.pool.release(raw, discard=True)
+            raise
+        return PooledConnection(self.pool, raw)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
 class Database:
     def __init__(self):
         self.driver = os.getenv("DB_DRIVER", "ODBC Driver 18 for SQL Server")
@@ -11,27 +536,206 @@ class Database:
         self.database = os.getenv("DB_DATABASE", "")
         self.username = os.getenv("DB_USER", "")
         self.password = os.getenv("DB_PASSWORD", "")
-        self.trusted = os.getenv("DB_TRUSTED_CONNECTION", "0").strip() in (
-            "1", "true", "True", "yes", "YES"
+        self.trusted = _get_bool("DB_TRUSTED_CONNECTION")
+
+        self._local = threading.local()
+
+        # Login timeout de ODBC y timeouts de query por operación
+        self.connect_timeout = _get_int("DB_TIMEOUT_CONNECT", 15)
+        self.timeouts = {
+            op: _get_int(f"DB_TIMEOUT_{op.upper()}", default)
+            for op, default in OPERATION_TIMEOUTS.items()
+        }
+        self.isolation = {
+            op: _get_isolation(f"DB_ISOLATION_{op.upper()}", default)
+            for op, default in OPERATION_ISOLATION.items()
+        }
+
+        # Backend: "sqlserver" (pyodbc, default) o "sqlite" (local, sin SQL Server)
+        self.backend = os.getenv("DB_BACKEND", "sqlserver").strip().lower()
+        self.read_server = os.getenv("DB_READ_SERVER", "").strip()
+        self.replica: Optional[_Endpoint] = None
+
+        if self.backend == "sqlite":
+            from src.storage.sqlite_backend import SqliteBackend
+            self.primary = _Endpoint(SqliteBackend(os.getenv("DB_SQLITE_PATH", "ctlmanager.db").strip()))
+        else:
+            self.primary = _Endpoint(
+                _OdbcBackend(self._build_conn_str(self.server), self.connect_timeout)
+            )
+
+            # Réplica de lectura (opcional): DB_READ_SERVER o ApplicationIntent=ReadOnly
+            # sobre el mismo listener (DB_READ_INTENT=1).
+            if self.read_server or _get_bool("DB_READ_INTENT"):
+                self.replica = _Endpoint(
+                    _OdbcBackend(
+                        self._build_conn_str(self.read_server or self.server, read_only=True),
+                        self.connect_timeout,
+                    )
+                )
+
+        # "mssql" | "sqlite": para los pocos statements que no se pueden traducir
+        self.dialect = self.primary.backend.dialect
+
+        # Filas por fetchmany en los iter_* de los repositorios
+        self.fetch_batch = max(1, _get_int("DB_FETCH_BATCH", 500))
+
+        # Tras escribir, las lecturas van al primario unos segundos (la réplica puede ir atrasada)
+        self.read_after_write = _get_int("DB_READ_AFTER_WRITE", 5)
+        self._last_write = 0.0
+
+        # Cache de lecturas de los repositorios (DB_CACHE_TTL=0 la apaga)
+        self.cache = ReadCache(
+            max_entries=_get_int("DB_CACHE_SIZE", 256),
+            ttl=_get_int("DB_CACHE_TTL", 30),
         )
 
-    def get_connection(self):
+        # Compatibilidad: el primario sigue expuesto como antes
+        self.conn_str = self.primary.conn_str
+        self.pool = self.primary.pool
+        self.breaker = self.primary.breaker
+
+    def _build_conn_str(self, server: str, read_only: bool = False) -> str:
+        intent = "ApplicationIntent=ReadOnly;" if read_only else ""
+
         if self.trusted:
-            conn_str = (
+            return (
                 f"DRIVER={{{self.driver}}};"
-                f"SERVER={self.server};"
+                f"SERVER={server};"
                 f"DATABASE={self.database};"
                 "Trusted_Connection=yes;"
                 "TrustServerCertificate=yes;"
+                f"{intent}"
             )
+
+        return (
+            f"DRIVER={{{self.driver}}};"
+            f"SERVER={server};"
+            f"DATABASE={self.database};"
+            f"UID={self.username};"
+            f"PWD={self.password};"
+            "TrustServerCertificate=yes;"
+            f"{intent}"
+        )
+
+    def _use_replica(self) -> bool:
+        if self.replica is None or not self.replica.breaker.is_available():
+            return False
+        return time.monotonic() - self._last_write >= self.read_after_write
+
+    def _checkout(
+        self,
+        operation: str,
+        read_only: bool = False,
+        isolation: Optional[str] = None,
+    ) -> PooledConnection:
+        timeout = self.timeouts.get(operation, 0)
+        isolation = isolation or self.isolation.get(operation, "READ COMMITTED")
+        if isolation not in ISOLATION_LEVELS:
+            raise ValueError(f"Isolation level inválido: {isolation}")
+
+        if read_only and self._use_replica():
+            return self.replica.checkout(timeout, isolation)
+
+        if operation == "save":
+            self._last_write = time.monotonic()
+        return self.primary.checkout(timeout, isolation)
+
+    def get_connection(
+        self,
+        operation: str = "list",
+        read_only: bool = False,
+        isolation: Optional[str] = None,
+    ):
+        """
+        operation: "search" | "list" | "save" | "login" (define timeout e isolation level).
+        read_only: la consulta puede ir a la réplica de lectura si está configurada.
+        Lo que debe ver escrituras propias (snapshots de audit, login) va al primario.
+        isolation: fuerza un nivel de aislamiento distinto al de la operación.
+        """
+        # Dentro de transaction() todos usan la misma conexión (timeout e isolation incluidos)
+        current = getattr(self._local, "conn", None)
+        if current is not None:
+            return _JoinedConnection(current)
+        return self._checkout(operation, read_only=read_only, isolation=isolation)
+
+    @contextmanager
+    def transaction(
+        self,
+        operation: str = "save",
+        isolation: Optional[str] = None,
+    ) -> Iterator[PooledConnection]:
+        """
+        Unidad de trabajo: todo get_connection() dentro del bloque (mismo hilo)
+        comparte una conexión y se confirma con un solo commit al final.
+        Si algo falla, se hace rollback de todo (incluido el audit).
+        Las transacciones anidadas se unen a la externa: reciben la misma vista que
+        get_connection() (commit() no confirma nada) y no pueden pedir otro isolation.
+        Lo registrado con after_commit() corre después del commit (no si hay rollback).
+        """
+        current = getattr(self._local, "conn", None)
+        if current is not None:
+            if isolation is not None and isolation != self._local.isolation:
+                raise ValueError(
+                    f"Isolation level {isolation} dentro de una transacción abierta con {self._local.isolation}."
+                )
+            yield _JoinedConnection(current)
+            return
+
+        conn = self._checkout(operation, isolation=isolation)
+        self._local.conn = conn
+        self._local.isolation = isolation or self.isolation.get(operation, "READ COMMITTED")
+        self._local.pending_tags = set()
+        self._local.on_commit = []
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            # Recién ahora (commit o rollback) se invalida lo que se escribió adentro
+            tags, self._local.pending_tags = self._local.pending_tags, set()
+            if tags:
+                self.cache.invalidate(*tags)
+            callbacks, self._local.on_commit = self._local.on_commit, []
+
+        # Solo se llega acá si el bloque terminó bien (commit hecho)
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        callback() cuando se confirme la transacción en curso (la externa, si están
+        anidadas); si se hace rollback no corre. Fuera de una transacción corre ya.
+        Para lo que vive fuera de la DB (índices en memoria, listeners).
+        """
+        if self.in_transaction():
+            self._local.on_commit.append(callback)
         else:
-            conn_str = (
-                f"DRIVER={{{self.driver}}};"
-                f"SERVER={self.server};"
-                f"DATABASE={self.database};"
-                f"UID={self.username};"
-                f"PWD={self.password};"
-                "TrustServerCertificate=yes;"
-            )
+            callback()
+
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "conn", None) is not None
+
+    def cached(self, sql: str, params: tuple, tags: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        """
+        Lectura a través de la cache (clave = statement + parámetros).
+        Dentro de una transacción no se usa: ahí hay que ver las escrituras propias.
+        Las listas se devuelven copiadas para que el que llama pueda modificarlas.
+        """
+        if not self.cache.enabled or self.in_transaction():
+            return loader()
+        value = self.cache.get_or_load((sql, params), tags, loader)
+        return list(value) if isinstance(value, list) else value
+
+    def invalidate(self, *tags: str) -> None:
+        """Lo llaman los repositorios al escribir; en una transacción espera al final."""
+        if self.in_transaction():
+            self._local.pending_tags.update(tags)
+        else:
+            self.cache.invalidate(*tags)
 
-        return pyodbc.connect(conn_str)
+    def close(self) -> None:
+        self.cache.clear()
+        self.primary.close()
+        if self.replica is not None:
+            self.replica.close()
@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+from src.storage.database import CancelToken, Database, _get_int, fetch_batches
+from src.storage.job_query import parse_query
+from src.storage.jobs_repository import JobsRepository
+from src.storage.statements import JOB_STATUS_WHERE, get_statements
+
+
+KIND_JOBS = "jobs"
+KIND_GROUPS = "groups"
+KIND_AUDIT = "audit"
+EXPORT_KINDS = (KIND_JOBS, KIND_GROUPS, KIND_AUDIT)
+
+# (columna, tipo) en el orden del SELECT de statements._EXPORT_SOURCES
+COLUMNS = {
+    KIND_JOBS: (
+        ("Id", "int"), ("Type", "str"), ("JobName", "str"), ("GroupCode", "str"),
+        ("GroupName", "str"), ("ServiceName", "str"), ("Severity", "int"), ("CreatedAtUtc", "datetime"),
+    ),
+    KIND_GROUPS: (
+        ("GroupCode", "str"), ("GroupName", "str"), ("ServiceName", "str"),
+    ),
+    KIND_AUDIT: (
+        ("audit_id", "int"), ("event_time_utc", "datetime"), ("actor_user_id", "int"), ("action", "str"),
+        ("entity_name", "str"), ("entity_id", "str"), ("summary", "str"), ("old_values_json", "str"),
+        ("new_values_json", "str"), ("source_host", "str"), ("source_ip", "str"), ("correlation_id", "str"),
+    ),
+}
+
+# Valor inicial de la clave (todo es mayor)
+_FIRST_KEY = {KIND_JOBS: 0, KIND_GROUPS: "", KIND_AUDIT: 0}
+
+# Columna de fecha para date_from / date_to
+_DATE_COLUMN = {KIND_JOBS: "j.CreatedAtUtc", KIND_AUDIT: "event_time_utc"}
+
+
+class ExportRepository:
+    """
+    Lectura de jobs / grupos / audit para exportar, por páginas keyset en orden de
+    la clave (Id, GroupCode, audit_id):
+    - cada página es una consulta corta (TOP (?) ... WHERE clave > ?) que se lee
+      con fetchmany: la memoria no depende del total, y no queda una consulta
+      abierta durante todo el export.
+    - la última clave de cada página es el punto desde donde retomar.
+    """
+
+    def __init__(self, db: Database, jobs_repo: JobsRepository):
+        self.db = db
+        self.jobs_repo = jobs_repo
+        self.sql = get_statements()
+        self.page_size = max(1, _get_int("EXPORT_PAGE_ROWS", 10000))
+
+    def _date_param(self, value: datetime) -> Any:
+        if self.db.dialect == "sqlite":
+            # En SQLite las fechas son texto ISO (ver job_query.to_sql)
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+        return value
+
+    def _where(
+        self,
+        kind: str,
+        search: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        entity_name: Optional[str],
+    ) -> Tuple[str, tuple]:
+        parts: List[str] = []
+        params: tuple = ()
+
+        if kind == KIND_JOBS:
+            # Como el grid: los retirados no se exportan
+            parts.append(JOB_STATUS_WHERE["active"])
+        if kind == KIND_JOBS and (search or "").strip():
+            # Mismo criterio que el grid (campos + texto libre en el modo de búsqueda actual)
+            where, params = parse_query(search).to_sql(self.jobs_repo.search_mode, self.db.dialect)
+            parts.append(where)
+        elif kind == KIND_GROUPS and (search or "").strip():
+            like = f"%{search.strip()}%"
+            parts.append("(GroupCode LIKE ? OR GroupName LIKE ? OR ServiceName LIKE ?)")
+            params += (like, like, like)
+        elif kind == KIND_AUDIT and (search or "").strip():
+            like = f"%{search.strip()}%"
+            parts.append("(entity_id LIKE ? OR summary LIKE ?)")
+            params += (like, like)
+
+        date_column = _DATE_COLUMN.get(kind)
+        if date_column and date_from is not None:
+            parts.append(f"{date_column} >= ?")
+            params += (self._date_param(date_from),)
+        if date_column and date_to is not None:
+            parts.append(f"{date_column} < ?")
+            params += (self._date_param(date_to),)
+
+        if kind == KIND_AUDIT and entity_name:
+            parts.append("entity_name = ?")
+            params += (entity_name,)
+
+        return " AND ".join(parts) or "1 = 1", params
+
+    def pages(
+        self,
+        kind: str,
+        after: Any = None,
+        search: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        entity_name: Optional[str] = None,
+        page_size: Optional[int] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[List[tuple]]:
+        """
+        Páginas de filas crudas (columnas de COLUMNS[kind]) después de `after`
+        (None = desde el principio). La clave de cada fila es su primera columna.
+        """
+        if kind not in COLUMNS:
+            raise ValueError(f"Tipo de export inválido: {kind!r}")
+
+        where, params = self._where(kind, search, date_from, date_to, entity_name)
+        sql = self.sql.export_page(kind, where)
+        page_size = int(page_size or self.page_size)
+        key = _FIRST_KEY[kind] if after is None else after
+        cancel = cancel or CancelToken()
+
+        while True:
+            page: List[tuple] = []
+            with self.db.get_connection("list", read_only=True) as conn:
+                cur = conn.cursor()
+                with cancel.watch(cur):
+                    cur.execute(sql, (page_size, key) + params)
+                    for rows in fetch_batches(cur, self.db.fetch_batch):
+                        page.extend(tuple(r) for r in rows)
+
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            key = page[-1][0]
@@ -1,7 +1,18 @@
-from dataclasses import dataclass
-from typing import List, Optional, Any, Dict
+import json
+from dataclasses import astuple, dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Any, Dict, Tuple
 
-from src.storage.database import Database
+from src.storage.database import NO_LIMIT, Database, fetch_batches
+from src.storage.change_tracking import MODE_ROWVERSION, ChangeTracker, Delta, Watermark
+from src.storage.job_search import SearchTokenIndex
+from src.storage.read_cache import TAG_GROUPS
+from src.storage.statements import IN_BUCKETS, get_statements, in_params
+
+
+_AUDIT_SUMMARIES = {
+    "INSERT": "Created group '{name}' (code={code})",
+    "DELETE": "Deleted group '{name}' (code={code})",
+}
 
 
 @dataclass(frozen=True)
@@ -15,52 +26,111 @@ class GroupsRepository:
     def __init__(self, db: Database, audit_repo=None):
         self.db = db
         self.audit_repo = audit_repo
+        self.sql = get_statements()
         self._actor_user_id: Optional[int] = None
+        self.search_index = SearchTokenIndex(db)
+        self._listeners: List[Callable[[str], None]] = []
+        self.changes = ChangeTracker(db)
 
     # ✅ Para no tocar tus vistas: MainWindow lo setea una vez.
     def set_actor(self, actor_user_id: Optional[int]) -> None:
         self._actor_user_id = int(actor_user_id) if actor_user_id is not None else None
 
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """callback(group_code) después de cada alta/cambio guardado."""
+        self._listeners.append(callback)
+
+    def _notify(self, group_code: str) -> None:
+        # Al confirmar la transacción en curso (p.ej. la de ChangeSet.save); con rollback no se avisa
+        def notify() -> None:
+            for callback in self._listeners:
+                callback(group_code)
+
+        self.db.after_commit(notify)
+
+    @staticmethod
+    def _row_to_group(r, offset: int = 0) -> GroupInfo:
+        # Columnas: GroupCode, GroupName, ServiceName
+        r = r[offset:offset + 3]
+        return GroupInfo(
+            group_code="" if r[0] is None else str(r[0]),
+            group_name="" if r[1] is None else str(r[1]),
+            service_name="" if r[2] is None else str(r[2]),
+        )
+
     def list_groups(self, limit: int = 2000) -> List[GroupInfo]:
-        sql = f"""
-        SELECT TOP ({limit})
-            GroupCode, GroupName, ServiceName
-        FROM dbo.[Groups]
-        ORDER BY GroupCode ASC;
-        """
-        with self.db.get_connection() as conn:
+        sql = self.sql["groups.list"]
+
+        # Los diálogos de jobs la piden cada vez que abren: sale de la cache
+        def load() -> List[GroupInfo]:
+            with self.db.get_connection(read_only=True) as conn:
+                cur = conn.cursor()
+                rows = cur.execute(sql, (int(limit),)).fetchall()
+            return [self._row_to_group(r) for r in rows]
+
+        return self.db.cached(sql, (int(limit),), (TAG_GROUPS,), load)
+
+    def iter_groups(self, limit: Optional[int] = None, batch_size: Optional[int] = None) -> Iterator[GroupInfo]:
+        """Como list_groups, pero entrega filas a medida que llegan (fetchmany por lotes)."""
+        sql = self.sql["groups.list"]
+        with self.db.get_connection(read_only=True) as conn:
             cur = conn.cursor()
-            rows = cur.execute(sql).fetchall()
-
-        out: List[GroupInfo] = []
-        for r in rows:
-            out.append(
-                GroupInfo(
-                    group_code="" if r[0] is None else str(r[0]),
-                    group_name="" if r[1] is None else str(r[1]),
-                    service_name="" if r[2] is None else str(r[2]),
-                )
-            )
-        return out
+            cur.execute(sql, (int(limit or NO_LIMIT),))
+            for rows in fetch_batches(cur, batch_size or self.db.fetch_batch):
+                for r in rows:
+                    yield self._row_to_group(r)
+
+    def current_watermark(self) -> Watermark:
+        return self.changes.current()
+
+    def changes_since(self, since: Watermark) -> Delta:
+        """Grupos insertados o actualizados desde `since` (ver JobsRepository.changes_since)."""
+        if since.mode == MODE_ROWVERSION:
+            lo, hi, watermark = self.changes.rowversion_range(since)
+            with self.db.get_connection("list") as conn:
+                cur = conn.cursor()
+                rows = cur.execute(self.sql["groups.changed_rowversion"], (lo, hi)).fetchall()
+            return Delta([self._row_to_group(r) for r in rows], watermark)
+
+        changed, watermark = self.changes.audit_changes(("groups",), since)
+        codes = sorted(set(changed.get("groups", ())))
+        groups: List[GroupInfo] = []
+        size = IN_BUCKETS[-1]
+        with self.db.get_connection("list") as conn:
+            cur = conn.cursor()
+            for i in range(0, len(codes), size):
+                placeholders, params = in_params(codes[i:i + size])
+                rows = cur.execute(self.sql.groups_where(f"GroupCode IN ({placeholders})"), params).fetchall()
+                groups.extend(self._row_to_group(r) for r in rows)
+
+        return Delta(groups, watermark)
 
     def get_by_code(self, group_code: str) -> Optional[GroupInfo]:
-        sql = """
-        SELECT GroupCode, GroupName, ServiceName
-        FROM dbo.[Groups]
-        WHERE GroupCode = ?;
-        """
-        with self.db.get_connection() as conn:
+        sql = self.sql["groups.get_by_code"]
+        # Dentro de una transacción (snapshots de audit) se une a ella, o sea al primario
+        with self.db.get_connection(read_only=True) as conn:
             cur = conn.cursor()
             row = cur.execute(sql, (group_code,)).fetchone()
 
         if not row:
             return None
 
-        return GroupInfo(
-            group_code="" if row[0] is None else str(row[0]),
-            group_name="" if row[1] is None else str(row[1]),
-            service_name="" if row[2] is None else str(row[2]),
-        )
+        return self._row_to_group(row)
+
+    def get_groups_by_codes(self, group_codes: Iterable[str], for_update: bool = False) -> Dict[str, GroupInfo]:
+        """
+        Grupos por GroupCode en una sola consulta (los que no existen no aparecen).
+        for_update: bloqueados hasta el commit de la transacción abierta.
+        """
+        codes = sorted({str(c) for c in group_codes if c})
+        if not codes:
+            return {}
+        sql = self.sql["groups.by_codes_for_update" if for_update else "groups.by_codes"]
+        with self.db.get_connection(read_only=not for_update) as conn:
+            cur = conn.cursor()
+            rows = cur.execute(sql, (json.dumps(codes, ensure_ascii=False),)).fetchall()
+        groups = [self._row_to_group(r) for r in rows]
+        return {g.group_code: g for g in groups}
 
     @staticmethod
     def _to_audit_dict(g: GroupInfo) -> Dict[str, Any]:
@@ -79,63 +149,244 @@ class GroupsRepository:
                 changed.append(k)
         return sorted(changed)
 
-    def add_group(self, group_code: str, group_name: str, service_name: str) -> None:
-        sql = """
-        INSERT INTO dbo.[Groups] (GroupCode, GroupName, ServiceName, CreatedAtUtc)
-        VALUES (?, ?, ?, GETUTCDATE());
+    @classmethod
+    def audit_entry(
+        cls,
+        action: str,
+        group: GroupInfo,
+        old: Optional[GroupInfo],
+        new: Optional[GroupInfo],
+        summary: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
+        Entrada de audit de un grupo (para audit_repo.insert / insert_many), la misma en
+        altas, cambios, bajas e import. old / new: imágenes guardadas o None.
+        summary: texto propio en lugar del de la acción (p.ej. grupos creados por jobs).
+        """
+        old_dict = None if old is None else cls._to_audit_dict(old)
+        new_dict = None if new is None else cls._to_audit_dict(new)
+        if summary is None:
+            if action == "UPDATE":
+                changed = cls._diff_keys(old_dict or {}, new_dict or {})
+                summary = f"Updated group {group.group_code}: {', '.join(changed)}"
+            else:
+                summary = _AUDIT_SUMMARIES[action].format(name=group.group_name, code=group.group_code)
+        return {
+            "action": action,
+            "entity_name": "groups",
+            "entity_id": str(group.group_code),
+            "summary": summary,
+            "old_values": old_dict,
+            "new_values": new_dict,
+        }
+
+    def add_group(self, group_code: str, group_name: str, service_name: str) -> None:
+        sql = self.sql["groups.insert"]
+
+        # Insert + snapshot + audit en una sola conexión y un solo commit
+        with self.db.transaction():
+            with self.db.get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(sql, (group_code, group_name, service_name))
+                conn.commit()
+
+            self.search_index.index_group(group_code, group_name, service_name)
+            self.db.invalidate(TAG_GROUPS)
+
+            # Audit (INSERT)
+            if self.audit_repo is not None:
+                new_obj = self.get_by_code(group_code)
+                if new_obj:
+                    self.audit_repo.insert(
+                        actor_user_id=self._actor_user_id,
+                        **self.audit_entry("INSERT", new_obj, None, new_obj),
+                    )
+
+        self._notify(group_code)
+
+    def _exists(self, group_code: str) -> bool:
+        sql = self.sql["groups.exists"]
         with self.db.get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(sql, (group_code, group_name, service_name))
-            conn.commit()
-
-        # Audit (INSERT)
-        if self.audit_repo is not None:
-            new_obj = self.get_by_code(group_code)
-            if new_obj:
-                new_dict = self._to_audit_dict(new_obj)
+            return cur.execute(sql, (group_code,)).fetchone() is not None
+
+    def _update_group_sqlite(self, group_code: str, group_name: str, service_name: str) -> Optional[tuple]:
+        # SQLite no tiene OUTPUT DELETED: snapshot + UPDATE condicional + snapshot,
+        # dentro de la transacción abierta por update_group (misma forma de fila).
+        old_obj = self.get_by_code(group_code)
+        if old_obj is None:
+            return None
+
+        sql = self.sql["groups.update_sqlite"]
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, (group_name, service_name, group_code, group_name, service_name))
+            if cur.rowcount == 0:
+                return None
+
+        return astuple(old_obj) + astuple(self.get_by_code(group_code))
+
+    def update_group(self, group_code: str, group_name: str, service_name: str) -> bool:
+        """
+        Un solo statement: el UPDATE devuelve la imagen vieja (DELETED) y la nueva
+        (INSERTED) para el audit. Si los valores enviados son iguales a los
+        guardados no se escribe nada. Retorna True si hubo cambios.
+        """
+        sql = self.sql["groups.update"]
+
+        # Update + audit en una sola conexión y un solo commit
+        with self.db.transaction():
+            if self.db.dialect == "sqlite":
+                row = self._update_group_sqlite(group_code, group_name, service_name)
+            else:
+                with self.db.get_connection() as conn:
+                    cur = conn.cursor()
+                    row = cur.execute(
+                        sql, (group_name, service_name, group_code, group_name, service_name)
+                    ).fetchone()
+                    conn.commit()
+
+            if not row:
+                if not self._exists(group_code):
+                    raise ValueError("No se actualizó ningún grupo (GroupCode no encontrado).")
+                # si no cambió nada, no escribimos ni auditamos
+                return False
+
+            self.search_index.index_group(group_code, group_name, service_name)
+            self.db.invalidate(TAG_GROUPS)
+
+            # Audit (UPDATE)
+            if self.audit_repo is not None:
+                old, new = self._row_to_group(row), self._row_to_group(row, offset=3)
                 self.audit_repo.insert(
                     actor_user_id=self._actor_user_id,
-                    action="INSERT",
-                    entity_name="groups",
-                    entity_id=str(group_code),
-                    summary=f"Created group '{new_obj.group_name}' (code={new_obj.group_code})",
-                    old_values=None,
-                    new_values=new_dict,
+                    **self.audit_entry("UPDATE", new, old, new),
                 )
 
-    def update_group(self, group_code: str, group_name: str, service_name: str) -> None:
-        # Snapshot viejo para audit
-        old_obj = self.get_by_code(group_code) if self.audit_repo is not None else None
+        self._notify(group_code)
+        return True
 
-        sql = """
-        UPDATE dbo.[Groups]
-        SET GroupName = ?, ServiceName = ?
-        WHERE GroupCode = ?;
+    def update_groups(self, rows: Iterable[Tuple[str, str, str]]) -> List[str]:
         """
-        with self.db.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(sql, (group_name, service_name, group_code))
-            if cur.rowcount == 0:
-                raise ValueError("No se actualizó ningún grupo (GroupCode no encontrado).")
-            conn.commit()
-
-        # Audit (UPDATE)
-        if self.audit_repo is not None and old_obj is not None:
-            new_obj = self.get_by_code(group_code)
-            if new_obj:
-                old_dict = self._to_audit_dict(old_obj)
-                new_dict = self._to_audit_dict(new_obj)
-                changed = self._diff_keys(old_dict, new_dict)
-
-                # si no cambió nada, no auditamos
-                if changed:
-                    self.audit_repo.insert(
+        Cambio de muchos grupos: rows = (group_code, group_name, service_name).
+        Un UPDATE con OPENJSON (SQL Server) y el audit en un solo executemany, en una
+        transacción (se une a la del que llama). Retorna los GroupCode que cambiaron.
+        """
+        rows = [(str(c), str(n), str(s)) for c, n, s in rows]
+        if not rows:
+            return []
+
+        with self.db.transaction():
+            if self.db.dialect == "sqlite":
+                codes = [r[0] for r in rows]
+                before = self.get_groups_by_codes(codes)
+                with self.db.get_connection() as conn:
+                    conn.cursor().executemany(
+                        self.sql["groups.update_sqlite"], [(n, s, c, n, s) for c, n, s in rows]
+                    )
+                after = self.get_groups_by_codes(codes)
+                changed = {
+                    code: (before[code], after[code])
+                    for code in codes
+                    if code in before and before[code] != after[code]
+                }
+            else:
+                payload = json.dumps([list(r) for r in rows], ensure_ascii=False)
+                with self.db.get_connection() as conn:
+                    cur = conn.cursor()
+                    changed = {
+                        str(r[0]): (self._row_to_group(r), self._row_to_group(r, offset=3))
+                        for r in cur.execute(self.sql["groups.update_batch"], (payload,)).fetchall()
+                    }
+
+            if changed:
+                for _old, new in changed.values():
+                    self.search_index.index_group(new.group_code, new.group_name, new.service_name)
+                self.db.invalidate(TAG_GROUPS)
+
+                if self.audit_repo is not None:
+                    self.audit_repo.insert_many(
+                        [self.audit_entry("UPDATE", new, old, new) for old, new in changed.values()],
+                        actor_user_id=self._actor_user_id,
+                    )
+
+        for code in changed:
+            self._notify(code)
+        return sorted(changed)
+
+    def add_missing_groups(self, group_codes: Optional[Iterable[str]] = None, service_name: str = "") -> List[str]:
+        """
+        Crea en un solo INSERT ... SELECT los grupos que referencian jobs activos y no
+        existen en Groups (GroupName = GroupCode, ServiceName = service_name).
+        group_codes: solo esos (None = todos los que falten). Retorna los creados.
+        """
+        codes = None if group_codes is None else json.dumps(sorted({str(c) for c in group_codes}), ensure_ascii=False)
+        if codes == "[]":
+            return []
+
+        with self.db.transaction():
+            with self.db.get_connection() as conn:
+                cur = conn.cursor()
+                rows = cur.execute(self.sql["groups.insert_missing"], (service_name or "", codes, codes)).fetchall()
+            created = [self._row_to_group(r) for r in rows]
+
+            if created:
+                for g in created:
+                    self.search_index.index_group(g.group_code, g.group_name, g.service_name)
+                self.db.invalidate(TAG_GROUPS)
+
+                if self.audit_repo is not None:
+                    self.audit_repo.insert_many(
+                        [
+                            self.audit_entry(
+                                "INSERT", g, None, g,
+                                summary=f"Created missing group {g.group_code} (referenced by jobs)",
+                            )
+                            for g in created
+                        ],
+                        actor_user_id=self._actor_user_id,
+                    )
+
+        for g in created:
+            self._notify(g.group_code)
+        return sorted(g.group_code for g in created)
+
+    def delete_unused_groups(self, group_codes: Iterable[str]) -> List[str]:
+        """
+        Borra en un solo DELETE los grupos de la lista que no tienen ningún job (ni
+        retirado): lo que ganó un job mientras tanto no se borra. Retorna los borrados.
+        """
+        codes = sorted({str(c) for c in group_codes if c})
+        if not codes:
+            return []
+        payload = json.dumps(codes, ensure_ascii=False)
+
+        with self.db.transaction():
+            with self.db.get_connection() as conn:
+                cur = conn.cursor()
+                if self.db.dialect == "sqlite":
+                    # Sin DELETE ... OUTPUT: snapshot de los que siguen sin uso y DELETE
+                    rows = cur.execute(self.sql["groups.unused_by_codes"], (payload,)).fetchall()
+                    if rows:
+                        found = json.dumps([r[0] for r in rows], ensure_ascii=False)
+                        cur.execute(self.sql["groups.delete_sqlite"], (found,))
+                else:
+                    rows = cur.execute(self.sql["groups.delete_unused"], (payload,)).fetchall()
+            deleted = [self._row_to_group(r) for r in rows]
+
+            if deleted:
+                self.search_index.remove_groups(g.group_code for g in deleted)
+                self.db.invalidate(TAG_GROUPS)
+
+                if self.audit_repo is not None:
+                    self.audit_repo.insert_many(
+                        [
+                            self.audit_entry("DELETE", g, g, None, summary=f"Deleted unused group {g.group_code}")
+                            for g in deleted
+                        ],
                         actor_user_id=self._actor_user_id,
-                        action="UPDATE",
-                        entity_name="groups",
-                        entity_id=str(group_code),
-                        summary=f"Updated group {group_code}: {', '.join(changed)}",
-                        old_values=old_dict,
-                        new_values=new_dict,
-                    )
\ No newline at end of file
+                    )
+
+        for g in deleted:
+            self._notify(g.group_code)
+        return sorted(g.group_code for g in deleted)
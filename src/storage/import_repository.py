@@ -0,0 +1,232 @@
+import json
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.storage.database import Database
+from src.storage.groups_repository import GroupInfo, GroupsRepository
+from src.storage.jobs_repository import JobInfo, JobsRepository
+from src.storage.read_cache import TAG_GROUPS, TAG_JOBS
+from src.storage.statements import get_statements
+
+
+@dataclass(frozen=True)
+class StagedRow:
+    """Fila ya validada de un import (ver service/import_service)."""
+    row_num: int                    # fila en el archivo
+    type: str
+    job_name: str
+    group_code: str
+    severity: int
+    group_name: Optional[str]       # None = el grupo ya existe y el archivo no lo define
+    service_name: Optional[str]
+
+
+@dataclass(frozen=True)
+class ChunkResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    groups_inserted: int = 0
+    groups_updated: int = 0
+
+
+class ImportRepository:
+    """
+    Aplica un import de jobs/grupos por chunks, cada uno en una transacción corta:
+    staging (executemany) -> MERGE de grupos -> MERGE de jobs (clave JobName + GroupCode)
+    -> audit del chunk en un solo executemany -> borrado del staging.
+    La última fila de audit del chunk (entity_name = 'import') es el checkpoint:
+    se confirma junto con los datos, así que retomar nunca repite ni saltea filas.
+    """
+
+    def __init__(self, db: Database, jobs_repo: JobsRepository, groups_repo: GroupsRepository, audit_repo):
+        # El audit log es el checkpoint: sin él no se podría retomar ni saber qué cambió
+        if audit_repo is None:
+            raise ValueError("ImportRepository necesita audit_repo (el checkpoint va en el audit log).")
+        self.db = db
+        self.jobs_repo = jobs_repo
+        self.groups_repo = groups_repo
+        self.audit_repo = audit_repo
+        self.sql = get_statements()
+        self._actor_user_id: Optional[int] = None
+
+    def set_actor(self, actor_user_id: Optional[int]) -> None:
+        self._actor_user_id = int(actor_user_id) if actor_user_id is not None else None
+
+    def last_checkpoint(self, import_key: str) -> Optional[Dict[str, Any]]:
+        """Estado guardado en el último chunk confirmado de este import (o None)."""
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            row = cur.execute(self.sql["import.checkpoint"], (import_key,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    # ---------------- chunk ----------------
+
+    def apply_chunk(self, import_key: str, rows: List[StagedRow], checkpoint: Dict[str, Any]) -> ChunkResult:
+        """
+        Carga y aplica un chunk. checkpoint: estado del import hasta este chunk
+        (rows_done ya incluye sus filas); se le suman los contadores del chunk y se
+        guarda en el mismo commit.
+        """
+        group_out: List[tuple] = []
+        job_out: List[tuple] = []
+
+        with self.db.transaction():
+            if rows:
+                with self.db.get_connection("save") as conn:
+                    cur = conn.cursor()
+                    if self.db.dialect == "mssql":
+                        cur.fast_executemany = True
+                    cur.executemany(self.sql["import.stage_insert"], [
+                        (import_key, r.row_num, r.type, r.job_name, r.group_code,
+                         r.severity, r.group_name, r.service_name)
+                        for r in rows
+                    ])
+
+                    if self.db.dialect == "sqlite":
+                        group_out, job_out = self._merge_sqlite(cur, import_key)
+                    else:
+                        group_out = cur.execute(self.sql["import.groups_merge"], (import_key,)).fetchall()
+                        job_out = cur.execute(self.sql["import.jobs_merge"], (import_key,)).fetchall()
+
+                    cur.execute(self.sql["import.stage_clear"], (import_key,))
+
+            inserted = sum(1 for r in job_out if r[0] == "INSERT")
+            updated = len(job_out) - inserted
+            groups_inserted = sum(1 for r in group_out if r[0] == "INSERT")
+            result = ChunkResult(
+                inserted=inserted,
+                updated=updated,
+                unchanged=max(0, len(rows) - inserted - updated),
+                groups_inserted=groups_inserted,
+                groups_updated=len(group_out) - groups_inserted,
+            )
+
+            groups = [self._group_change(r) for r in group_out]
+            # Imagen nueva de todos los jobs del chunk en una consulta (ya con GroupName/ServiceName)
+            jobs = self.jobs_repo.get_jobs_by_ids(int(r[1]) for r in job_out)
+            entries = (
+                [self.groups_repo.audit_entry(action, new, old, new) for action, old, new in groups]
+                + self._job_entries(job_out, jobs)
+            )
+
+            for name in ("inserted", "updated", "unchanged", "groups_inserted", "groups_updated"):
+                checkpoint[name] = int(checkpoint.get(name, 0)) + getattr(result, name)
+            entries.append(self._checkpoint_entry(import_key, checkpoint))
+
+            self.audit_repo.insert_many(entries, actor_user_id=self._actor_user_id)
+
+            self._index(groups, job_out, jobs)
+            if job_out:
+                self.db.invalidate(TAG_JOBS)
+            if group_out:
+                self.db.invalidate(TAG_GROUPS)
+
+        return result
+
+    def _index(self, groups: List[Tuple[str, Optional[GroupInfo], GroupInfo]], job_out: List[tuple],
+               jobs: Dict[int, JobInfo]) -> None:
+        """Tokens de búsqueda en la transacción del chunk; fuzzy y listeners al confirmarla."""
+        for _action, _old, g in groups:
+            self.groups_repo.search_index.index_group(g.group_code, g.group_name, g.service_name)
+        # Tokens de los nuevos y de los reactivados (al retirarse se borraron)
+        self.jobs_repo.search_index.index_jobs(
+            (j.id, j.job_name, j.group_code)
+            for j in (jobs.get(int(r[1])) for r in job_out if r[0] == "INSERT" or not r[4])
+            if j is not None
+        )
+        self.jobs_repo.publish_saved((j.id, j.job_name, j.group_code) for j in jobs.values())
+
+    def finish(self, import_key: str, checkpoint: Dict[str, Any]) -> None:
+        """Marca el import como terminado (un nuevo import del mismo archivo empieza de cero)."""
+        checkpoint["done"] = True
+        self.audit_repo.insert_many(
+            [self._checkpoint_entry(import_key, checkpoint)],
+            actor_user_id=self._actor_user_id,
+        )
+
+    @staticmethod
+    def _checkpoint_entry(import_key: str, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+        state = "terminado" if checkpoint.get("done") else f"{checkpoint.get('rows_done', 0)} filas"
+        return {
+            "action": "IMPORT",
+            "entity_name": "import",
+            "entity_id": import_key,
+            "summary": f"Import {checkpoint.get('file', '')}: {state}",
+            "old_values": None,
+            "new_values": checkpoint,
+        }
+
+    def _merge_sqlite(self, cur, import_key: str) -> Tuple[List[tuple], List[tuple]]:
+        # Mismas filas que devuelven los OUTPUT de import.groups_merge / import.jobs_merge
+        group_out = []
+        for code, name, service, old_code, old_name, old_service in cur.execute(
+            self.sql["import.groups_staged"], (import_key,)
+        ).fetchall():
+            if old_code is None:
+                cur.execute(self.sql["groups.insert"], (code, name, service))
+                group_out.append(("INSERT", code, None, None, name, service))
+            elif (old_name, old_service) != (name, service):
+                cur.execute(self.sql["groups.update_sqlite"], (name, service, code, name, service))
+                group_out.append(("UPDATE", code, old_name, old_service, name, service))
+
+        job_out = []
+        changed = [
+            (job_id, old_type, old_sev, old_active, new_type, new_sev)
+            for job_id, old_type, old_sev, old_active, new_type, new_sev in cur.execute(
+                self.sql["import.jobs_matched"], (import_key,)
+            ).fetchall()
+            if (old_type, old_sev) != (new_type, new_sev) or not old_active
+        ]
+        if changed:
+            cur.executemany(
+                self.sql["import.job_update_sqlite"], [(t, s, job_id) for job_id, _ot, _os, _oa, t, s in changed]
+            )
+            job_out.extend(
+                ("UPDATE", job_id, old_type, old_sev, old_active)
+                for job_id, old_type, old_sev, old_active, _t, _s in changed
+            )
+
+        max_id = int(cur.execute(self.sql["import.max_job_id"]).fetchone()[0] or 0)
+        cur.execute(self.sql["import.jobs_insert_sqlite"], (import_key,))
+        for (job_id,) in cur.execute(self.sql["import.jobs_inserted_sqlite"], (import_key, max_id)).fetchall():
+            job_out.append(("INSERT", job_id, None, None, None))
+
+        return group_out, job_out
+
+    # ---------------- audit ----------------
+
+    @staticmethod
+    def _group_change(out: tuple) -> Tuple[str, Optional[GroupInfo], GroupInfo]:
+        """Fila del OUTPUT del MERGE de grupos -> (acción, imagen vieja o None, nueva)."""
+        action, code, old_name, old_service, name, service = out
+        new = GroupInfo(str(code), "" if name is None else str(name), "" if service is None else str(service))
+        if action == "INSERT":
+            return action, None, new
+        old = replace(
+            new,
+            group_name="" if old_name is None else str(old_name),
+            service_name="" if old_service is None else str(old_service),
+        )
+        return action, old, new
+
+    def _job_entries(self, job_out: List[tuple], jobs: Dict[int, JobInfo]) -> List[Dict[str, Any]]:
+        entries = []
+        for action, job_id, old_type, old_sev, old_active in job_out:
+            new = jobs.get(int(job_id))
+            if new is None:
+                continue
+            if action == "INSERT":
+                entries.append(self.jobs_repo.change_entry(None, new))
+                continue
+
+            # El MERGE solo cambia Type/Severity (JobName + GroupCode son la clave)
+            old = replace(
+                new,
+                type="" if old_type is None else str(old_type),
+                severity="" if old_sev is None else str(old_sev),
+            )
+            entries.append(self.jobs_repo.change_entry(old, new, reactivated=not old_active))
+        return entries
@@ -0,0 +1,245 @@
+import threading
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+Q = 3                # trigramas
+PREFIX = 24          # solo se indexan los primeros PREFIX caracteres de cada nombre
+MAX_DISTANCE = 2
+_PAD = "\x00" * (Q - 1)
+
+
+def max_distance_for(term: str) -> int:
+    """Errores tolerados según el largo de lo buscado (con 4 letras no hay margen)."""
+    n = len(term)
+    if n < 5:
+        return 0
+    if n < 10:
+        return 1
+    return MAX_DISTANCE
+
+
+def _grams(text: str) -> List[str]:
+    """
+    Trigramas con su posición (clave = trigrama + chr(posición)), con relleno al inicio.
+    Como lo buscado se compara con el comienzo del nombre, un trigrama solo cuenta
+    si aparece cerca de la misma posición: "billing" en medio del nombre no es candidato.
+    """
+    padded = _PAD + text[:PREFIX]
+    return [padded[i:i + Q] + chr(i) for i in range(len(padded) - Q + 1)]
+
+
+def prefix_distance(term: str, text: str, k: int) -> int:
+    """
+    Ediciones mínimas para que `term` sea el comienzo de `text` (Levenshtein más
+    trasposición de dos letras vecinas, el error de tipeo más común: "bakcup").
+    Acotada: solo se calcula la banda |i - j| <= k y si pasa de k retorna k + 1.
+    """
+    if text.startswith(term):
+        return 0
+
+    big = k + 1
+    n = min(len(text), len(term) + k)
+    prev = [j if j <= k else big for j in range(n + 1)]
+    prev2 = prev
+
+    for i in range(1, len(term) + 1):
+        c = term[i - 1]
+        cur = [big] * (n + 1)
+        if i <= k:
+            cur[0] = i
+        best = cur[0]
+        for j in range(max(1, i - k), min(n, i + k) + 1):
+            v = prev[j - 1] + (c != text[j - 1])
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            if i > 1 and j > 1 and c == text[j - 2] and term[i - 2] == text[j - 1] and prev2[j - 2] + 1 < v:
+                v = prev2[j - 2] + 1
+            cur[j] = v
+            if v < best:
+                best = v
+        if best > k:
+            return big
+        prev2, prev = prev, cur
+
+    return min(min(prev), big)
+
+
+class _GramIndex:
+    """
+    Textos por clave entera con postings de trigramas posicionales en array (8 bytes por entrada).
+    Un cambio agrega postings nuevos sin borrar los viejos: como todo candidato
+    se verifica contra el texto actual, los restos solo cuestan una verificación.
+    """
+
+    def __init__(self):
+        self.texts: Dict[int, str] = {}
+        self.grams: Dict[str, array] = {}
+
+    def set(self, key: int, text: str) -> None:
+        text = (text or "").lower()
+        if self.texts.get(key) == text:
+            return
+        self.texts[key] = text
+        for g in _grams(text):
+            postings = self.grams.get(g)
+            if postings is None:
+                postings = self.grams[g] = array("q")
+            postings.append(key)
+
+    def search(self, term: str, k: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        (distancia, clave) de los textos que empiezan "casi" con term (<= k errores).
+        Con limit: al menos los `limit` más cercanos (a igual distancia, los que
+        comparten más trigramas).
+        """
+        # Lo que queda del término dentro de los PREFIX caracteres indexados
+        grams = _grams(term[:max(PREFIX - k, Q)])
+        # Cada error rompe como mucho Q + 1 trigramas (una trasposición toca dos letras)
+        # y corre los siguientes a lo sumo k posiciones: un texto a distancia <= k tiene
+        # al menos len(grams) - (Q + 1)*k de ellos en posición +-k.
+        # Si el término es corto se toleran menos errores.
+        k = min(k, (len(grams) - 1) // (Q + 1))
+        need = len(grams) - (Q + 1) * k
+
+        counts: Counter = Counter()
+        for g in grams:
+            gram, pos = g[:Q], ord(g[Q])
+            shifted = [
+                postings for postings in (self.grams.get(gram + chr(p)) for p in range(max(0, pos - k), pos + k + 1))
+                if postings is not None
+            ]
+            # Un trigrama cuenta una vez por texto aunque aparezca en varias posiciones
+            counts.update(shifted[0] if len(shifted) == 1 else set(chain.from_iterable(shifted)))
+
+        # Más trigramas compartidos primero: de ahí sale una cota inferior de la distancia
+        # (ceil((len(grams) - n) / (Q + 1))), así que se corta apenas hay `limit` resultados
+        # que ningún candidato restante puede mejorar.
+        hits: List[Tuple[int, int]] = []
+        within = [0] * (k + 1)  # hits por distancia
+        for key, n in counts.most_common():
+            if n < need:
+                break
+            if limit is not None:
+                bound = max(0, -((n - len(grams)) // (Q + 1)))
+                if sum(within[:bound + 1]) >= limit:
+                    break
+            text = self.texts.get(key)
+            if text is None:
+                continue
+            d = prefix_distance(term, text, k)
+            if d <= k:
+                hits.append((d, key))
+                within[d] += 1
+        return hits
+
+
+class _GroupIndexes:
+    """GroupCode distintos (pocos) con los jobs de cada uno."""
+
+    def __init__(self):
+        self.index = _GramIndex()               # clave = número de grupo
+        self.keys: Dict[str, int] = {}
+        self.jobs: Dict[int, Set[int]] = {}
+        self.job_group: Dict[int, int] = {}
+
+    def assign(self, job_id: int, group_code: str) -> None:
+        code = (group_code or "").lower()
+        key = self.keys.get(code)
+        if key is None:
+            key = self.keys[code] = len(self.keys)
+            self.index.set(key, code)
+
+        old = self.job_group.get(job_id)
+        if old == key:
+            return
+        if old is not None:
+            self.jobs[old].discard(job_id)
+        self.job_group[job_id] = key
+        self.jobs.setdefault(key, set()).add(job_id)
+
+    def discard(self, job_id: int) -> None:
+        key = self.job_group.pop(job_id, None)
+        if key is not None:
+            self.jobs[key].discard(job_id)
+
+
+class FuzzyJobIndex:
+    """
+    Búsqueda tolerante a errores de tipeo por JobName y GroupCode.
+    - La distancia es la de lo buscado contra el comienzo del nombre: "etl_pamy"
+      encuentra ETL_PAYMENTS_DAILY, y un nombre completo mal escrito también.
+    - Los candidatos salen de los trigramas (filtro por cantidad compartida) y solo
+      esos pasan por la distancia acotada: no se recorren los cientos de miles de nombres.
+    - search() devuelve (job_id, distancia): primero los más parecidos, y a igual
+      distancia los que coinciden por JobName antes que por GroupCode.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = _GramIndex()              # clave = Id del job
+        self._groups = _GroupIndexes()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._names.texts)
+
+    def load(self, rows: Iterable[Tuple[int, str, str]]) -> int:
+        """(Id, JobName, GroupCode) de todo el catálogo. Retorna la cantidad de jobs."""
+        names = _GramIndex()
+        groups = _GroupIndexes()
+        for job_id, job_name, group_code in rows:
+            names.set(int(job_id), job_name)
+            groups.assign(int(job_id), group_code)
+
+        with self._lock:
+            self._names, self._groups = names, groups
+            self.ready = True
+        return len(names.texts)
+
+    def index_job(self, job_id: int, job_name: str, group_code: str) -> None:
+        """Alta o cambio de un job (no hace nada si el índice todavía no se cargó)."""
+        with self._lock:
+            if not self.ready:
+                return
+            self._names.set(int(job_id), job_name)
+            self._groups.assign(int(job_id), group_code)
+
+    def remove_jobs(self, job_ids: Iterable[int]) -> None:
+        """Jobs retirados o purgados: dejan de aparecer (los postings viejos se ignoran)."""
+        with self._lock:
+            if not self.ready:
+                return
+            for job_id in job_ids:
+                self._names.texts.pop(int(job_id), None)
+                self._groups.discard(int(job_id))
+
+    def search(self, term: str, limit: int = 20, max_distance: Optional[int] = None) -> List[Tuple[int, int]]:
+        term = (term or "").strip().lower()
+        if not term:
+            return []
+        k = max_distance_for(term) if max_distance is None else max(0, int(max_distance))
+
+        with self._lock:
+            ranked = [
+                (d, 0, len(self._names.texts[job_id]), job_id)
+                for d, job_id in self._names.search(term, k, limit)
+            ]
+            for d, key in self._groups.index.search(term, k, limit):
+                ranked.extend((d, 1, 0, job_id) for job_id in self._groups.jobs.get(key, ()))
+
+        ranked.sort()
+        out: List[Tuple[int, int]] = []
+        seen = set()
+        for d, _by_group, _length, job_id in ranked:
+            if job_id in seen:
+                continue
+            seen.add(job_id)
+            out.append((job_id, d))
+            if len(out) >= limit:
+                break
+        return out
@@ -0,0 +1,237 @@
+import threading
+from itertools import compress
+from dataclasses import replace
+from typing import Dict, List, Optional, Set
+
+from src.storage.job_query import parse_query
+from src.storage.job_store import JobRowList, JobStore
+from src.storage.jobs_repository import JobInfo, JobsRepository
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class JobSearchIndex:
+    """
+    Índice en memoria del catálogo de jobs (ya con GroupName/ServiceName) para
+    filtrar el grid sin ir a la DB en cada tecla.
+    - load() trae todo una vez a un JobStore (columnas); se puede correr en un hilo.
+    - search(term) = mismo resultado que LIKE '%term%' (sin distinguir mayúsculas)
+      en JobName/GroupCode/GroupName/ServiceName: trigramas para los candidatos
+      y verificación por substring; términos de menos de 3 letras recorren todo.
+      Devuelve vistas JobRow (mismos atributos que JobInfo).
+    - Se mantiene solo: escucha los guardados de JobsRepository/GroupsRepository
+      y relee únicamente el job o los jobs del grupo que cambiaron. Solo guarda
+      jobs activos: los retirados o purgados salen del índice.
+    """
+
+    def __init__(self, jobs_repo: JobsRepository, groups_repo=None):
+        self.jobs_repo = jobs_repo
+        self.groups_repo = groups_repo
+        self._lock = threading.RLock()
+
+        # Los postings guardan la posición de la fila en el store (estable hasta
+        # que se compacta, ver _remove), no el Id
+        self.store = JobStore()
+        self._grams: Dict[str, Set[int]] = {}
+        self._group_text: Dict[int, str] = {}
+        self._order: Optional[List[int]] = None  # filas por (CreatedAtUtc, Id) DESC, lazy
+
+        self.ready = False
+        self._loading = False
+        self._pending_jobs: Set[int] = set()
+        self._pending_groups: Set[str] = set()
+
+        jobs_repo.add_listener(self.refresh_jobs)
+        if groups_repo is not None:
+            groups_repo.add_listener(self.refresh_group)
+
+    # ---------------- carga ----------------
+
+    def load(self) -> int:
+        """Carga (o recarga) el catálogo completo. Retorna la cantidad de jobs."""
+        with self._lock:
+            self._loading = True
+            self._pending_jobs.clear()
+            self._pending_groups.clear()
+
+        try:
+            store = JobStore.load(self.jobs_repo)
+        except Exception:
+            with self._lock:
+                self._loading = False
+            raise
+
+        with self._lock:
+            self.store, self._grams, self._group_text = store, {}, {}
+            for i in store.select():
+                self._index_row(i)
+            self._order = None
+            self._ordered_rows()
+            self.ready = True
+            self._loading = False
+            pending_jobs, self._pending_jobs = self._pending_jobs, set()
+            pending_groups, self._pending_groups = self._pending_groups, set()
+
+        # Guardados que llegaron mientras se cargaba
+        if pending_jobs:
+            self.refresh_jobs(sorted(pending_jobs))
+        for group_code in pending_groups:
+            self.refresh_group(group_code)
+
+        return len(store)
+
+    # ---------------- mantenimiento ----------------
+
+    def _text(self, i: int) -> str:
+        # Un campo por línea: el término no puede "cruzar" de un campo al otro
+        code = self.store.group_codes[i]
+        group = self._group_text.get(code)
+        if group is None:
+            group = self._group_text[code] = "\n".join(self.store.groups.values[code]).lower()
+        return self.store.job_names[i].lower() + "\n" + group
+
+    def _index_row(self, i: int) -> None:
+        for g in _trigrams(self._text(i)):
+            self._grams.setdefault(g, set()).add(i)
+
+    def _unindex_row(self, i: int) -> None:
+        for g in _trigrams(self._text(i)):
+            rows = self._grams.get(g)
+            if rows is not None:
+                rows.discard(i)
+                if not rows:
+                    del self._grams[g]
+
+    def _upsert(self, j: JobInfo) -> None:
+        i = self.store.index_of(j.id)
+        if i is not None:
+            self._unindex_row(i)
+        self.store.upsert([j])
+        self._index_row(self.store.index_of(j.id))
+        self._order = None
+
+    def _remove(self, job_ids) -> None:
+        for job_id in job_ids:
+            i = self.store.index_of(job_id)
+            if i is not None:
+                self._unindex_row(i)
+                self.store.remove([job_id])
+                self._order = None
+        if self.store.needs_compaction():
+            self._compact()
+
+    def _compact(self) -> None:
+        # Store nuevo sin filas muertas: cambian las posiciones, se rearman los
+        # postings. Los resultados ya entregados siguen apuntando al store viejo.
+        store = self.store.compacted()
+        self.store, self._grams, self._group_text = store, {}, {}
+        for i in range(len(store.ids)):
+            self._index_row(i)
+        self._order = None
+
+    def refresh_job(self, job_id: int) -> None:
+        """Relee un job de la DB y lo reemplaza en el índice."""
+        self.refresh_jobs([job_id])
+
+    def refresh_jobs(self, job_ids: List[int]) -> None:
+        """Relee varios jobs en una sola consulta (guardados en lote) y los reemplaza."""
+        with self._lock:
+            if self._loading:
+                self._pending_jobs.update(int(x) for x in job_ids)
+                return
+            if not self.ready:
+                return
+
+        jobs = self.jobs_repo.get_jobs_by_ids(job_ids, active_only=True)
+        with self._lock:
+            for job in jobs.values():
+                self._upsert(job)
+            # Los que no volvieron se retiraron o se purgaron
+            self._remove(int(x) for x in job_ids if int(x) not in jobs)
+
+    def apply(self, jobs: List[JobInfo], removed=()) -> None:
+        """
+        Mezcla filas ya leídas (p.ej. JobsRepository.changes_since) sin ir a la DB;
+        removed = Id que ya no se listan (Delta.removed).
+        """
+        with self._lock:
+            if not self.ready:
+                return
+            for j in jobs:
+                self._upsert(j)
+            self._remove(removed)
+
+    def refresh_group(self, group_code: str) -> None:
+        """Actualiza GroupName/ServiceName de los jobs del grupo (sin releer los jobs)."""
+        with self._lock:
+            if self._loading:
+                self._pending_groups.add(group_code)
+                return
+            if not self.ready or self.groups_repo is None:
+                return
+
+        group = self.groups_repo.get_by_code(group_code)
+        name = group.group_name if group else ""
+        service = group.service_name if group else ""
+
+        with self._lock:
+            for i in self.store.select(group_codes=[group_code]):
+                row = self.store.row(i)
+                if (row.group_name, row.service_name) != (name, service):
+                    self._upsert(replace(row.to_info(), group_name=name, service_name=service))
+
+    # ---------------- consulta ----------------
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _ordered_rows(self) -> List[int]:
+        if self._order is None:
+            self._order = self.store.order(self.store.select())
+        return self._order
+
+    def search(self, term: Optional[str] = None, limit: Optional[int] = None) -> JobRowList:
+        """
+        Jobs que contienen `term`, en el mismo orden que el grid (CreatedAtUtc, Id DESC).
+        Acepta la sintaxis con campos de job_query (group:FIN* prio:2 ...): el texto
+        libre pasa por los trigramas y las condiciones se evalúan sobre esas filas.
+        Las vistas JobRow se crean al leer (el grid solo lee una página).
+        """
+        query = parse_query(term)
+        term = query.text.lower()
+
+        with self._lock:
+            order = self._ordered_rows()
+
+            if not term:
+                rows = order
+            else:
+                grams = _trigrams(term)
+                if grams:
+                    # Intersección empezando por el trigrama más raro
+                    postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+                    candidates = set(postings[0])
+                    for p in postings[1:]:
+                        candidates &= p
+                        if not candidates:
+                            break
+                    candidates = sorted(candidates)
+                else:
+                    candidates = None
+
+                # Verificación por substring en columnas (JobStore.select, sin bucle de Python)
+                hits = self.store.select(term=term, indices=candidates)
+                if len(hits) * 8 < len(order):
+                    rows = self.store.order(hits)
+                else:
+                    hit_set = set(hits)
+                    rows = list(compress(order, map(hit_set.__contains__, order)))
+
+            if query.is_fielded:
+                rows = [i for i in rows if query.matches_fields(self.store.row(i))]
+
+            if limit is not None:
+                rows = rows[:int(limit)]
+            return self.store.rows(rows)
@@ -0,0 +1,228 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional, Tuple
+
+from src.storage.job_search import SEARCH_LIKE, search_clause
+from src.util.dt import to_micros
+
+
+# campo -> (columna SQL, atributo de JobInfo/JobRow, tipo)
+# tipo "prio": Priority del grid, se compara como Severity (ver _PRIO_OFFSET)
+FIELDS = {
+    "name": ("j.JobName", "job_name", "text"),
+    "type": ("j.Type", "type", "text"),
+    "group": ("j.GroupCode", "group_code", "text"),
+    "gname": ("g.GroupName", "group_name", "text"),
+    "svc": ("g.ServiceName", "service_name", "text"),
+    "id": ("j.Id", "id", "int"),
+    "sev": ("j.Severity", "severity", "int"),
+    "prio": ("j.Severity", "severity", "prio"),
+    "created": ("j.CreatedAtUtc", "created_at_utc", "date"),
+}
+
+ALIASES = {
+    "job": "name",
+    "grp": "group",
+    "groupname": "gname",
+    "service": "svc",
+    "severity": "sev",
+    "date": "created",
+    "priority": "prio",
+}
+
+# Priority (lo que muestra el grid) = Severity - 1, p.ej. Severity 3 = Priority 2
+# (ver MainWindow.SEVERITY_TO_PRIORITY): sev = prio + _PRIO_OFFSET
+_PRIO_OFFSET = 1
+
+_TERM_RE = re.compile(r'(?:(\w+):)?("(?:[^"]*)"?|\S+)')
+_CMP_RE = re.compile(r"^(>=|<=|>|<|=)?(.*)$")
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str      # clave de FIELDS
+    op: str         # "=", "prefix", ">", ">=", "<", "<="
+    value: Any      # str | int | datetime
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("[", "\\[")
+
+
+def _parse_date(raw: str) -> Tuple[datetime, bool]:
+    """(valor, es_dia_completo). Acepta 2026-01-01 y 2026-01-01T10:00 / 2026-01-01 10:00."""
+    value = datetime.fromisoformat(raw)
+    return value, len(raw) == 10
+
+
+def _compare_conditions(field: str, kind: str, raw: str) -> Tuple[Condition, ...]:
+    """>x, >=x, <x, <=x, =x, x, a..b para campos int/date."""
+    if ".." in raw:
+        lo, hi = raw.split("..", 1)
+        out = ()
+        if lo:
+            out += _compare_conditions(field, kind, ">=" + lo)
+        if hi:
+            out += _compare_conditions(field, kind, "<=" + hi)
+        if not out:
+            raise ValueError(raw)
+        return out
+
+    op, value = _CMP_RE.match(raw).groups()
+    op = op or "="
+
+    if kind == "int":
+        return (Condition(field, op, int(value)),)
+
+    day_value, whole_day = _parse_date(value)
+    if not whole_day:
+        return (Condition(field, op, day_value),)
+
+    # Un día completo es el rango [d, d+1): así la comparación sigue siendo sargable
+    next_day = day_value + timedelta(days=1)
+    if op == "=":
+        return Condition(field, ">=", day_value), Condition(field, "<", next_day)
+    if op == ">":
+        return (Condition(field, ">=", next_day),)
+    if op == "<=":
+        return (Condition(field, "<", next_day),)
+    return (Condition(field, op, day_value),)
+
+
+def _text_condition(field: str, raw: str) -> Condition:
+    # ^x o x* = prefijo (LIKE 'x%', usa índice); si no, igualdad
+    if raw.startswith("^"):
+        return Condition(field, "prefix", raw[1:])
+    if raw.endswith("*"):
+        return Condition(field, "prefix", raw[:-1])
+    return Condition(field, "=", raw)
+
+
+@dataclass(frozen=True)
+class JobQuery:
+    """
+    Búsqueda con campos, p.ej.  group:FIN* svc:"Payments" prio:2 name:^ETL_ created:>2026-01-01
+    - texto: x (igual), x* o ^x (prefijo), "con espacios".
+    - id / sev / prio / created: =x, >x, >=x, <x, <=x, a..b (created acepta fecha o fecha+hora).
+    - Lo que no es campo:valor (o no se pudo interpretar) queda como texto libre
+      y usa el modo de búsqueda normal del repositorio.
+    """
+
+    conditions: Tuple[Condition, ...]
+    text: str
+
+    @property
+    def is_fielded(self) -> bool:
+        return bool(self.conditions)
+
+    # ---------------- SQL ----------------
+
+    def to_sql(self, mode: str = SEARCH_LIKE, dialect: str = "mssql") -> Tuple[str, tuple]:
+        """WHERE de jobs (alias j / g de _JOB_SELECT) y sus parámetros."""
+        parts = []
+        params: tuple = ()
+
+        for c in self.conditions:
+            column = FIELDS[c.field][0]
+            value = c.value
+            if isinstance(value, datetime) and dialect == "sqlite":
+                # En SQLite CreatedAtUtc es texto ISO: se compara como texto
+                value = value.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+
+            if c.op == "prefix":
+                parts.append(f"{column} LIKE ? ESCAPE '\\'")
+                params += (_escape_like(value) + "%",)
+            elif dialect == "sqlite" and FIELDS[c.field][2] == "text":
+                # Igual que la collation CI de SQL Server
+                parts.append(f"{column} {c.op} ? COLLATE NOCASE")
+                params += (value,)
+            else:
+                parts.append(f"{column} {c.op} ?")
+                params += (value,)
+
+        if self.text:
+            where, text_params = search_clause(mode, self.text, dialect)
+            parts.append(f"({where})")
+            params += text_params
+
+        if not parts:
+            return "1 = 1", ()
+        return "\n            AND ".join(parts), params
+
+    # ---------------- en memoria ----------------
+
+    def matches_fields(self, job) -> bool:
+        """Solo las condiciones campo:valor, sobre un JobInfo / JobRow."""
+        for c in self.conditions:
+            _column, attr, kind = FIELDS[c.field]
+            raw = getattr(job, attr)
+
+            if kind == "text":
+                left, right = (raw or "").lower(), str(c.value).lower()
+                if c.op == "prefix":
+                    ok = left.startswith(right)
+                else:
+                    ok = left == right
+            else:
+                if raw in (None, ""):
+                    return False
+                if kind == "int":
+                    left, right = int(raw), int(c.value)
+                else:
+                    left, right = to_micros(raw), to_micros(c.value)
+                ok = {
+                    "=": left == right,
+                    ">": left > right,
+                    ">=": left >= right,
+                    "<": left < right,
+                    "<=": left <= right,
+                }[c.op]
+
+            if not ok:
+                return False
+        return True
+
+    def matches(self, job) -> bool:
+        """Condiciones + texto libre (substring, como el modo like) sobre un JobInfo / JobRow."""
+        if not self.matches_fields(job):
+            return False
+        if not self.text:
+            return True
+        t = self.text.lower()
+        return any(
+            t in (v or "").lower()
+            for v in (job.job_name, job.group_code, job.group_name, job.service_name)
+        )
+
+
+def parse_query(search: Optional[str]) -> JobQuery:
+    conditions = []
+    text = []
+
+    for m in _TERM_RE.finditer(search or ""):
+        field, raw = m.group(1), m.group(2)
+        value = raw[1:].rstrip('"') if raw.startswith('"') else raw
+        key = ALIASES.get(field.lower(), field.lower()) if field else None
+
+        if not field:
+            text.append(value)
+            continue
+        if key not in FIELDS or not value:
+            text.append(m.group(0))
+            continue
+
+        kind = FIELDS[key][2]
+        try:
+            if kind == "prio":
+                conds = _compare_conditions("sev", "int", value)
+                conditions.extend(Condition(c.field, c.op, c.value + _PRIO_OFFSET) for c in conds)
+            elif kind == "text":
+                conditions.append(_text_condition(key, value))
+            else:
+                conditions.extend(_compare_conditions(key, kind, value))
+        except ValueError:
+            # Valor a medio escribir (p.ej. created:>2026-0): se trata como texto libre
+            text.append(m.group(0))
+
+    return JobQuery(tuple(conditions), " ".join(text).strip())
@@ -0,0 +1,196 @@
+import json
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from src.storage.database import Database, _get_bool
+from src.storage.read_cache import TAG_GROUPS, TAG_JOBS
+from src.storage.statements import get_statements
+
+
+# Modos de búsqueda de jobs (JOBS_SEARCH_MODE, o JobsRepository.set_search_mode en runtime)
+SEARCH_LIKE = "like"          # LIKE '%term%' en 4 columnas (scan completo, comportamiento original)
+SEARCH_FULLTEXT = "fulltext"  # CONTAINS() sobre índices full-text de SQL Server
+SEARCH_TOKENS = "tokens"      # tablas de tokens mantenidas por los repositorios (seek por índice)
+SEARCH_FUZZY = "fuzzy"        # tolerante a errores de tipeo, en memoria (ver job_fuzzy)
+SEARCH_MODES = (SEARCH_LIKE, SEARCH_FULLTEXT, SEARCH_TOKENS, SEARCH_FUZZY)
+
+MAX_WORDS = 8
+MAX_TOKEN_LEN = 100
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def default_search_mode() -> str:
+    mode = os.getenv("JOBS_SEARCH_MODE", SEARCH_LIKE).strip().lower()
+    return mode if mode in SEARCH_MODES else SEARCH_LIKE
+
+
+def tokenize(*texts: Optional[str]) -> List[str]:
+    """
+    Palabras en minúsculas, sin repetir, cortando en todo lo que no sea letra o dígito
+    (ETL_PAY-01 -> etl, pay, 01). Es lo mismo para lo indexado y para lo buscado.
+    """
+    seen = []
+    for text in texts:
+        for tok in _TOKEN_RE.findall((text or "").lower()):
+            tok = tok[:MAX_TOKEN_LEN]
+            if tok not in seen:
+                seen.append(tok)
+    return seen
+
+
+def search_clause(mode: str, search: str, dialect: str = "mssql") -> Tuple[str, tuple]:
+    """
+    WHERE de jobs (alias j / g de _JOB_SELECT) y sus parámetros.
+    - fulltext / tokens: cada palabra es un prefijo y deben aparecer todas
+      (en el job o en su grupo). "etl pay" encuentra ETL_PAYMENTS_DAILY.
+    - fulltext en SQLite cae a tokens (no hay CONTAINS).
+    - fuzzy no es SQL: cuando llega acá (p.ej. texto junto a campos) se usa LIKE.
+    """
+    if mode == SEARCH_FULLTEXT and dialect != "mssql":
+        mode = SEARCH_TOKENS
+    if mode == SEARCH_FUZZY:
+        mode = SEARCH_LIKE
+
+    if mode == SEARCH_LIKE:
+        like = f"%{search}%"
+        return (
+            "(j.JobName LIKE ? OR j.GroupCode LIKE ? OR g.GroupName LIKE ? OR g.ServiceName LIKE ?)",
+            (like, like, like, like),
+        )
+
+    words = tokenize(search)[:MAX_WORDS]
+    if not words:
+        # Solo símbolos: nada que buscar por palabra
+        return "1 = 0", ()
+
+    parts = []
+    params: tuple = ()
+    for w in words:
+        if mode == SEARCH_FULLTEXT:
+            parts.append(
+                "(CONTAINS((j.JobName, j.GroupCode), ?) OR CONTAINS((g.GroupName, g.ServiceName), ?))"
+            )
+            term = f'"{w}*"'
+            params += (term, term)
+        else:
+            parts.append(
+                "(j.Id IN (SELECT t.JobId FROM dbo.Jobs_search_tokens AS t WHERE t.Token LIKE ?)"
+                " OR j.GroupCode IN (SELECT t.GroupCode FROM dbo.Groups_search_tokens AS t WHERE t.Token LIKE ?))"
+            )
+            # Solo [0-9a-z]: no hay comodines que escapar y el LIKE 'x%' es sargable
+            prefix = f"{w}%"
+            params += (prefix, prefix)
+
+    return "\n            AND ".join(parts), params
+
+
+class SearchTokenIndex:
+    """
+    Mantiene Jobs_search_tokens / Groups_search_tokens para el modo "tokens".
+    - Los repositorios llaman index_job / index_group dentro de su transacción.
+    - rebuild() llena las tablas desde cero (primera vez o después de cargas externas).
+    - En SQL Server se activa con JOBS_SEARCH_TOKENS=1 (las tablas deben existir,
+      ver README); en SQLite el esquema ya las trae y siempre se mantienen.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.sql = get_statements()
+        self.enabled = db.dialect == "sqlite" or _get_bool("JOBS_SEARCH_TOKENS")
+
+    def index_job(self, job_id: int, job_name: str, group_code: str) -> None:
+        if not self.enabled:
+            return
+        self._replace(
+            "search.job_tokens_delete", "search.job_tokens_insert",
+            int(job_id), tokenize(job_name, group_code),
+        )
+
+    def index_jobs(self, jobs: Iterable[Tuple[int, str, str]]) -> None:
+        """Lote de (Id, JobName, GroupCode): un executemany para borrar y otro para insertar."""
+        if not self.enabled:
+            return
+        jobs = [(int(job_id), job_name, group_code) for job_id, job_name, group_code in jobs]
+        if not jobs:
+            return
+        with self.db.get_connection("save") as conn:
+            cur = conn.cursor()
+            if self.db.dialect == "mssql":
+                cur.fast_executemany = True
+            cur.executemany(self.sql["search.job_tokens_delete"], [(job_id,) for job_id, _n, _g in jobs])
+            rows = [(tok, job_id) for job_id, job_name, group_code in jobs for tok in tokenize(job_name, group_code)]
+            if rows:
+                cur.executemany(self.sql["search.job_tokens_insert"], rows)
+
+    def remove_jobs(self, job_ids: Iterable[int]) -> None:
+        """Borra los tokens de esos jobs (retirados o purgados) en un solo statement."""
+        if not self.enabled:
+            return
+        ids = sorted({int(x) for x in job_ids})
+        if not ids:
+            return
+        with self.db.get_connection("save") as conn:
+            conn.cursor().execute(self.sql["search.job_tokens_delete_many"], (json.dumps(ids),))
+
+    def index_group(self, group_code: str, group_name: str, service_name: str) -> None:
+        if not self.enabled:
+            return
+        self._replace(
+            "search.group_tokens_delete", "search.group_tokens_insert",
+            group_code, tokenize(group_name, service_name),
+        )
+
+    def remove_groups(self, group_codes: Iterable[str]) -> None:
+        """Borra los tokens de esos grupos (borrados) en un solo statement."""
+        if not self.enabled:
+            return
+        codes = sorted({str(c) for c in group_codes})
+        if not codes:
+            return
+        with self.db.get_connection("save") as conn:
+            conn.cursor().execute(self.sql["search.group_tokens_delete_many"], (json.dumps(codes, ensure_ascii=False),))
+
+    def _replace(self, delete_name: str, insert_name: str, key, tokens: Iterable[str]) -> None:
+        with self.db.get_connection("save") as conn:
+            cur = conn.cursor()
+            cur.execute(self.sql[delete_name], (key,))
+            rows = [(tok, key) for tok in tokens]
+            if rows:
+                cur.executemany(self.sql[insert_name], rows)
+
+    def rebuild(self, batch_size: Optional[int] = None) -> Tuple[int, int]:
+        """Reconstruye ambas tablas en una transacción. Retorna (jobs, grupos) indexados."""
+        batch_size = batch_size or self.db.fetch_batch
+
+        with self.db.transaction():
+            with self.db.get_connection("save") as conn:
+                cur = conn.cursor()
+                # Sin MARS no se puede insertar mientras otro cursor lee: primero se lee todo
+                job_rows = cur.execute(
+                    "SELECT Id, JobName, GroupCode FROM dbo.Jobs_information WHERE IsActive = 1;"
+                ).fetchall()
+                group_rows = cur.execute("SELECT GroupCode, GroupName, ServiceName FROM dbo.[Groups];").fetchall()
+
+                if self.db.dialect == "mssql":
+                    cur.fast_executemany = True
+                cur.execute(self.sql["search.job_tokens_clear"])
+                cur.execute(self.sql["search.group_tokens_clear"])
+
+                for i in range(0, len(job_rows), batch_size):
+                    chunk = job_rows[i:i + batch_size]
+                    params = [(tok, int(r[0])) for r in chunk for tok in tokenize(r[1], r[2])]
+                    if params:
+                        cur.executemany(self.sql["search.job_tokens_insert"], params)
+
+                for i in range(0, len(group_rows), batch_size):
+                    chunk = group_rows[i:i + batch_size]
+                    params = [(tok, r[0]) for r in chunk for tok in tokenize(r[1], r[2])]
+                    if params:
+                        cur.executemany(self.sql["search.group_tokens_insert"], params)
+
+            # Los resultados del modo tokens dependen de estas tablas
+            self.db.invalidate(TAG_JOBS, TAG_GROUPS)
+
+        return len(job_rows), len(group_rows)
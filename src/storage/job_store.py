@@ -0,0 +1,355 @@
+import operator
+from array import array
+from itertools import compress, filterfalse, repeat
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.storage.jobs_repository import JobInfo, JobsRepository
+from src.util.dt import NULL_TS, from_micros, to_micros
+
+
+NULL_SEVERITY = -1
+
+# remove() deja la fila muerta en su lugar; cuando las muertas pasan esta
+# proporción (y este mínimo) conviene compactar (ver JobStore.compacted)
+COMPACT_RATIO = 0.25
+COMPACT_MIN_ROWS = 1000
+
+
+class _Dictionary:
+    """Valores repetidos guardados una sola vez; las filas guardan el código (int)."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def codes_where(self, predicate) -> set:
+        # El predicado corre una vez por valor distinto, no por fila
+        return {c for c, v in enumerate(self.values) if predicate(v)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class JobRow:
+    """Vista de una fila del JobStore con los mismos atributos que JobInfo."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "JobStore", i: int):
+        self._store = store
+        self._i = i
+
+    @property
+    def id(self) -> int:
+        return self._store.ids[self._i]
+
+    @property
+    def type(self) -> str:
+        return self._store.types.values[self._store.type_codes[self._i]]
+
+    @property
+    def job_name(self) -> str:
+        return self._store.job_names[self._i]
+
+    def _group(self) -> Tuple[str, str, str]:
+        return self._store.groups.values[self._store.group_codes[self._i]]
+
+    @property
+    def group_code(self) -> str:
+        return self._group()[0]
+
+    @property
+    def group_name(self) -> str:
+        return self._group()[1]
+
+    @property
+    def service_name(self) -> str:
+        return self._group()[2]
+
+    @property
+    def severity(self) -> str:
+        sev = self._store.severities[self._i]
+        return "" if sev == NULL_SEVERITY else str(sev)
+
+    @property
+    def created_at_utc(self) -> str:
+        return from_micros(self._store.created[self._i])
+
+    def to_info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            type=self.type,
+            job_name=self.job_name,
+            group_code=self.group_code,
+            group_name=self.group_name,
+            service_name=self.service_name,
+            severity=self.severity,
+            created_at_utc=self.created_at_utc,
+        )
+
+    def __repr__(self) -> str:
+        return f"JobRow(id={self.id}, job_name={self.job_name!r}, group_code={self.group_code!r})"
+
+
+class JobRowList(Sequence):
+    """Filas del store por índice; las vistas JobRow se crean recién al leerlas."""
+
+    __slots__ = ("_store", "_indices")
+
+    def __init__(self, store: "JobStore", indices: Sequence[int]):
+        self._store = store
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return JobRowList(self._store, self._indices[key])
+        return JobRow(self._store, self._indices[key])
+
+    @property
+    def indices(self) -> Sequence[int]:
+        return self._indices
+
+
+class JobStore:
+    """
+    Catálogo de jobs en columnas (array) para tener cientos de miles en memoria.
+    - Id / CreatedAtUtc (microsegundos) / Severity como enteros nativos.
+    - Type y (GroupCode, GroupName, ServiceName) codificados por diccionario:
+      GroupName/ServiceName dependen del grupo, así que van una vez por grupo.
+    - select() / order() trabajan sobre índices con map/compress (el recorrido
+      por fila corre en C, sin bucles de Python); rows() devuelve vistas JobRow.
+    - remove() no mueve filas; needs_compaction() / compacted() arman una copia
+      sin las filas muertas ni los valores del diccionario que ya nadie usa.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.created = array("q")
+        self.severities = array("h")
+        self.type_codes = array("I")
+        self.group_codes = array("I")
+        self.job_names: List[str] = []
+
+        self.types = _Dictionary()
+        self.groups = _Dictionary()
+        self._pos: Dict[int, int] = {}
+        self._removed: set = set()  # posiciones de filas sacadas con remove() (las demás no se mueven)
+        self._names_lower: Optional[List[str]] = None  # se arma en la primera búsqueda
+
+    def __len__(self) -> int:
+        return len(self.ids) - len(self._removed)
+
+    # ---------------- carga ----------------
+
+    @staticmethod
+    def _severity(value: Any) -> int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return NULL_SEVERITY
+
+    def append_row(self, r: Sequence[Any]) -> None:
+        """Fila cruda en el orden de _JOB_SELECT (ver JobsRepository._row_to_job)."""
+        job_id = int(r[0])
+        if job_id in self._pos:
+            self.update_row(r)
+            return
+
+        self._pos[job_id] = len(self.ids)
+        self.ids.append(job_id)
+        self.type_codes.append(self.types.encode("" if r[1] is None else str(r[1])))
+        self.job_names.append("" if r[2] is None else str(r[2]))
+        self.group_codes.append(self.groups.encode((
+            "" if r[3] is None else str(r[3]),
+            "" if r[4] is None else str(r[4]),
+            "" if r[5] is None else str(r[5]),
+        )))
+        self.severities.append(self._severity(r[6]))
+        self.created.append(to_micros(r[7]))
+        if self._names_lower is not None:
+            self._names_lower.append(self.job_names[-1].lower())
+
+    def update_row(self, r: Sequence[Any]) -> None:
+        i = self._pos.get(int(r[0]))
+        if i is None:
+            self.append_row(r)
+            return
+
+        self.type_codes[i] = self.types.encode("" if r[1] is None else str(r[1]))
+        self.job_names[i] = "" if r[2] is None else str(r[2])
+        self.group_codes[i] = self.groups.encode((
+            "" if r[3] is None else str(r[3]),
+            "" if r[4] is None else str(r[4]),
+            "" if r[5] is None else str(r[5]),
+        ))
+        self.severities[i] = self._severity(r[6])
+        self.created[i] = to_micros(r[7])
+        if self._names_lower is not None:
+            self._names_lower[i] = self.job_names[i].lower()
+
+    def upsert(self, jobs: Iterable[JobInfo]) -> None:
+        """Mezcla JobInfo (p.ej. un Delta de changes_since) por Id."""
+        for j in jobs:
+            self.update_row((
+                j.id, j.type, j.job_name, j.group_code, j.group_name,
+                j.service_name, j.severity, j.created_at_utc or None,
+            ))
+
+    def remove(self, job_ids: Iterable[int]) -> None:
+        """
+        Saca jobs por Id (retirados o purgados). Las demás filas conservan su
+        posición; volver a agregar el Id crea una fila nueva.
+        """
+        for job_id in job_ids:
+            i = self._pos.pop(int(job_id), None)
+            if i is not None:
+                self._removed.add(i)
+
+    def needs_compaction(self) -> bool:
+        dead = len(self._removed)
+        return dead >= COMPACT_MIN_ROWS and dead > len(self.ids) * COMPACT_RATIO
+
+    def compacted(self) -> "JobStore":
+        """
+        Copia con solo las filas vivas (mismo orden relativo) y diccionarios
+        recodificados. Las posiciones cambian: quien guarde índices de fila debe
+        rearmarlos. Este store no se toca (las vistas JobRow ya entregadas siguen
+        leyendo de acá).
+        """
+        live = self.select()
+        out = JobStore()
+        out.ids = array("q", map(self.ids.__getitem__, live))
+        out.created = array("q", map(self.created.__getitem__, live))
+        out.severities = array("h", map(self.severities.__getitem__, live))
+        out.job_names = list(map(self.job_names.__getitem__, live))
+        out.type_codes = array("I", map(
+            out.types.encode, map(self.types.values.__getitem__, map(self.type_codes.__getitem__, live))
+        ))
+        out.group_codes = array("I", map(
+            out.groups.encode, map(self.groups.values.__getitem__, map(self.group_codes.__getitem__, live))
+        ))
+        out._pos = dict(zip(out.ids, range(len(out.ids))))
+        return out
+
+    @classmethod
+    def load(cls, jobs_repo: JobsRepository, search: Optional[str] = None, batch_size: Optional[int] = None) -> "JobStore":
+        """Carga directo desde las filas de la DB (sin pasar por JobInfo)."""
+        store = cls()
+        for r in jobs_repo.iter_job_rows(search, batch_size=batch_size):
+            store.append_row(r)
+        return store
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[JobInfo]) -> "JobStore":
+        store = cls()
+        store.upsert(jobs)
+        return store
+
+    # ---------------- consulta ----------------
+
+    def index_of(self, job_id: int) -> Optional[int]:
+        return self._pos.get(int(job_id))
+
+    def row(self, i: int) -> JobRow:
+        return JobRow(self, i)
+
+    def rows(self, indices: Sequence[int]) -> JobRowList:
+        return JobRowList(self, indices)
+
+    def _lowered_names(self) -> List[str]:
+        if self._names_lower is None:
+            self._names_lower = [n.lower() for n in self.job_names]
+        return self._names_lower
+
+    def select(
+        self,
+        term: Optional[str] = None,
+        group_codes: Optional[Iterable[str]] = None,
+        types: Optional[Iterable[str]] = None,
+        severities: Optional[Iterable[int]] = None,
+        created_from: Any = None,
+        created_to: Any = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[int]:
+        """
+        Índices de fila que cumplen todos los filtros dados.
+        term: substring sin distinguir mayúsculas en JobName/GroupCode/GroupName/ServiceName
+        (en los grupos se evalúa una vez por grupo distinto).
+        created_from / created_to: rango [desde, hasta) de CreatedAtUtc.
+        """
+        if indices is not None:
+            idx: Sequence[int] = indices
+        elif self._removed:
+            idx = list(filterfalse(self._removed.__contains__, range(len(self.ids))))
+        else:
+            idx = range(len(self.ids))
+
+        if group_codes is not None:
+            wanted = set(group_codes)
+            codes = self.groups.codes_where(lambda g: g[0] in wanted)
+            idx = list(compress(idx, map(codes.__contains__, map(self.group_codes.__getitem__, idx))))
+
+        if types is not None:
+            wanted_types = set(types)
+            codes = self.types.codes_where(lambda t: t in wanted_types)
+            idx = list(compress(idx, map(codes.__contains__, map(self.type_codes.__getitem__, idx))))
+
+        if severities is not None:
+            wanted_sev = {int(s) for s in severities}
+            idx = list(compress(idx, map(wanted_sev.__contains__, map(self.severities.__getitem__, idx))))
+
+        if created_from is not None:
+            lo = to_micros(created_from)
+            idx = list(compress(idx, map(operator.le, repeat(lo), map(self.created.__getitem__, idx))))
+
+        if created_to is not None:
+            hi = to_micros(created_to)
+            idx = list(compress(idx, map(operator.gt, repeat(hi), map(self.created.__getitem__, idx))))
+
+        if term:
+            t = term.lower()
+            group_hits = self.groups.codes_where(lambda g: any(t in v.lower() for v in g))
+            names = self._lowered_names()
+            by_name = map(operator.contains, map(names.__getitem__, idx), repeat(t))
+            by_group = map(group_hits.__contains__, map(self.group_codes.__getitem__, idx))
+            idx = list(compress(idx, map(operator.or_, by_name, by_group)))
+
+        return list(idx)
+
+    def order(self, indices: Iterable[int], by: str = "created", descending: bool = True) -> List[int]:
+        """
+        Ordena índices por columna: created (+Id, como el grid), id, severity, job_name,
+        group_code o type. Las claves se leen directo de los arrays.
+        """
+        if by == "created":
+            # Clave compuesta (CreatedAtUtc, Id): orden estable por Id y después por fecha
+            out = sorted(indices, key=self.ids.__getitem__, reverse=descending)
+            out.sort(key=self.created.__getitem__, reverse=descending)
+            return out
+        if by == "id":
+            return sorted(indices, key=self.ids.__getitem__, reverse=descending)
+        if by == "severity":
+            return sorted(indices, key=self.severities.__getitem__, reverse=descending)
+        if by == "job_name":
+            return sorted(indices, key=self.job_names.__getitem__, reverse=descending)
+        if by in ("group_code", "type"):
+            column, values = (
+                (self.group_codes, [g[0] for g in self.groups.values]) if by == "group_code"
+                else (self.type_codes, self.types.values)
+            )
+            # Rango de cada código en el diccionario ordenado: se ordenan enteros, no textos
+            rank = {c: r for r, c in enumerate(sorted(range(len(values)), key=values.__getitem__))}
+            ranks = array("I", map(rank.__getitem__, column))
+            return sorted(indices, key=ranks.__getitem__, reverse=descending)
+        raise ValueError(f"Columna de orden inválida: {by!r}")
@@ -1,7 +1,21 @@
-﻿from dataclasses import dataclass
-from typing import List, Optional, Any, Dict
+﻿import json
+import threading
+import time
+import uuid
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Any, Dict, Tuple
 
-from src.storage.database import Database
+from src.storage.database import NO_LIMIT, CancelToken, Database, _get_bool, _get_int, fetch_batches
+from src.storage.change_tracking import MODE_ROWVERSION, ChangeTracker, Delta, Watermark
+from src.storage.job_fuzzy import FuzzyJobIndex
+from src.storage.job_query import parse_query
+from src.storage.job_search import (
+    SEARCH_FULLTEXT, SEARCH_FUZZY, SEARCH_LIKE, SEARCH_MODES, SEARCH_TOKENS, SearchTokenIndex, default_search_mode,
+    search_clause,
+)
+from src.storage.read_cache import TAG_GROUPS, TAG_JOBS
+from src.storage.statements import IN_BUCKETS, JOB_LIKE_WHERE, get_statements, in_params
 
 
 @dataclass(frozen=True)
@@ -16,114 +30,419 @@ class JobInfo:
     created_at_utc: str
 
 
+# Resultado por fila de add_jobs / update_jobs
+OUTCOME_INSERTED = "inserted"
+OUTCOME_UPDATED = "updated"
+OUTCOME_UNCHANGED = "unchanged"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_INVALID = "invalid"
+
+# Filas por statement en los lotes (cada chunk viaja como un solo parámetro JSON)
+BATCH_CHUNK = 1000
+
+# Estado de los jobs en los listados: por defecto solo activos (ver retire_jobs)
+STATUS_ACTIVE = "active"
+STATUS_RETIRED = "retired"
+STATUS_ALL = "all"
+JOB_STATUSES = (STATUS_ACTIVE, STATUS_RETIRED, STATUS_ALL)
+
+# Resumen de audit por acción (ver JobsRepository.audit_entry; UPDATE lista lo que cambió)
+_AUDIT_SUMMARIES = {
+    "INSERT": "Created job '{name}' (group_code={code})",
+    "RETIRE": "Retired job '{name}' (group_code={code})",
+    "RESTORE": "Restored job '{name}' (group_code={code})",
+    "DELETE": "Purged retired job '{name}' (group_code={code})",
+}
+
+
+@dataclass(frozen=True)
+class RowOutcome:
+    index: int          # posición de la fila en lo que se recibió
+    id: int             # Id del job (0 si no se insertó)
+    status: str         # OUTCOME_*
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class PageToken:
+    """Posición de la última fila entregada (CreatedAtUtc crudo de la DB + Id)."""
+    created_at: Any
+    id: int
+
+
+@dataclass(frozen=True)
+class JobsPage:
+    items: List[JobInfo]
+    next_token: Optional[PageToken]  # None = no hay más páginas
+
+
 class JobsRepository:
     def __init__(self, db: Database, audit_repo=None):
         self.db = db
         self.audit_repo = audit_repo
+        self.sql = get_statements()
         self._actor_user_id: Optional[int] = None
+        self.search_mode = default_search_mode()
+        self.search_index = SearchTokenIndex(db)
+        self._search_modes: Optional[List[str]] = None  # ver available_search_modes
+        self._listeners: List[Callable[[int], None]] = []
+        self.changes = ChangeTracker(db)
+
+        # Búsqueda fuzzy: índice en memoria que se carga en la primera búsqueda
+        self.fuzzy = FuzzyJobIndex()
+        self.fuzzy_sync_seconds = _get_int("JOBS_FUZZY_SYNC", 30)
+        self._fuzzy_lock = threading.Lock()
+        self._fuzzy_watermark: Optional[Watermark] = None
+        self._fuzzy_synced_at = 0.0
+
+        # Purga de retirados: filas por transacción (ver purge_retired_jobs)
+        self.purge_batch = max(1, _get_int("JOBS_PURGE_BATCH", 500))
 
     # ✅ Para no tocar tus vistas: MainWindow lo setea una vez.
     def set_actor(self, actor_user_id: Optional[int]) -> None:
         self._actor_user_id = int(actor_user_id) if actor_user_id is not None else None
 
-    def list_jobs(self, search: Optional[str] = None, limit: int = 2000) -> List[JobInfo]:
-        # LEFT JOIN para que si no existe el grupo, el job igual aparezca
-        if search:
-            sql = f"""
-            SELECT TOP ({limit})
-                j.Id,
-                j.Type,
-                j.JobName,
-                j.GroupCode,
-                ISNULL(g.GroupName, '') AS GroupName,
-                ISNULL(g.ServiceName, '') AS ServiceName,
-                j.Severity,
-                j.CreatedAtUtc
-            FROM dbo.Jobs_information AS j
-            LEFT JOIN dbo.[Groups] AS g
-                ON g.GroupCode = j.GroupCode
-            WHERE
-                j.JobName LIKE ?
-                OR j.GroupCode LIKE ?
-                OR g.GroupName LIKE ?
-                OR g.ServiceName LIKE ?
-            ORDER BY j.CreatedAtUtc DESC;
-            """
+    def add_listener(self, callback: Callable[[List[int]], None]) -> None:
+        """callback(job_ids) después de cada alta/cambio guardado, o lote (p.ej. índice en memoria)."""
+        self._listeners.append(callback)
+
+    def _notify(self, job_ids: List[int]) -> None:
+        for callback in self._listeners:
+            callback(job_ids)
+
+    def publish_saved(self, indexed: Iterable[Tuple[int, str, str]] = (), removed: Iterable[int] = ()) -> None:
+        """
+        Índice fuzzy y listeners de lo que se guardó: (Id, JobName, GroupCode) nuevos o
+        cambiados y Id que salen. Corre al confirmar la transacción (Database.after_commit):
+        dentro de una externa (p.ej. ChangeSet.save) espera a su commit y un rollback
+        no deja los índices con datos que no existen.
+        Para todo camino que escribe jobs, también fuera de este repositorio (p.ej. el import).
+        """
+        indexed, removed = list(indexed), list(removed)
+        if not indexed and not removed:
+            return
+
+        def publish() -> None:
+            for job_id, job_name, group_code in indexed:
+                self.fuzzy.index_job(job_id, job_name, group_code)
+            self.fuzzy.remove_jobs(removed)
+            self._notify(sorted({job_id for job_id, _n, _c in indexed} | set(removed)))
+
+        self.db.after_commit(publish)
+
+    def set_search_mode(self, mode: str) -> None:
+        """like | fulltext | tokens | fuzzy (ver job_search). Se puede cambiar en runtime."""
+        mode = (mode or "").strip().lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Modo de búsqueda inválido: {mode!r} (usa {', '.join(SEARCH_MODES)})")
+        if mode not in self.available_search_modes():
+            raise ValueError(f"El modo de búsqueda {mode!r} no está configurado en esta base (ver README).")
+        self.search_mode = mode
+
+    def available_search_modes(self, refresh: bool = False) -> List[str]:
+        """
+        Modos que funcionan con esta base (los que ofrece el combo del grid):
+        - like y fuzzy siempre; tokens si search_index.enabled.
+        - fulltext solo en SQL Server, con JOBS_SEARCH_FULLTEXT=1 o si las dos
+          tablas tienen índice full-text (sys.fulltext_indexes). Se revisa una vez.
+        refresh: vuelve a revisar (p.ej. después de crear los índices full-text).
+        """
+        if refresh or self._search_modes is None:
+            modes = [SEARCH_LIKE]
+            if self.db.dialect == "mssql" and (_get_bool("JOBS_SEARCH_FULLTEXT") or self._has_fulltext_indexes()):
+                modes.append(SEARCH_FULLTEXT)
+            if self.search_index.enabled:
+                modes.append(SEARCH_TOKENS)
+            modes.append(SEARCH_FUZZY)
+            self._search_modes = modes
+        return list(self._search_modes)
+
+    def _has_fulltext_indexes(self) -> bool:
+        try:
+            with self.db.get_connection() as conn:
+                row = conn.cursor().execute(self.sql["search.fulltext_indexes"]).fetchone()
+        except Exception:
+            return False
+        return bool(row) and int(row[0] or 0) == 2
+
+    def _fetch_search(self, cur, sql: str, params: tuple, search: Optional[str]) -> list:
+        """fetchall del listado; si falla CONTAINS se avisa claro en vez del error del driver."""
+        try:
+            return cur.execute(sql, params).fetchall()
+        except Exception as e:
+            if search and self.search_mode == SEARCH_FULLTEXT and self.db.dialect == "mssql":
+                raise ValueError(
+                    "La búsqueda fulltext falló (¿faltan los índices full-text en Jobs_information "
+                    "y Groups?). Elige otro modo de búsqueda."
+                ) from e
+            raise
+
+    @staticmethod
+    def _check_status(status: str) -> str:
+        if status not in JOB_STATUSES:
+            raise ValueError(f"Estado de job inválido: {status!r} (usa {', '.join(JOB_STATUSES)})")
+        return status
+
+    def _select_sql(
+        self,
+        search: Optional[str],
+        after: Optional["PageToken"] = None,
+        status: str = STATUS_ACTIVE,
+    ) -> Tuple[str, tuple]:
+        """
+        SQL de listado/búsqueda y sus parámetros (sin el TOP, que va primero).
+        Los activos (lo normal) van por los statements fijos; retirados / todos por jobs_where.
+        """
+        status = self._check_status(status)
+        seek = after is not None
+        seek_params = (after.created_at, after.created_at, int(after.id)) if seek else ()
+
+        # group:FIN* prio:2 ... (ver job_query): predicados por columna, con índice
+        query = parse_query(search)
+        if query.is_fielded:
+            where, params = query.to_sql(self.search_mode, self.db.dialect)
+            return self.sql.jobs_where(where, seek, status), params + seek_params
+
+        search = query.text
+        if not search:
+            if status != STATUS_ACTIVE:
+                return self.sql.jobs_where("1 = 1", seek, status), seek_params
+            return self.sql["jobs.page_after" if seek else "jobs.page"], seek_params
+
+        if self.search_mode == SEARCH_LIKE:
             like = f"%{search}%"
-            params = (like, like, like, like)
-        else:
-            sql = f"""
-            SELECT TOP ({limit})
-                j.Id,
-                j.Type,
-                j.JobName,
-                j.GroupCode,
-                ISNULL(g.GroupName, '') AS GroupName,
-                ISNULL(g.ServiceName, '') AS ServiceName,
-                j.Severity,
-                j.CreatedAtUtc
-            FROM dbo.Jobs_information AS j
-            LEFT JOIN dbo.[Groups] AS g
-                ON g.GroupCode = j.GroupCode
-            ORDER BY j.CreatedAtUtc DESC;
-            """
-            params = ()
+            if status != STATUS_ACTIVE:
+                return self.sql.jobs_where(JOB_LIKE_WHERE, seek, status), (like, like, like, like) + seek_params
+            name = "jobs.search_page_after" if seek else "jobs.search_page"
+            return self.sql[name], (like, like, like, like) + seek_params
 
-        with self.db.get_connection() as conn:
+        where, params = search_clause(self.search_mode, search, self.db.dialect)
+        return self.sql.jobs_where(where, seek, status), params + seek_params
+
+    @staticmethod
+    def _row_to_job(r, offset: int = 0) -> JobInfo:
+        # Columnas: Id, Type, JobName, GroupCode, GroupName, ServiceName, Severity, CreatedAtUtc
+        r = r[offset:offset + 8]
+        return JobInfo(
+            id=int(r[0]),
+            type="" if r[1] is None else str(r[1]),
+            job_name="" if r[2] is None else str(r[2]),
+            group_code="" if r[3] is None else str(r[3]),
+            group_name="" if r[4] is None else str(r[4]),
+            service_name="" if r[5] is None else str(r[5]),
+            severity="" if r[6] is None else str(r[6]),
+            created_at_utc="" if r[7] is None else str(r[7]),
+        )
+
+    def list_jobs(
+        self,
+        search: Optional[str] = None,
+        limit: int = 2000,
+        cancel: Optional[CancelToken] = None,
+        status: str = STATUS_ACTIVE,
+    ) -> List[JobInfo]:
+        """
+        cancel: permite a la UI cancelar en el servidor una búsqueda que ya no sirve
+        (p.ej. el usuario siguió escribiendo).
+        status: STATUS_ACTIVE (default), STATUS_RETIRED o STATUS_ALL.
+        """
+        fuzzy_term = self._fuzzy_term(search, status)
+        if fuzzy_term:
+            return self.fuzzy_jobs(fuzzy_term, limit=int(limit))
+
+        # LEFT JOIN para que si no existe el grupo, el job igual aparezca
+        sql, params = self._select_sql(search, status=status)
+        params = (int(limit),) + params
+
+        cancel = cancel or CancelToken()
+
+        def load() -> List[JobInfo]:
+            with self.db.get_connection("search" if search else "list", read_only=True) as conn:
+                cur = conn.cursor()
+                with cancel.watch(cur):
+                    rows = self._fetch_search(cur, sql, params, search)
+            return [self._row_to_job(r) for r in rows]
+
+        # El grid muestra GroupName/ServiceName: la cache depende de las dos tablas
+        return self.db.cached(sql, params, (TAG_JOBS, TAG_GROUPS), load)
+
+    def page_jobs(
+        self,
+        search: Optional[str] = None,
+        after: Optional[PageToken] = None,
+        page_size: int = 500,
+        cancel: Optional[CancelToken] = None,
+        status: str = STATUS_ACTIVE,
+    ) -> JobsPage:
+        """
+        Paginación keyset ordenada por (CreatedAtUtc, Id) DESC: pasar el next_token
+        de la página anterior en `after` para traer la siguiente.
+        Conviene un índice en Jobs_information (CreatedAtUtc DESC, Id DESC) WHERE IsActive = 1.
+        """
+        page_size = max(1, int(page_size))
+        fuzzy_term = self._fuzzy_term(search, status)
+        if fuzzy_term:
+            # Ordenado por parecido, no por fecha: una sola página
+            if after is not None:
+                return JobsPage(items=[], next_token=None)
+            return JobsPage(items=self.fuzzy_jobs(fuzzy_term, limit=page_size), next_token=None)
+
+        sql, params = self._select_sql(search, after, status)
+        params = (page_size + 1,) + params  # una fila extra para saber si hay más
+
+        cancel = cancel or CancelToken()
+
+        def load() -> JobsPage:
+            with self.db.get_connection("search" if search else "list", read_only=True) as conn:
+                cur = conn.cursor()
+                with cancel.watch(cur):
+                    rows = self._fetch_search(cur, sql, params, search)
+
+            next_token = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_token = PageToken(created_at=last[7], id=int(last[0]))
+
+            return JobsPage(items=[self._row_to_job(r) for r in rows], next_token=next_token)
+
+        return self.db.cached(sql, params, (TAG_JOBS, TAG_GROUPS), load)
+
+    def iter_job_rows(
+        self,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        cancel: Optional[CancelToken] = None,
+        status: str = STATUS_ACTIVE,
+    ) -> Iterator[tuple]:
+        """Filas crudas (orden de _row_to_job) por lotes, sin armar JobInfo (ver JobStore)."""
+        sql, params = self._select_sql(search, status=status)
+        params = (int(limit or NO_LIMIT),) + params
+
+        cancel = cancel or CancelToken()
+        with self.db.get_connection("search" if search else "list", read_only=True) as conn:
             cur = conn.cursor()
-            rows = cur.execute(sql, params).fetchall()
-
-        out: List[JobInfo] = []
-        for r in rows:
-            out.append(
-                JobInfo(
-                    id=int(r[0]),
-                    type="" if r[1] is None else str(r[1]),
-                    job_name="" if r[2] is None else str(r[2]),
-                    group_code="" if r[3] is None else str(r[3]),
-                    group_name="" if r[4] is None else str(r[4]),
-                    service_name="" if r[5] is None else str(r[5]),
-                    severity="" if r[6] is None else str(r[6]),
-                    created_at_utc="" if r[7] is None else str(r[7]),
-                )
-            )
-        return out
+            with cancel.watch(cur):
+                cur.execute(sql, params)
+                for rows in fetch_batches(cur, batch_size or self.db.fetch_batch):
+                    yield from rows
+
+    def iter_jobs(
+        self,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        cancel: Optional[CancelToken] = None,
+        status: str = STATUS_ACTIVE,
+    ) -> Iterator[JobInfo]:
+        """
+        Igual que list_jobs pero sin materializar todo: trae filas con fetchmany
+        de a batch_size (DB_FETCH_BATCH por defecto) y las entrega a medida que llegan.
+        La conexión queda tomada hasta que se consume (o se cierra) el generador.
+        """
+        for r in self.iter_job_rows(search, limit, batch_size, cancel, status):
+            yield self._row_to_job(r)
+
+    def _fetch_in(self, column: str, values: List[Any]) -> List[JobInfo]:
+        """Jobs activos con `column` IN (values), en lotes de IN_BUCKETS[-1]."""
+        jobs: List[JobInfo] = []
+        size = IN_BUCKETS[-1]
+        with self.db.get_connection("list") as conn:
+            cur = conn.cursor()
+            for i in range(0, len(values), size):
+                placeholders, params = in_params(values[i:i + size])
+                sql = self.sql.jobs_where(f"{column} IN ({placeholders})")
+                rows = cur.execute(sql, (NO_LIMIT,) + params).fetchall()
+                jobs.extend(self._row_to_job(r) for r in rows)
+        return jobs
+
+    def current_watermark(self) -> Watermark:
+        return self.changes.current()
+
+    def changes_since(self, since: Watermark) -> Delta:
+        """
+        Jobs activos insertados o actualizados desde `since` (incluye los jobs de grupos
+        renombrados, porque GroupName/ServiceName van en la fila), y en delta.removed
+        los Id retirados o purgados.
+        El cliente los mezcla con lo que ya tiene y guarda delta.watermark.
+        """
+        if since.mode == MODE_ROWVERSION:
+            lo, hi, watermark = self.changes.rowversion_range(since)
+            with self.db.get_connection("list") as conn:
+                cur = conn.cursor()
+                rows = cur.execute(self.sql["jobs.changed_rowversion"], (lo, hi, lo, hi)).fetchall()
+                retired = cur.execute(self.sql["jobs.retired_rowversion"], (lo, hi)).fetchall()
+            return Delta([self._row_to_job(r) for r in rows], watermark, [int(r[0]) for r in retired])
+
+        changed, watermark = self.changes.audit_changes(("jobs", "groups"), since)
+        by_id: Dict[int, JobInfo] = {}
+
+        job_ids = sorted({int(x) for x in changed.get("jobs", ()) if x.isdigit()})
+        group_codes = sorted(set(changed.get("groups", ())))
+        for j in self._fetch_in("j.Id", job_ids) + self._fetch_in("j.GroupCode", group_codes):
+            by_id[j.id] = j
+
+        # Auditados que ya no están entre los activos: retirados o purgados
+        removed = [job_id for job_id in job_ids if job_id not in by_id]
+        return Delta(list(by_id.values()), watermark, removed)
+
+    def _fuzzy_term(self, search: Optional[str], status: str = STATUS_ACTIVE) -> Optional[str]:
+        """
+        Texto a buscar con fuzzy, o None si va por SQL (otro modo, búsqueda con campos
+        o retirados, que no están en el índice fuzzy).
+        """
+        if self.search_mode != SEARCH_FUZZY or status != STATUS_ACTIVE:
+            return None
+        query = parse_query(search)
+        if query.is_fielded:
+            return None
+        return query.text or None
+
+    def _sync_fuzzy(self) -> None:
+        with self._fuzzy_lock:
+            if not self.fuzzy.ready:
+                # El watermark se toma antes de leer: lo que cambie después llega por delta
+                self._fuzzy_watermark = self.current_watermark()
+                self.fuzzy.load((r[0], r[2], r[3]) for r in self.iter_job_rows())
+                self._fuzzy_synced_at = time.monotonic()
+                return
+
+            if time.monotonic() - self._fuzzy_synced_at < self.fuzzy_sync_seconds:
+                return
+            delta = self.changes_since(self._fuzzy_watermark)
+            for j in delta.items:
+                self.fuzzy.index_job(j.id, j.job_name, j.group_code)
+            self.fuzzy.remove_jobs(delta.removed)
+            self._fuzzy_watermark = delta.watermark
+            self._fuzzy_synced_at = time.monotonic()
+
+    def fuzzy_jobs(self, term: str, limit: int = 20, max_distance: Optional[int] = None) -> List[JobInfo]:
+        """
+        Jobs cuyo JobName o GroupCode empieza "casi" con term (errores de tipeo),
+        los más parecidos primero (ver job_fuzzy). max_distance=None: según el largo.
+        - La primera llamada carga (Id, JobName, GroupCode) de todo el catálogo.
+        - Los guardados propios se indexan al momento; los de otras consolas llegan
+          por changes_since cada JOBS_FUZZY_SYNC segundos (default 30).
+        """
+        self._sync_fuzzy()
+        hits = self.fuzzy.search(term, limit=int(limit), max_distance=max_distance)
+        by_id = {j.id: j for j in self._fetch_in("j.Id", [job_id for job_id, _d in hits])}
+        return [by_id[job_id] for job_id, _d in hits if job_id in by_id]
 
     # ✅ Nuevo: para audit (old/new)
     def get_by_id(self, job_id: int) -> Optional[JobInfo]:
-        sql = """
-        SELECT
-            j.Id,
-            j.Type,
-            j.JobName,
-            j.GroupCode,
-            ISNULL(g.GroupName, '') AS GroupName,
-            ISNULL(g.ServiceName, '') AS ServiceName,
-            j.Severity,
-            j.CreatedAtUtc
-        FROM dbo.Jobs_information AS j
-        LEFT JOIN dbo.[Groups] AS g
-            ON g.GroupCode = j.GroupCode
-        WHERE j.Id = ?;
-        """
+        sql = self.sql["jobs.get_by_id"]
 
-        with self.db.get_connection() as conn:
+        # Dentro de una transacción (snapshots de audit) se une a ella, o sea al primario
+        with self.db.get_connection(read_only=True) as conn:
             cur = conn.cursor()
             row = cur.execute(sql, (int(job_id),)).fetchone()
 
         if not row:
             return None
 
-        return JobInfo(
-            id=int(row[0]),
-            type="" if row[1] is None else str(row[1]),
-            job_name="" if row[2] is None else str(row[2]),
-            group_code="" if row[3] is None else str(row[3]),
-            group_name="" if row[4] is None else str(row[4]),
-            service_name="" if row[5] is None else str(row[5]),
-            severity="" if row[6] is None else str(row[6]),
-            created_at_utc="" if row[7] is None else str(row[7]),
-        )
+        return self._row_to_job(row)
 
     @staticmethod
     def _to_audit_dict(j: JobInfo) -> Dict[str, Any]:
@@ -147,73 +466,559 @@ class JobsRepository:
                 changed.append(k)
         return sorted(changed)
 
-    def add_job(self, type_: str, job_name: str, group_code: str, severity: str) -> int:
-        sql = """
-        INSERT INTO dbo.Jobs_information (Type, JobName, GroupCode, Severity, CreatedAtUtc)
-        OUTPUT INSERTED.Id
-        VALUES (?, ?, ?, ?, GETUTCDATE());
+    @classmethod
+    def audit_entry(
+        cls,
+        action: str,
+        job_id: int,
+        job_name: str,
+        group_code: str,
+        old: Optional[Dict[str, Any]],
+        new: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Entrada de audit de un job (para audit_repo.insert / insert_many), la misma en
+        altas, cambios, bajas, purga e import. old / new: valores guardados o None.
+        """
+        if action == "UPDATE":
+            summary = f"Updated job {job_id}: {', '.join(cls._diff_keys(old or {}, new or {}))}"
+        else:
+            summary = _AUDIT_SUMMARIES[action].format(name=job_name, code=group_code)
+        return {
+            "action": action,
+            "entity_name": "jobs",
+            "entity_id": str(job_id),
+            "summary": summary,
+            "old_values": old,
+            "new_values": new,
+        }
+
+    @classmethod
+    def change_entry(cls, old: Optional[JobInfo], new: JobInfo, reactivated: bool = False) -> Dict[str, Any]:
+        """
+        INSERT (old None) o UPDATE con las imágenes completas del job.
+        reactivated: el cambio también volvió a activar un retirado (is_active en el audit).
         """
+        old_dict = None if old is None else cls._to_audit_dict(old)
+        new_dict = cls._to_audit_dict(new)
+        if old_dict is not None and reactivated:
+            old_dict["is_active"], new_dict["is_active"] = False, True
+        action = "INSERT" if old is None else "UPDATE"
+        return cls.audit_entry(action, new.id, new.job_name, new.group_code, old_dict, new_dict)
+
+    @staticmethod
+    def _outcome(i: int, job_id: int, changed, existing) -> RowOutcome:
+        if job_id in changed:
+            return RowOutcome(i, job_id, OUTCOME_UPDATED)
+        if job_id in existing:
+            return RowOutcome(i, job_id, OUTCOME_UNCHANGED)
+        return RowOutcome(i, job_id, OUTCOME_NOT_FOUND, "Id no encontrado.")
+
+    @classmethod
+    def _outcomes(cls, job_ids: List[int], changed, existing) -> List[RowOutcome]:
+        """Un RowOutcome por Id de una selección (repetidos: solo el primero cuenta)."""
+        outcomes = []
+        seen = set()
+        for i, job_id in enumerate(job_ids):
+            if job_id in seen:
+                outcomes.append(RowOutcome(i, job_id, OUTCOME_INVALID, "Id repetido en la selección."))
+            else:
+                outcomes.append(cls._outcome(i, job_id, changed, existing))
+            seen.add(job_id)
+        return outcomes
+
+    def add_job(self, type_: str, job_name: str, group_code: str, severity: str) -> int:
+        sql = self.sql["jobs.insert"]
+
+        # Insert + snapshot + audit en una sola conexión y un solo commit
+        with self.db.transaction():
+            with self.db.get_connection() as conn:
+                cur = conn.cursor()
+                row = cur.execute(sql, (type_, job_name, group_code, severity)).fetchone()
+                conn.commit()
+
+            job_id = int(row[0]) if row and row[0] is not None else 0
+            if job_id:
+                self.search_index.index_job(job_id, job_name, group_code)
+            self.db.invalidate(TAG_JOBS)
 
+            if self.audit_repo is not None and job_id:
+                new_obj = self.get_by_id(job_id)
+                if new_obj:
+                    self.audit_repo.insert(actor_user_id=self._actor_user_id, **self.change_entry(None, new_obj))
+
+            if job_id:
+                self.publish_saved([(job_id, job_name, group_code)])
+        return job_id
+
+    def _exists(self, job_id: int) -> bool:
+        sql = self.sql["jobs.exists"]
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            return cur.execute(sql, (int(job_id),)).fetchone() is not None
+
+    def _update_job_sqlite(self, job_id: int, values: tuple) -> Optional[tuple]:
+        # SQLite no tiene OUTPUT DELETED: snapshot + UPDATE condicional + snapshot,
+        # dentro de la transacción abierta por update_job (misma forma de fila).
+        old_obj = self.get_by_id(job_id)
+        if old_obj is None:
+            return None
+
+        sql = self.sql["jobs.update_sqlite"]
         with self.db.get_connection() as conn:
             cur = conn.cursor()
-            row = cur.execute(sql, (type_, job_name, group_code, severity)).fetchone()
-            conn.commit()
+            cur.execute(sql, values + (int(job_id),) + values)
+            if cur.rowcount == 0:
+                return None
 
-        job_id = int(row[0]) if row and row[0] is not None else 0
+        return astuple(old_obj) + astuple(self.get_by_id(job_id))
+
+    def update_job(self, job_id: int, type_: str, job_name: str, group_code: str, severity: int) -> bool:
+        """
+        Un solo statement: el UPDATE devuelve la imagen vieja (DELETED) y la nueva
+        (INSERTED) ya con GroupName/ServiceName, que es lo que va al audit.
+        Si los valores enviados son iguales a los guardados no se escribe nada.
+        Retorna True si hubo cambios.
+        """
+        sql = self.sql["jobs.update"]
+        values = (type_, job_name, group_code, int(severity))
 
-        if self.audit_repo is not None and job_id:
-            new_obj = self.get_by_id(job_id)
-            if new_obj:
-                new_dict = self._to_audit_dict(new_obj)
+        # Update + audit en una sola conexión y un solo commit
+        with self.db.transaction():
+            if self.db.dialect == "sqlite":
+                row = self._update_job_sqlite(job_id, values)
+            else:
+                with self.db.get_connection() as conn:
+                    cur = conn.cursor()
+                    row = cur.execute(sql, values + (group_code, int(job_id)) + values).fetchone()
+                    conn.commit()
+
+            if not row:
+                if not self._exists(job_id):
+                    raise ValueError("No se actualizó ningún registro (Id no encontrado).")
+                # si no cambió nada, no escribimos ni auditamos
+                return False
+
+            self.search_index.index_job(job_id, job_name, group_code)
+            self.db.invalidate(TAG_JOBS)
+
+            # Audit (UPDATE)
+            if self.audit_repo is not None:
                 self.audit_repo.insert(
                     actor_user_id=self._actor_user_id,
-                    action="INSERT",
-                    entity_name="jobs",
-                    entity_id=str(job_id),
-                    summary=f"Created job '{new_obj.job_name}' (group_code={new_obj.group_code})",
-                    old_values=None,
-                    new_values=new_dict,
+                    **self.change_entry(self._row_to_job(row), self._row_to_job(row, offset=8)),
                 )
 
-        return job_id
+            self.publish_saved([(int(job_id), job_name, group_code)])
+        return True
+
+    # --------------------------------------------------
+    # LOTES
+    # --------------------------------------------------
+
+    def get_jobs_by_ids(
+        self,
+        job_ids: Iterable[int],
+        for_update: bool = False,
+        active_only: bool = False,
+    ) -> Dict[int, JobInfo]:
+        """
+        Jobs por Id en una sola consulta (los que no existen no aparecen).
+        for_update: dentro de una transacción, las filas quedan bloqueadas hasta el
+        commit (nadie las cambia entre leerlas y escribirlas).
+        active_only: sin los retirados (por Id se traen todos, p.ej. para el audit).
+        """
+        ids = sorted({int(x) for x in job_ids})
+        if not ids:
+            return {}
+        if for_update:
+            sql = self.sql["jobs.by_ids_for_update"]
+        else:
+            sql = self.sql["jobs.by_ids_active" if active_only else "jobs.by_ids"]
+        with self.db.get_connection(read_only=not for_update) as conn:
+            cur = conn.cursor()
+            rows = cur.execute(sql, (json.dumps(ids),)).fetchall()
+        return {int(r[0]): self._row_to_job(r) for r in rows}
+
+    @staticmethod
+    def check_values(type_: str, job_name: str, group_code: str, severity: Any) -> str:
+        """Mensaje de error de la fila, o "" si es válida (mismas reglas que AddJobWindow)."""
+        if not (type_ or "").strip():
+            return "Type es requerido."
+        if not (job_name or "").strip():
+            return "JobName es requerido."
+        if not (group_code or "").strip():
+            return "GroupCode es requerido."
+        try:
+            int(severity)
+        except (TypeError, ValueError):
+            return f"Severity inválida: {severity!r}"
+        return ""
+
+    def _audit_many(self, entries: List[Dict[str, Any]]) -> None:
+        if self.audit_repo is not None and entries:
+            self.audit_repo.insert_many(entries, actor_user_id=self._actor_user_id)
+
+    def add_jobs(self, rows: Iterable[Tuple[str, str, str, Any]]) -> List[RowOutcome]:
+        """
+        Alta de muchos jobs: rows = (type_, job_name, group_code, severity) como add_job.
+        - Las filas inválidas no se envían (OUTCOME_INVALID con el motivo).
+        - SQL Server: un MERGE por cada BATCH_CHUNK filas (JSON + OPENJSON) que devuelve
+          el Id de cada una; snapshot en una consulta y audit en un solo executemany.
+        - Todo en una transacción: si algo falla no queda nada a medias.
+        Retorna un RowOutcome por fila, en el mismo orden.
+        """
+        rows = list(rows)
+        outcomes: List[Optional[RowOutcome]] = [None] * len(rows)
+        valid = []
+        for i, (type_, job_name, group_code, severity) in enumerate(rows):
+            error = self.check_values(type_, job_name, group_code, severity)
+            if error:
+                outcomes[i] = RowOutcome(i, 0, OUTCOME_INVALID, error)
+            else:
+                valid.append((i, type_, job_name, group_code, int(severity)))
+
+        new_ids: Dict[int, int] = {}
+        if valid:
+            with self.db.transaction():
+                with self.db.get_connection() as conn:
+                    cur = conn.cursor()
+                    if self.db.dialect == "sqlite":
+                        # Sin MERGE ... OUTPUT: uno por uno (local, misma transacción)
+                        for i, type_, job_name, group_code, severity in valid:
+                            row = cur.execute(self.sql["jobs.insert"], (type_, job_name, group_code, severity)).fetchone()
+                            new_ids[i] = int(row[0])
+                    else:
+                        for c in range(0, len(valid), BATCH_CHUNK):
+                            payload = json.dumps([list(v) for v in valid[c:c + BATCH_CHUNK]], ensure_ascii=False)
+                            for ordinal, job_id in cur.execute(self.sql["jobs.insert_batch"], (payload,)).fetchall():
+                                new_ids[int(ordinal)] = int(job_id)
+
+                self.search_index.index_jobs(
+                    (new_ids[i], job_name, group_code) for i, _t, job_name, group_code, _s in valid
+                )
+                self.db.invalidate(TAG_JOBS)
+
+                if self.audit_repo is not None:
+                    snapshots = self.get_jobs_by_ids(new_ids.values())
+                    self._audit_many([self.change_entry(None, snapshots[new_ids[i]]) for i, *_rest in valid])
+
+                self.publish_saved((new_ids[i], job_name, group_code) for i, _t, job_name, group_code, _s in valid)
+
+            for i, *_rest in valid:
+                outcomes[i] = RowOutcome(i, new_ids[i], OUTCOME_INSERTED)
+
+        return outcomes
 
-    def update_job(self, job_id: int, type_: str, job_name: str, group_code: str, severity: int) -> None:
-        # Snapshot viejo para audit
-        old_obj = self.get_by_id(job_id) if self.audit_repo is not None else None
+    def update_jobs(self, rows: Iterable[Tuple[int, str, str, str, Any]]) -> List[RowOutcome]:
+        """
+        Cambio de muchos jobs: rows = (job_id, type_, job_name, group_code, severity) como update_job.
+        - OUTCOME_UPDATED / OUTCOME_UNCHANGED (valores iguales, no se escribe ni audita) /
+          OUTCOME_NOT_FOUND / OUTCOME_INVALID (incluye un Id repetido en el lote).
+        - SQL Server: un UPDATE por cada BATCH_CHUNK filas que devuelve imagen vieja y nueva
+          (como update_job); audit de todo el lote en un solo executemany.
+        - Todo en una transacción.
+        """
+        rows = list(rows)
+        outcomes: List[Optional[RowOutcome]] = [None] * len(rows)
+        valid = []
+        seen: Dict[int, int] = {}
+        for i, (job_id, type_, job_name, group_code, severity) in enumerate(rows):
+            error = self.check_values(type_, job_name, group_code, severity)
+            if not error and int(job_id) in seen:
+                error = f"Id repetido en el lote (fila {seen[int(job_id)]})."
+            if error:
+                outcomes[i] = RowOutcome(i, int(job_id), OUTCOME_INVALID, error)
+                continue
+            seen[int(job_id)] = i
+            valid.append((i, int(job_id), type_, job_name, group_code, int(severity)))
+
+        changed: Dict[int, Tuple[JobInfo, JobInfo]] = {}
+        existing: set = set()
+        if valid:
+            with self.db.transaction():
+                if self.db.dialect == "sqlite":
+                    changed = self._update_jobs_sqlite(valid)
+                else:
+                    with self.db.get_connection() as conn:
+                        cur = conn.cursor()
+                        for c in range(0, len(valid), BATCH_CHUNK):
+                            payload = json.dumps([list(v[1:]) for v in valid[c:c + BATCH_CHUNK]], ensure_ascii=False)
+                            for r in cur.execute(self.sql["jobs.update_batch"], (payload,)).fetchall():
+                                changed[int(r[0])] = (self._row_to_job(r), self._row_to_job(r, offset=8))
+
+                # Los que no cambiaron: ¿existen?
+                missing = [v[1] for v in valid if v[1] not in changed]
+                if missing:
+                    with self.db.get_connection() as conn:
+                        cur = conn.cursor()
+                        rows_found = cur.execute(self.sql["jobs.existing_ids"], (json.dumps(missing),)).fetchall()
+                    existing = {int(r[0]) for r in rows_found}
+
+                if changed:
+                    self.search_index.index_jobs(
+                        (new.id, new.job_name, new.group_code) for _old, new in changed.values()
+                    )
+                    self.db.invalidate(TAG_JOBS)
+
+                    self._audit_many([self.change_entry(old, new) for old, new in changed.values()])
+                    self.publish_saved((new.id, new.job_name, new.group_code) for _old, new in changed.values())
+
+        for i, job_id, *_rest in valid:
+            outcomes[i] = self._outcome(i, job_id, changed, existing)
+        return outcomes
+
+    def _update_jobs_sqlite(self, valid: List[tuple]) -> Dict[int, Tuple[JobInfo, JobInfo]]:
+        # Sin OUTPUT: snapshot antes y después (una consulta cada uno) y executemany en el medio
+        ids = [v[1] for v in valid]
+        before = self.get_jobs_by_ids(ids)
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            cur.executemany(
+                self.sql["jobs.update_sqlite"],
+                [(t, n, g, sev, job_id, t, n, g, sev) for _i, job_id, t, n, g, sev in valid],
+            )
+        after = self.get_jobs_by_ids(ids)
+        return {
+            job_id: (before[job_id], after[job_id])
+            for job_id in ids
+            if job_id in before and astuple(before[job_id]) != astuple(after[job_id])
+        }
 
-        sql = """
-        UPDATE dbo.Jobs_information
-        SET
-            Type = ?,
-            JobName = ?,
-            GroupCode = ?,
-            Severity = ?
-        WHERE Id = ?;
+    def bulk_update_jobs(
+        self,
+        job_ids: Iterable[int],
+        *,
+        type_: Optional[str] = None,
+        group_code: Optional[str] = None,
+        severity: Any = None,
+    ) -> List[RowOutcome]:
+        """
+        Mismos valores para muchos jobs (edición de la selección del grid). None = no cambiar.
+        - Un UPDATE por cada BATCH_CHUNK Ids (por debajo del umbral de escalamiento de
+          locks), cada chunk en su transacción con su audit en un solo executemany;
+          todo el lote comparte correlation_id.
+        - Si un chunk falla, los anteriores quedan confirmados (sus outcomes son los reales).
+        Retorna un RowOutcome por Id, en el mismo orden (repetidos: solo el primero).
         """
+        if type_ is not None and not type_.strip():
+            raise ValueError("Type es requerido.")
+        if group_code is not None and not group_code.strip():
+            raise ValueError("GroupCode es requerido.")
+        if severity is not None:
+            try:
+                severity = int(severity)
+            except (TypeError, ValueError):
+                raise ValueError(f"Severity inválida: {severity!r}")
+        if type_ is None and group_code is None and severity is None:
+            raise ValueError("No hay cambios para aplicar.")
+
+        job_ids = [int(x) for x in job_ids]
+        unique = list(dict.fromkeys(job_ids))
+        correlation_id = uuid.uuid4()
+        changed: Dict[int, Tuple[JobInfo, JobInfo]] = {}
+        existing: set = set()
+
+        for c in range(0, len(unique), BATCH_CHUNK):
+            chunk = unique[c:c + BATCH_CHUNK]
+            payload = json.dumps(chunk)
+
+            with self.db.transaction():
+                if self.db.dialect == "sqlite":
+                    # Sin OUTPUT: snapshot antes y después del UPDATE
+                    before = self.get_jobs_by_ids(chunk)
+                    with self.db.get_connection() as conn:
+                        conn.cursor().execute(
+                            self.sql["jobs.bulk_update_sqlite"], (type_, group_code, severity, payload)
+                        )
+                    after = self.get_jobs_by_ids(chunk)
+                    chunk_changed = {
+                        job_id: (before[job_id], after[job_id])
+                        for job_id in chunk
+                        if job_id in before and astuple(before[job_id]) != astuple(after[job_id])
+                    }
+                    existing.update(before)
+                else:
+                    with self.db.get_connection() as conn:
+                        cur = conn.cursor()
+                        rows = cur.execute(
+                            self.sql["jobs.bulk_update"], (type_, group_code, severity, payload)
+                        ).fetchall()
+                        chunk_changed = {
+                            int(r[0]): (self._row_to_job(r), self._row_to_job(r, offset=8)) for r in rows
+                        }
+                        missing = [job_id for job_id in chunk if job_id not in chunk_changed]
+                        if missing:
+                            found = cur.execute(self.sql["jobs.existing_ids"], (json.dumps(missing),)).fetchall()
+                            existing.update(int(r[0]) for r in found)
 
+                if chunk_changed:
+                    if group_code is not None:
+                        self.search_index.index_jobs(
+                            (new.id, new.job_name, new.group_code) for _old, new in chunk_changed.values()
+                        )
+                    self.db.invalidate(TAG_JOBS)
+
+                    if self.audit_repo is not None:
+                        self.audit_repo.insert_many(
+                            [self.change_entry(old, new) for old, new in chunk_changed.values()],
+                            actor_user_id=self._actor_user_id,
+                            correlation_id=correlation_id,
+                        )
+                    self.publish_saved((new.id, new.job_name, new.group_code) for _old, new in chunk_changed.values())
+
+            changed.update(chunk_changed)
+
+        return self._outcomes(job_ids, changed, existing)
+
+    # --------------------------------------------------
+    # BAJAS
+    # --------------------------------------------------
+
+    def retire_jobs(self, job_ids: Iterable[int]) -> List[RowOutcome]:
+        """
+        Baja lógica (IsActive = 0): el job deja de aparecer en el grid, las búsquedas,
+        el sync y el export, pero sigue en la tabla hasta purge_retired_jobs().
+        - Un UPDATE por cada BATCH_CHUNK Ids, cada chunk en su transacción con su audit
+          en un executemany (correlation_id común), como bulk_update_jobs.
+        Retorna un RowOutcome por Id: updated (se retiró), unchanged (ya estaba retirado),
+        not_found o invalid (repetido).
+        """
+        return self._set_active(job_ids, active=False)
+
+    def restore_jobs(self, job_ids: Iterable[int]) -> List[RowOutcome]:
+        """Vuelve a activar jobs retirados (mismos lotes y outcomes que retire_jobs)."""
+        return self._set_active(job_ids, active=True)
+
+    def _set_active(self, job_ids: Iterable[int], active: bool) -> List[RowOutcome]:
+        job_ids = [int(x) for x in job_ids]
+        unique = list(dict.fromkeys(job_ids))
+        correlation_id = uuid.uuid4()
+        changed: Dict[int, Tuple[str, str]] = {}  # Id -> (JobName, GroupCode)
+        existing: set = set()
+        sql = self.sql["jobs.restore" if active else "jobs.retire"]
+
+        for c in range(0, len(unique), BATCH_CHUNK):
+            chunk = unique[c:c + BATCH_CHUNK]
+
+            with self.db.transaction():
+                with self.db.get_connection() as conn:
+                    cur = conn.cursor()
+                    rows = cur.execute(sql, (json.dumps(chunk),)).fetchall()
+                    chunk_changed = {
+                        int(r[0]): ("" if r[1] is None else str(r[1]), "" if r[2] is None else str(r[2]))
+                        for r in rows
+                    }
+                    missing = [job_id for job_id in chunk if job_id not in chunk_changed]
+                    if missing:
+                        found = cur.execute(self.sql["jobs.existing_ids"], (json.dumps(missing),)).fetchall()
+                        existing.update(int(r[0]) for r in found)
+
+                if chunk_changed:
+                    # Los retirados salen de las tablas de tokens (no cuestan en la búsqueda)
+                    if active:
+                        self.search_index.index_jobs(
+                            (job_id, name, code) for job_id, (name, code) in chunk_changed.items()
+                        )
+                    else:
+                        self.search_index.remove_jobs(chunk_changed)
+                    self.db.invalidate(TAG_JOBS)
+
+                    if self.audit_repo is not None:
+                        action = "RESTORE" if active else "RETIRE"
+                        self.audit_repo.insert_many(
+                            [
+                                self.audit_entry(
+                                    action, job_id, name, code, {"is_active": not active}, {"is_active": active}
+                                )
+                                for job_id, (name, code) in chunk_changed.items()
+                            ],
+                            actor_user_id=self._actor_user_id,
+                            correlation_id=correlation_id,
+                        )
+                    if active:
+                        self.publish_saved((job_id, name, code) for job_id, (name, code) in chunk_changed.items())
+                    else:
+                        self.publish_saved(removed=chunk_changed)
+
+            changed.update(chunk_changed)
+
+        return self._outcomes(job_ids, changed, existing)
+
+    def purge_retired_jobs(
+        self,
+        retired_before: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Borra definitivamente los jobs retirados (todos, o los retirados antes de
+        retired_before, UTC).
+        - En orden de Id, de a batch_size (JOBS_PURGE_BATCH, default 500) filas por
+          transacción: cada lote bloquea pocas filas y por poco tiempo, y lo que otra
+          consola tiene bloqueado se saltea (READPAST; queda para la próxima purga).
+        - El audit de cada lote (DELETE con la fila completa en old_values) va en un
+          executemany; toda la purga comparte correlation_id.
+        - progress(borrados hasta ahora) después de cada lote; cancel corta entre lotes
+          (lo ya borrado queda borrado).
+        Retorna la cantidad de jobs borrados.
+        """
+        batch_size = max(1, int(batch_size or self.purge_batch))
+        cutoff: Any = retired_before
+        if cutoff is not None and self.db.dialect == "sqlite":
+            # En SQLite las fechas son texto ISO (ver job_query.to_sql)
+            cutoff = cutoff.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+
+        correlation_id = uuid.uuid4()
+        last_id = 0
+        purged: List[int] = []
+
+        while not (cancel is not None and cancel.is_set()):
+            with self.db.transaction():
+                deleted = self._purge_batch(batch_size, last_id, cutoff)
+                if not deleted:
+                    break
+
+                ids = [job.id for job, _retired_at in deleted]
+                self.search_index.remove_jobs(ids)
+                self.db.invalidate(TAG_JOBS)
+                self._audit_purged(deleted, correlation_id)
+                self.publish_saved(removed=ids)
+
+            purged.extend(ids)
+            last_id = max(ids)
+            if progress is not None:
+                progress(len(purged))
+
+        return len(purged)
+
+    def _purge_batch(self, batch_size: int, last_id: int, cutoff: Any) -> List[Tuple[JobInfo, str]]:
+        """Un lote de la purga (dentro de su transacción): [(fila borrada, RetiredAtUtc)]."""
         with self.db.get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(sql, (type_, job_name, group_code, int(severity), int(job_id)))
-            if cur.rowcount == 0:
-                raise ValueError("No se actualizó ningún registro (Id no encontrado).")
-            conn.commit()
-
-        # Audit (UPDATE)
-        if self.audit_repo is not None and old_obj is not None:
-            new_obj = self.get_by_id(job_id)
-            if new_obj:
-                old_dict = self._to_audit_dict(old_obj)
-                new_dict = self._to_audit_dict(new_obj)
-                changed = self._diff_keys(old_dict, new_dict)
-
-                # si no cambió nada, no auditamos
-                if changed:
-                    self.audit_repo.insert(
-                        actor_user_id=self._actor_user_id,
-                        action="UPDATE",
-                        entity_name="jobs",
-                        entity_id=str(job_id),
-                        summary=f"Updated job {job_id}: {', '.join(changed)}",
-                        old_values=old_dict,
-                        new_values=new_dict,
-                    )
\ No newline at end of file
+            if self.db.dialect != "sqlite":
+                rows = cur.execute(self.sql["jobs.purge_batch"], (batch_size, last_id, cutoff, cutoff)).fetchall()
+                return [(self._row_to_job(r), "" if r[8] is None else str(r[8])) for r in rows]
+
+            # Sin DELETE ... OUTPUT: Id del lote, snapshot y DELETE
+            candidates = cur.execute(
+                self.sql["jobs.purge_candidates"], (batch_size, last_id, cutoff, cutoff)
+            ).fetchall()
+        if not candidates:
+            return []
+        retired_at = {int(r[0]): "" if r[1] is None else str(r[1]) for r in candidates}
+        snapshots = self.get_jobs_by_ids(retired_at)
+        with self.db.get_connection() as conn:
+            conn.cursor().execute(self.sql["jobs.purge_sqlite"], (json.dumps(sorted(retired_at)),))
+        return [(snapshots[job_id], retired_at[job_id]) for job_id in sorted(snapshots)]
+
+    def _audit_purged(self, deleted: List[Tuple[JobInfo, str]], correlation_id: uuid.UUID) -> None:
+        if self.audit_repo is None:
+            return
+        entries = []
+        for job, retired_at in deleted:
+            old_dict = self._to_audit_dict(job)
+            old_dict["retired_at_utc"] = retired_at
+            entries.append(self.audit_entry("DELETE", job.id, job.job_name, job.group_code, old_dict, None))
+        self.audit_repo.insert_many(entries, actor_user_id=self._actor_user_id, correlation_id=correlation_id)
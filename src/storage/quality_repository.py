@@ -0,0 +1,142 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from src.storage.database import Database, _get_int
+from src.storage.groups_repository import GroupsRepository
+from src.storage.jobs_repository import JobsRepository, RowOutcome
+from src.storage.statements import get_statements
+
+
+CHECK_ORPHAN_JOBS = "orphan_jobs"
+CHECK_DUPLICATE_JOBS = "duplicate_jobs"
+CHECK_EMPTY_SERVICES = "empty_services"
+CHECK_UNUSED_GROUPS = "unused_groups"
+QUALITY_CHECKS = (CHECK_ORPHAN_JOBS, CHECK_DUPLICATE_JOBS, CHECK_EMPTY_SERVICES, CHECK_UNUSED_GROUPS)
+
+# Columnas del detalle de cada chequeo (statements quality.<check>); la primera
+# es la clave que se pasa a los arreglos para aplicarlos solo a esas filas
+COLUMNS = {
+    CHECK_ORPHAN_JOBS: ("GroupCode", "Jobs"),
+    CHECK_DUPLICATE_JOBS: ("KeepId", "JobName", "GroupCode", "Jobs"),
+    CHECK_EMPTY_SERVICES: ("GroupCode", "GroupName", "Jobs"),
+    CHECK_UNUSED_GROUPS: ("GroupCode", "GroupName", "ServiceName"),
+}
+
+
+@dataclass(frozen=True)
+class QualityReport:
+    orphan_jobs: int        # jobs activos con un GroupCode que no está en Groups
+    orphan_codes: int       # GroupCode distintos entre esos jobs
+    duplicate_keys: int     # JobName + GroupCode repetidos entre jobs activos
+    duplicate_jobs: int     # filas de más (las que se retirarían)
+    empty_services: int     # grupos sin ServiceName
+    unused_groups: int      # grupos sin ningún job (ni retirado)
+    scanned_at_utc: datetime
+
+    def count(self, check: str) -> int:
+        """Filas que aparecen en el detalle del chequeo."""
+        return {
+            CHECK_ORPHAN_JOBS: self.orphan_codes,
+            CHECK_DUPLICATE_JOBS: self.duplicate_keys,
+            CHECK_EMPTY_SERVICES: self.empty_services,
+            CHECK_UNUSED_GROUPS: self.unused_groups,
+        }[check]
+
+    @property
+    def clean(self) -> bool:
+        return not (self.orphan_jobs or self.duplicate_keys or self.empty_services or self.unused_groups)
+
+
+class QualityRepository:
+    """
+    Chequeos de calidad de jobs y grupos, todos por conjuntos en el server:
+    - scan(): los conteos de los cuatro chequeos en un solo statement (anti-joins y
+      GROUP BY); details(check) trae el detalle de uno, agrupado y con TOP (?).
+    - Arreglos en lote, con el mismo camino (audit, índices, listeners) que las
+      ediciones de la UI: crear los grupos que faltan o mover los huérfanos a otro
+      grupo, retirar duplicados, completar ServiceName y borrar grupos sin uso.
+      keys = la primera columna del detalle para aplicarlo solo a esas filas
+      (None = todas las que hoy tienen el problema).
+    """
+
+    def __init__(self, db: Database, jobs_repo: JobsRepository, groups_repo: GroupsRepository):
+        self.db = db
+        self.jobs_repo = jobs_repo
+        self.groups_repo = groups_repo
+        self.sql = get_statements()
+        self.detail_rows = max(1, _get_int("QUALITY_DETAIL_ROWS", 1000))
+
+    def scan(self) -> QualityReport:
+        with self.db.get_connection("list", read_only=True) as conn:
+            row = conn.cursor().execute(self.sql["quality.summary"]).fetchone()
+        return QualityReport(*(int(v or 0) for v in row), scanned_at_utc=datetime.utcnow())
+
+    def details(self, check: str, limit: Optional[int] = None) -> List[tuple]:
+        """Detalle de un chequeo (columnas de COLUMNS[check]), como mucho `limit` filas."""
+        if check not in COLUMNS:
+            raise ValueError(f"Chequeo inválido: {check!r}")
+        with self.db.get_connection("list", read_only=True) as conn:
+            rows = conn.cursor().execute(self.sql[f"quality.{check}"], (int(limit or self.detail_rows),)).fetchall()
+        return [tuple("" if v is None else v for v in r) for r in rows]
+
+    @staticmethod
+    def _keys_param(keys: Optional[Iterable[Any]]) -> Optional[str]:
+        return None if keys is None else json.dumps(sorted(set(keys)), ensure_ascii=False)
+
+    def _column(self, name: str, keys: Optional[Iterable[Any]]) -> List[Any]:
+        param = self._keys_param(keys)
+        if param == "[]":
+            return []
+        with self.db.get_connection(read_only=True) as conn:
+            rows = conn.cursor().execute(self.sql[name], (param, param)).fetchall()
+        return [r[0] for r in rows]
+
+    # ---------------- arreglos ----------------
+
+    def create_missing_groups(self, keys: Optional[Iterable[str]] = None, service_name: str = "") -> List[str]:
+        """Huérfanos: crea los grupos que faltan (GroupName = GroupCode). Retorna los creados."""
+        return self.groups_repo.add_missing_groups(keys, service_name=service_name)
+
+    def move_orphans(self, group_code: str, keys: Optional[Iterable[str]] = None) -> List[RowOutcome]:
+        """Huérfanos: pasa esos jobs a un grupo que exista (bulk_update_jobs)."""
+        group_code = (group_code or "").strip()
+        if not group_code:
+            raise ValueError("GroupCode es requerido.")
+        if self.groups_repo.get_by_code(group_code) is None:
+            raise ValueError(f"El grupo {group_code} no existe.")
+        job_ids = [int(x) for x in self._column("quality.orphan_job_ids", keys)]
+        if not job_ids:
+            return []
+        return self.jobs_repo.bulk_update_jobs(job_ids, group_code=group_code)
+
+    def retire_duplicates(self, keys: Optional[Iterable[int]] = None) -> List[RowOutcome]:
+        """
+        Duplicados: retira (baja lógica, se puede restaurar) todos menos el más viejo
+        de cada JobName + GroupCode. keys = KeepId del detalle.
+        """
+        keys = None if keys is None else [int(k) for k in keys]
+        job_ids = [int(x) for x in self._column("quality.duplicate_job_ids", keys)]
+        if not job_ids:
+            return []
+        return self.jobs_repo.retire_jobs(job_ids)
+
+    def set_service(self, service_name: str, keys: Optional[Iterable[str]] = None) -> List[str]:
+        """Sin servicio: mismo ServiceName para esos grupos (update_groups). Retorna los cambiados."""
+        service_name = (service_name or "").strip()
+        if not service_name:
+            raise ValueError("ServiceName es requerido.")
+        param = self._keys_param(keys)
+        if param == "[]":
+            return []
+        with self.db.get_connection(read_only=True) as conn:
+            rows = conn.cursor().execute(self.sql["quality.empty_service_groups"], (param, param)).fetchall()
+        return self.groups_repo.update_groups(
+            (str(code), "" if name is None else str(name), service_name) for code, name in rows
+        )
+
+    def delete_unused_groups(self, keys: Optional[Iterable[str]] = None) -> List[str]:
+        """Sin uso: borra los grupos sin ningún job. Retorna los borrados."""
+        codes = [str(c) for c in self._column("quality.unused_group_codes", keys)]
+        return self.groups_repo.delete_unused_groups(codes)
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+
+# Tags de invalidación: una por tabla
+TAG_JOBS = "Jobs_information"
+TAG_GROUPS = "Groups"
+TAG_USERS = "wt_users"
+
+
+class ReadCache:
+    """
+    Cache de lecturas de los repositorios, por (statement, parámetros).
+    - TTL: lo que cambian otras consolas se ve a más tardar en ttl segundos.
+    - LRU: como máximo max_entries resultados en memoria.
+    - Tags por tabla: cada escritura invalida las lecturas de esa tabla.
+      Una lectura que empezó antes de una invalidación no se guarda (versiones por tag).
+    ttl <= 0 o max_entries <= 0 la apaga.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0):
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[str, ...], Any]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._versions: Dict[str, int] = {}
+        self._generation = 0  # clear() invalida todo, incluidas las lecturas en vuelo
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get_or_load(self, key: Hashable, tags: Iterable[str], loader: Callable[[], Any]) -> Any:
+        tags = tuple(tags)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            versions = self._snapshot(tags)
+
+        value = loader()
+
+        with self._lock:
+            if versions == self._snapshot(tags):
+                self._drop(key)
+                self._entries[key] = (time.monotonic() + self.ttl, tags, value)
+                for t in tags:
+                    self._by_tag.setdefault(t, set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    self._drop(next(iter(self._entries)))
+
+        return value
+
+    def _snapshot(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._generation,) + tuple(self._versions.get(t, 0) for t in tags)
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for t in entry[1]:
+            keys = self._by_tag.get(t)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            for t in tags:
+                self._versions[t] = self._versions.get(t, 0) + 1
+                for key in list(self._by_tag.pop(t, ())):
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,306 @@
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple
+
+from src.storage.database import QueryTimeoutError
+
+
+# Esquema mínimo equivalente al de SQL Server (Jobs_information, Groups, wt_users, wt_audit_log)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS [Groups] (
+    GroupCode     TEXT PRIMARY KEY,
+    GroupName     TEXT NOT NULL,
+    ServiceName   TEXT,
+    CreatedAtUtc  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS Jobs_information (
+    Id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    Type          TEXT,
+    JobName       TEXT NOT NULL,
+    GroupCode     TEXT,
+    Severity      INTEGER,
+    CreatedAtUtc  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+    IsActive      INTEGER NOT NULL DEFAULT 1,
+    RetiredAtUtc  TEXT
+);
+
+CREATE INDEX IF NOT EXISTS IX_Jobs_information_CreatedAtUtc
+    ON Jobs_information (CreatedAtUtc DESC, Id DESC);
+CREATE INDEX IF NOT EXISTS IX_Jobs_information_GroupCode
+    ON Jobs_information (GroupCode);
+CREATE INDEX IF NOT EXISTS IX_Jobs_information_JobName_GroupCode
+    ON Jobs_information (JobName, GroupCode);
+CREATE INDEX IF NOT EXISTS IX_Jobs_information_Active
+    ON Jobs_information (CreatedAtUtc DESC, Id DESC) WHERE IsActive = 1;
+CREATE INDEX IF NOT EXISTS IX_Jobs_information_Retired
+    ON Jobs_information (Id, RetiredAtUtc) WHERE IsActive = 0;
+
+CREATE TABLE IF NOT EXISTS Jobs_search_tokens (
+    Token  TEXT NOT NULL,
+    JobId  INTEGER NOT NULL,
+    PRIMARY KEY (Token, JobId)
+);
+CREATE INDEX IF NOT EXISTS IX_Jobs_search_tokens_JobId
+    ON Jobs_search_tokens (JobId);
+
+CREATE TABLE IF NOT EXISTS Groups_search_tokens (
+    Token      TEXT NOT NULL,
+    GroupCode  TEXT NOT NULL,
+    PRIMARY KEY (Token, GroupCode)
+);
+CREATE INDEX IF NOT EXISTS IX_Groups_search_tokens_GroupCode
+    ON Groups_search_tokens (GroupCode);
+
+CREATE TABLE IF NOT EXISTS Jobs_import_staging (
+    ImportKey    TEXT NOT NULL,
+    RowNum       INTEGER NOT NULL,
+    Type         TEXT,
+    JobName      TEXT NOT NULL,
+    GroupCode    TEXT NOT NULL,
+    Severity     INTEGER,
+    GroupName    TEXT,
+    ServiceName  TEXT,
+    PRIMARY KEY (ImportKey, RowNum)
+);
+
+CREATE TABLE IF NOT EXISTS wt_users (
+    user_id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    username              TEXT NOT NULL UNIQUE,
+    display_name          TEXT,
+    email                 TEXT,
+    password_hash         TEXT,
+    password_algo         TEXT,
+    role_code             TEXT,
+    is_active             INTEGER NOT NULL DEFAULT 1,
+    must_change_password  INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS wt_audit_log (
+    audit_id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_time_utc   TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+    actor_user_id    INTEGER,
+    action           TEXT NOT NULL,
+    entity_name      TEXT NOT NULL,
+    entity_id        TEXT,
+    summary          TEXT,
+    old_values_json  TEXT,
+    new_values_json  TEXT,
+    source_host      TEXT,
+    source_ip        TEXT,
+    correlation_id   TEXT
+);
+"""
+
+_TOP_RE = re.compile(r"\bSELECT\s+TOP\s*\(\s*(\?|\d+)\s*\)", re.IGNORECASE)
+_OUTPUT_INSERTED_RE = re.compile(
+    r"\bOUTPUT\s+(INSERTED\.\w+(?:\s*,\s*INSERTED\.\w+)*)", re.IGNORECASE
+)
+
+_LOCK_HINT_RE = re.compile(
+    r"\s+WITH\s*\(\s*(?:NOLOCK|UPDLOCK|HOLDLOCK|ROWLOCK|READPAST)(?:\s*,\s*\w+)*\s*\)", re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=512)
+def translate_sql(sql: str) -> Tuple[str, Optional[int]]:
+    """
+    Traduce el T-SQL que usan los repositorios a SQLite.
+    Retorna (sql, índice del parámetro de TOP (?) o None): ese parámetro
+    se mueve al final porque en SQLite el LIMIT va al final del statement.
+    """
+    top_param = None
+    tail = []
+
+    m = _TOP_RE.search(sql)
+    if m:
+        if m.group(1) == "?":
+            top_param = sql[:m.start()].count("?")
+            tail.append("LIMIT ?")
+        else:
+            tail.append(f"LIMIT {m.group(1)}")
+        sql = sql[:m.start()] + "SELECT" + sql[m.end():]
+
+    m = _OUTPUT_INSERTED_RE.search(sql)
+    if m:
+        cols = re.sub(r"INSERTED\.", "", m.group(1), flags=re.IGNORECASE)
+        tail.append(f"RETURNING {cols}")
+        sql = sql[:m.start()] + sql[m.end():]
+
+    sql = re.sub(r"\bdbo\.", "", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bISNULL\s*\(", "IFNULL(", sql, flags=re.IGNORECASE)
+    # Hints de lock (WITH (UPDLOCK, HOLDLOCK)): SQLite bloquea la base entera al escribir
+    sql = _LOCK_HINT_RE.sub("", sql)
+    # Lista JSON como tabla: OPENJSON(?) y json_each(?) exponen la columna value
+    sql = re.sub(r"\bOPENJSON\s*\(", "json_each(", sql, flags=re.IGNORECASE)
+    sql = re.sub(
+        r"\bGETUTCDATE\s*\(\s*\)",
+        "strftime('%Y-%m-%d %H:%M:%f', 'now')",
+        sql,
+        flags=re.IGNORECASE,
+    )
+
+    if tail:
+        sql = sql.rstrip().rstrip(";") + "\n" + " ".join(tail) + ";"
+
+    return sql, top_param
+
+
+def _is_interrupt(e: Exception) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and "interrupted" in str(e)
+
+
+class _SqliteCursor:
+    """Cursor con la interfaz de pyodbc que usan los repositorios."""
+
+    def __init__(self, conn: "SqliteConnection"):
+        self._conn = conn
+        self._cur = conn.raw.cursor()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    @property
+    def arraysize(self) -> int:
+        return self._cur.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value: int) -> None:
+        self._cur.arraysize = value
+
+    def _run(self, fn, *args):
+        self._conn.start_deadline()
+        try:
+            return fn(*args)
+        except sqlite3.OperationalError as e:
+            if _is_interrupt(e) and self._conn.timed_out:
+                raise QueryTimeoutError(
+                    "La consulta excedió el tiempo límite. Intenta de nuevo o acota la búsqueda."
+                ) from e
+            raise
+        finally:
+            self._conn.clear_deadline()
+
+    def execute(self, sql: str, *params: Any) -> "_SqliteCursor":
+        # pyodbc acepta execute(sql, (a, b)) y execute(sql, a, b)
+        if len(params) == 1 and isinstance(params[0], (tuple, list)):
+            params = tuple(params[0])
+
+        sql, top_param = translate_sql(sql)
+        if top_param is not None:
+            params = list(params)
+            params.append(params.pop(top_param))
+
+        self._run(self._cur.execute, sql, tuple(params))
+        return self
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        sql, _ = translate_sql(sql)
+        self._run(self._cur.executemany, sql, [tuple(p) for p in seq_of_params])
+
+    def fetchone(self):
+        return self._run(self._cur.fetchone)
+
+    def fetchmany(self, size: Optional[int] = None):
+        return self._run(self._cur.fetchmany, size or self._cur.arraysize)
+
+    def fetchall(self):
+        return self._run(self._cur.fetchall)
+
+    def cancel(self) -> None:
+        self._conn.raw.interrupt()
+
+    def close(self) -> None:
+        self._cur.close()
+
+    def __iter__(self):
+        return iter(self._cur)
+
+
+class SqliteConnection:
+    """
+    Conexión sqlite3 con la interfaz de pyodbc que usan los repositorios:
+    cursor(), execute(), commit(), rollback(), close() y `timeout` (segundos).
+    """
+
+    def __init__(self, raw: sqlite3.Connection):
+        self.raw = raw
+        self.timeout = 0
+        self.timed_out = False
+        self._deadline = 0.0
+        raw.set_progress_handler(self._check_deadline, 10000)
+
+    def _check_deadline(self) -> int:
+        if self._deadline and time.monotonic() > self._deadline:
+            self.timed_out = True
+            return 1
+        return 0
+
+    def start_deadline(self) -> None:
+        self.timed_out = False
+        self._deadline = time.monotonic() + self.timeout if self.timeout else 0.0
+
+    def clear_deadline(self) -> None:
+        self._deadline = 0.0
+
+    def cursor(self) -> _SqliteCursor:
+        return _SqliteCursor(self)
+
+    def execute(self, sql: str, *params: Any) -> _SqliteCursor:
+        return self.cursor().execute(sql, *params)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+class SqliteBackend:
+    """
+    Backend local para desarrollo, pruebas y benchmarks (DB_BACKEND=sqlite).
+    Corre el mismo SQL de los repositorios traduciendo TOP, GETUTCDATE(),
+    OUTPUT INSERTED, ISNULL, OPENJSON y dbo.[...]; crea el esquema si no existe.
+    DB_SQLITE_PATH=":memory:" usa una base en memoria compartida por el pool.
+    """
+
+    dialect = "sqlite"
+    supports_isolation = False
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        if self.path == ":memory:":
+            self._target, self._uri = "file:ctlmanager?mode=memory&cache=shared", True
+        else:
+            self._target, self._uri = self.path, False
+        self.conn_str = f"sqlite:///{self.path}"
+
+        self._lock = threading.Lock()
+        self._bootstrapped = False
+        # Mantiene viva la base en memoria aunque el pool cierre todas sus conexiones
+        self._keepalive: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> sqlite3.Connection:
+        # El pool presta la conexión a un hilo a la vez
+        return sqlite3.connect(self._target, uri=self._uri, check_same_thread=False, timeout=30)
+
+    def connect(self) -> SqliteConnection:
+        raw = self._open()
+
+        with self._lock:
+            if not self._bootstrapped:
+                raw.executescript(SCHEMA)
+                raw.commit()
+                if self._uri:
+                    self._keepalive = self._open()
+                self._bootstrapped = True
+
+        return SqliteConnection(raw)
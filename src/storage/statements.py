@@ -0,0 +1,1047 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+_IDENT_RE = re.compile(r"^(\[[^\]]+\]|[A-Za-z_][A-Za-z0-9_]*)$")
+
+
+def _check_ident(name: str, env_name: str) -> str:
+    # Los nombres vienen del env y van directo al SQL: solo identificadores simples
+    parts = name.split(".")
+    if not name or len(parts) > 2 or not all(_IDENT_RE.match(p) for p in parts):
+        raise ValueError(f"{env_name} inválido: {name!r}")
+    return name
+
+
+def _unquote(name: str) -> str:
+    return name[1:-1] if name.startswith("[") and name.endswith("]") else name
+
+
+@dataclass(frozen=True)
+class UsersMapping:
+    """Tabla y columnas de usuarios configurables por env (USERS_TABLE, COL_*)."""
+
+    table: str
+    col_user_id: str
+    col_user: str
+    col_pass: str
+    col_algo: str
+    col_must: str
+    col_active: str
+    col_role: str
+
+    @staticmethod
+    def from_env() -> "UsersMapping":
+        def env(name: str, default: str) -> str:
+            return _check_ident(os.getenv(name, default).strip(), name)
+
+        return UsersMapping(
+            table=env("USERS_TABLE", "dbo.wt_users"),
+            col_user_id=env("COL_USER_ID", "user_id"),
+            col_user=env("COL_USERNAME", "username"),
+            col_pass=env("COL_PASSWORD_HASH", "password_hash"),
+            col_algo=env("COL_PASSWORD_ALGO", "password_algo"),
+            col_must=env("COL_MUST_CHANGE", "must_change_password"),
+            col_active=env("COL_IS_ACTIVE", "is_active"),
+            col_role=env("COL_ROLE_CODE", "role_code"),
+        )
+
+    def schema_and_table(self) -> Tuple[str, str]:
+        parts = [_unquote(p) for p in self.table.split(".")]
+        return ("dbo", parts[0]) if len(parts) == 1 else (parts[0], parts[1])
+
+    def required_columns(self) -> List[str]:
+        cols = [
+            self.col_user_id, self.col_user, self.col_pass, self.col_algo,
+            self.col_must, self.col_active, self.col_role,
+            "display_name", "email",
+        ]
+        return [_unquote(c) for c in cols]
+
+
+# Columnas de JobInfo (ver JobsRepository._row_to_job)
+_JOB_SELECT = """
+    j.Id,
+    j.Type,
+    j.JobName,
+    j.GroupCode,
+    ISNULL(g.GroupName, '') AS GroupName,
+    ISNULL(g.ServiceName, '') AS ServiceName,
+    j.Severity,
+    j.CreatedAtUtc
+FROM dbo.Jobs_information AS j
+LEFT JOIN dbo.[Groups] AS g
+    ON g.GroupCode = j.GroupCode"""
+
+# Filtro por estado de los listados (ver JobsRepository, STATUS_*). El literal (no un
+# parámetro) es lo que permite usar los índices filtrados WHERE IsActive = 1 / 0
+JOB_STATUS_WHERE = {
+    "active": "j.IsActive = 1",
+    "retired": "j.IsActive = 0",
+    "all": "1 = 1",
+}
+
+# Búsqueda LIKE en las 4 columnas del grid (jobs.search_page y los otros estados)
+JOB_LIKE_WHERE = """(
+                j.JobName LIKE ?
+                OR j.GroupCode LIKE ?
+                OR g.GroupName LIKE ?
+                OR g.ServiceName LIKE ?
+            )"""
+
+
+# Export (ver export_repository): columnas + FROM de cada tipo y su clave (orden y reanudación)
+_EXPORT_SOURCES = {
+    "jobs": (_JOB_SELECT, "j.Id"),
+    "groups": ("""
+    GroupCode,
+    GroupName,
+    ServiceName
+FROM dbo.[Groups]""", "GroupCode"),
+    "audit": ("""
+    audit_id,
+    event_time_utc,
+    actor_user_id,
+    action,
+    entity_name,
+    entity_id,
+    summary,
+    old_values_json,
+    new_values_json,
+    source_host,
+    source_ip,
+    correlation_id
+FROM dbo.wt_audit_log""", "audit_id"),
+}
+
+# Tamaños fijos para listas IN (...): pocos textos de SQL distintos = pocos planes
+IN_BUCKETS = (1, 8, 32, 128)
+
+
+def in_params(values: Sequence[Any]) -> Tuple[str, tuple]:
+    """
+    Placeholders y parámetros para IN (...) con hasta IN_BUCKETS[-1] valores.
+    Se rellena repitiendo el último valor hasta el bucket siguiente.
+    """
+    n = len(values)
+    if not n or n > IN_BUCKETS[-1]:
+        raise ValueError(f"in_params: se esperaban entre 1 y {IN_BUCKETS[-1]} valores (vinieron {n})")
+    size = next(b for b in IN_BUCKETS if b >= n)
+    padded = tuple(values) + (values[-1],) * (size - n)
+    return ", ".join("?" * size), padded
+
+
+def _build(u: UsersMapping) -> Dict[str, str]:
+    return {
+        # ---------------- Jobs ----------------
+        # TOP (?) como parámetro: un solo plan en el server para cualquier límite.
+        # Keyset: orden estable (CreatedAtUtc, Id) y seek desde la última fila vista.
+        # Cada página cuesta lo mismo sin importar cuántas filas hay antes (sin OFFSET).
+        # Solo jobs activos: los retirados no se recorren (índice filtrado, ver README).
+        "jobs.page": f"""
+        SELECT TOP (?)
+        {_JOB_SELECT}
+        WHERE j.IsActive = 1
+        ORDER BY j.CreatedAtUtc DESC, j.Id DESC;
+        """,
+        "jobs.page_after": f"""
+        SELECT TOP (?)
+        {_JOB_SELECT}
+        WHERE
+            j.IsActive = 1
+            AND (
+                j.CreatedAtUtc < ?
+                OR (j.CreatedAtUtc = ? AND j.Id < ?)
+            )
+        ORDER BY j.CreatedAtUtc DESC, j.Id DESC;
+        """,
+        "jobs.search_page": f"""
+        SELECT TOP (?)
+        {_JOB_SELECT}
+        WHERE
+            j.IsActive = 1
+            AND {JOB_LIKE_WHERE}
+        ORDER BY j.CreatedAtUtc DESC, j.Id DESC;
+        """,
+        "jobs.search_page_after": f"""
+        SELECT TOP (?)
+        {_JOB_SELECT}
+        WHERE
+            j.IsActive = 1
+            AND {JOB_LIKE_WHERE}
+            AND (
+                j.CreatedAtUtc < ?
+                OR (j.CreatedAtUtc = ? AND j.Id < ?)
+            )
+        ORDER BY j.CreatedAtUtc DESC, j.Id DESC;
+        """,
+        "jobs.get_by_id": f"""
+        SELECT
+        {_JOB_SELECT}
+        WHERE j.Id = ?;
+        """,
+        # Cambios desde un watermark rowversion (ver change_tracking); el grupo también
+        # cuenta porque GroupName/ServiceName van en cada fila del grid
+        "jobs.changed_rowversion": f"""
+        SELECT
+        {_JOB_SELECT}
+        WHERE
+            j.IsActive = 1
+            AND (
+                (j.RowVer >= ? AND j.RowVer < ?)
+                OR (g.RowVer >= ? AND g.RowVer < ?)
+            );
+        """,
+        # Retirados en el rango: el cliente los saca de lo que tiene
+        "jobs.retired_rowversion": """
+        SELECT Id
+        FROM dbo.Jobs_information
+        WHERE IsActive = 0 AND RowVer >= ? AND RowVer < ?;
+        """,
+        "jobs.exists": "SELECT 1 FROM dbo.Jobs_information WHERE Id = ?;",
+        "jobs.insert": """
+        INSERT INTO dbo.Jobs_information (Type, JobName, GroupCode, Severity, CreatedAtUtc)
+        OUTPUT INSERTED.Id
+        VALUES (?, ?, ?, ?, GETUTCDATE());
+        """,
+        # Devuelve imagen vieja (DELETED) y nueva (INSERTED) para el audit; no escribe si no hay cambios
+        "jobs.update": """
+        UPDATE j
+        SET
+            Type = ?,
+            JobName = ?,
+            GroupCode = ?,
+            Severity = ?
+        OUTPUT
+            DELETED.Id,
+            DELETED.Type,
+            DELETED.JobName,
+            DELETED.GroupCode,
+            ISNULL(g_old.GroupName, ''),
+            ISNULL(g_old.ServiceName, ''),
+            DELETED.Severity,
+            DELETED.CreatedAtUtc,
+            INSERTED.Id,
+            INSERTED.Type,
+            INSERTED.JobName,
+            INSERTED.GroupCode,
+            ISNULL(g_new.GroupName, ''),
+            ISNULL(g_new.ServiceName, ''),
+            INSERTED.Severity,
+            INSERTED.CreatedAtUtc
+        FROM dbo.Jobs_information AS j
+        LEFT JOIN dbo.[Groups] AS g_old
+            ON g_old.GroupCode = j.GroupCode
+        LEFT JOIN dbo.[Groups] AS g_new
+            ON g_new.GroupCode = ?
+        WHERE j.Id = ?
+          AND EXISTS (
+              SELECT j.Type, j.JobName, j.GroupCode, j.Severity
+              EXCEPT
+              SELECT ?, ?, ?, ?
+          );
+        """,
+        # SQLite no tiene OUTPUT DELETED (ver JobsRepository._update_job_sqlite)
+        "jobs.update_sqlite": """
+        UPDATE dbo.Jobs_information
+        SET Type = ?, JobName = ?, GroupCode = ?, Severity = ?
+        WHERE Id = ?
+          AND (Type IS NOT ? OR JobName IS NOT ? OR GroupCode IS NOT ? OR Severity IS NOT ?);
+        """,
+
+        # Lotes (ver JobsRepository.add_jobs / update_jobs / get_jobs_by_ids): las filas
+        # viajan en un solo parámetro JSON que OPENJSON convierte en tabla (SQL Server 2016+).
+        # El texto no depende del tamaño del lote: un solo plan.
+        "jobs.by_ids": f"""
+        SELECT
+        {_JOB_SELECT}
+        WHERE j.Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?));
+        """,
+        "jobs.by_ids_active": f"""
+        SELECT
+        {_JOB_SELECT}
+        WHERE j.Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?))
+          AND j.IsActive = 1;
+        """,
+        # Lo guardado de esos Id, bloqueado hasta el commit (ver change_set: detección de conflictos)
+        "jobs.by_ids_for_update": """
+        SELECT
+            j.Id,
+            j.Type,
+            j.JobName,
+            j.GroupCode,
+            ISNULL(g.GroupName, '') AS GroupName,
+            ISNULL(g.ServiceName, '') AS ServiceName,
+            j.Severity,
+            j.CreatedAtUtc
+        FROM dbo.Jobs_information AS j WITH (UPDLOCK, HOLDLOCK)
+        LEFT JOIN dbo.[Groups] AS g
+            ON g.GroupCode = j.GroupCode
+        WHERE j.Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?));
+        """,
+        "jobs.existing_ids": """
+        SELECT Id
+        FROM dbo.Jobs_information
+        WHERE Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?));
+        """,
+        # MERGE con ON 1 = 0 = INSERT que puede devolver columnas del origen (Ord):
+        # así cada Id nuevo se asocia a su fila del lote
+        "jobs.insert_batch": """
+        MERGE INTO dbo.Jobs_information AS t
+        USING (
+            SELECT Ord, Type, JobName, GroupCode, Severity
+            FROM OPENJSON(?) WITH (
+                Ord INT '$[0]',
+                Type NVARCHAR(MAX) '$[1]',
+                JobName NVARCHAR(MAX) '$[2]',
+                GroupCode NVARCHAR(MAX) '$[3]',
+                Severity INT '$[4]'
+            )
+        ) AS s
+        ON 1 = 0
+        WHEN NOT MATCHED THEN
+            INSERT (Type, JobName, GroupCode, Severity, CreatedAtUtc)
+            VALUES (s.Type, s.JobName, s.GroupCode, s.Severity, GETUTCDATE())
+        OUTPUT s.Ord, INSERTED.Id;
+        """,
+        # Igual que jobs.update pero para todo el lote: solo toca (y devuelve) lo que cambia
+        "jobs.update_batch": """
+        UPDATE j
+        SET
+            Type = s.Type,
+            JobName = s.JobName,
+            GroupCode = s.GroupCode,
+            Severity = s.Severity
+        OUTPUT
+            DELETED.Id,
+            DELETED.Type,
+            DELETED.JobName,
+            DELETED.GroupCode,
+            ISNULL(g_old.GroupName, ''),
+            ISNULL(g_old.ServiceName, ''),
+            DELETED.Severity,
+            DELETED.CreatedAtUtc,
+            INSERTED.Id,
+            INSERTED.Type,
+            INSERTED.JobName,
+            INSERTED.GroupCode,
+            ISNULL(g_new.GroupName, ''),
+            ISNULL(g_new.ServiceName, ''),
+            INSERTED.Severity,
+            INSERTED.CreatedAtUtc
+        FROM dbo.Jobs_information AS j
+        INNER JOIN OPENJSON(?) WITH (
+            Id INT '$[0]',
+            Type NVARCHAR(MAX) '$[1]',
+            JobName NVARCHAR(MAX) '$[2]',
+            GroupCode NVARCHAR(MAX) '$[3]',
+            Severity INT '$[4]'
+        ) AS s
+            ON s.Id = j.Id
+        LEFT JOIN dbo.[Groups] AS g_old
+            ON g_old.GroupCode = j.GroupCode
+        LEFT JOIN dbo.[Groups] AS g_new
+            ON g_new.GroupCode = s.GroupCode
+        WHERE EXISTS (
+            SELECT j.Type, j.JobName, j.GroupCode, j.Severity
+            EXCEPT
+            SELECT s.Type, s.JobName, s.GroupCode, s.Severity
+        );
+        """,
+        # Edición en lote (ver JobsRepository.bulk_update_jobs): los mismos valores para
+        # todos los Id del chunk; NULL = no cambiar esa columna
+        "jobs.bulk_update": """
+        UPDATE j
+        SET
+            Type = ISNULL(v.Type, j.Type),
+            GroupCode = ISNULL(v.GroupCode, j.GroupCode),
+            Severity = ISNULL(v.Severity, j.Severity)
+        OUTPUT
+            DELETED.Id,
+            DELETED.Type,
+            DELETED.JobName,
+            DELETED.GroupCode,
+            ISNULL(g_old.GroupName, ''),
+            ISNULL(g_old.ServiceName, ''),
+            DELETED.Severity,
+            DELETED.CreatedAtUtc,
+            INSERTED.Id,
+            INSERTED.Type,
+            INSERTED.JobName,
+            INSERTED.GroupCode,
+            ISNULL(g_new.GroupName, ''),
+            ISNULL(g_new.ServiceName, ''),
+            INSERTED.Severity,
+            INSERTED.CreatedAtUtc
+        FROM dbo.Jobs_information AS j
+        CROSS JOIN (
+            SELECT
+                CAST(? AS NVARCHAR(MAX)) AS Type,
+                CAST(? AS NVARCHAR(MAX)) AS GroupCode,
+                CAST(? AS INT) AS Severity
+        ) AS v
+        LEFT JOIN dbo.[Groups] AS g_old
+            ON g_old.GroupCode = j.GroupCode
+        LEFT JOIN dbo.[Groups] AS g_new
+            ON g_new.GroupCode = ISNULL(v.GroupCode, j.GroupCode)
+        WHERE j.Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?))
+          AND EXISTS (
+              SELECT j.Type, j.GroupCode, j.Severity
+              EXCEPT
+              SELECT ISNULL(v.Type, j.Type), ISNULL(v.GroupCode, j.GroupCode), ISNULL(v.Severity, j.Severity)
+          );
+        """,
+        "jobs.bulk_update_sqlite": """
+        UPDATE dbo.Jobs_information
+        SET
+            Type = ISNULL(?, Type),
+            GroupCode = ISNULL(?, GroupCode),
+            Severity = ISNULL(?, Severity)
+        WHERE Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?));
+        """,
+
+        # Baja lógica (ver JobsRepository.retire_jobs / restore_jobs): solo toca (y
+        # devuelve) los que cambian de estado
+        "jobs.retire": """
+        UPDATE dbo.Jobs_information
+        SET IsActive = 0, RetiredAtUtc = GETUTCDATE()
+        OUTPUT INSERTED.Id, INSERTED.JobName, INSERTED.GroupCode
+        WHERE Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?))
+          AND IsActive = 1;
+        """,
+        "jobs.restore": """
+        UPDATE dbo.Jobs_information
+        SET IsActive = 1, RetiredAtUtc = NULL
+        OUTPUT INSERTED.Id, INSERTED.JobName, INSERTED.GroupCode
+        WHERE Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?))
+          AND IsActive = 0;
+        """,
+        # Purga (ver JobsRepository.purge_retired_jobs): un lote de retirados en orden de
+        # Id a partir del último borrado. ROWLOCK + lotes chicos = sin escalar a lock de
+        # tabla; READPAST = lo que otra consola tiene bloqueado se saltea (y no la espera).
+        "jobs.purge_batch": """
+        DELETE j
+        OUTPUT
+            DELETED.Id,
+            DELETED.Type,
+            DELETED.JobName,
+            DELETED.GroupCode,
+            ISNULL(g.GroupName, ''),
+            ISNULL(g.ServiceName, ''),
+            DELETED.Severity,
+            DELETED.CreatedAtUtc,
+            DELETED.RetiredAtUtc
+        FROM dbo.Jobs_information AS j WITH (ROWLOCK, READPAST)
+        INNER JOIN (
+            SELECT TOP (?) Id
+            FROM dbo.Jobs_information WITH (READPAST)
+            WHERE IsActive = 0
+              AND Id > ?
+              AND (? IS NULL OR RetiredAtUtc < ?)
+            ORDER BY Id ASC
+        ) AS b
+            ON b.Id = j.Id
+        LEFT JOIN dbo.[Groups] AS g
+            ON g.GroupCode = j.GroupCode
+        WHERE j.IsActive = 0;
+        """,
+        # SQLite no tiene DELETE ... OUTPUT con joins: lote de Id, snapshot y DELETE
+        "jobs.purge_candidates": """
+        SELECT TOP (?) Id, RetiredAtUtc
+        FROM dbo.Jobs_information
+        WHERE IsActive = 0
+          AND Id > ?
+          AND (? IS NULL OR RetiredAtUtc < ?)
+        ORDER BY Id ASC;
+        """,
+        "jobs.purge_sqlite": """
+        DELETE FROM dbo.Jobs_information
+        WHERE Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?))
+          AND IsActive = 0;
+        """,
+
+        # ---------------- Groups ----------------
+        "groups.list": """
+        SELECT TOP (?)
+            GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups]
+        ORDER BY GroupCode ASC;
+        """,
+        "groups.get_by_code": """
+        SELECT GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups]
+        WHERE GroupCode = ?;
+        """,
+        "groups.changed_rowversion": """
+        SELECT GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups]
+        WHERE RowVer >= ? AND RowVer < ?;
+        """,
+        "groups.by_codes": """
+        SELECT GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups]
+        WHERE GroupCode IN (SELECT value FROM OPENJSON(?));
+        """,
+        "groups.by_codes_for_update": """
+        SELECT GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups] WITH (UPDLOCK, HOLDLOCK)
+        WHERE GroupCode IN (SELECT value FROM OPENJSON(?));
+        """,
+        "groups.exists": "SELECT 1 FROM dbo.[Groups] WHERE GroupCode = ?;",
+        "groups.insert": """
+        INSERT INTO dbo.[Groups] (GroupCode, GroupName, ServiceName, CreatedAtUtc)
+        VALUES (?, ?, ?, GETUTCDATE());
+        """,
+        "groups.update": """
+        UPDATE g
+        SET GroupName = ?, ServiceName = ?
+        OUTPUT
+            DELETED.GroupCode, DELETED.GroupName, DELETED.ServiceName,
+            INSERTED.GroupCode, INSERTED.GroupName, INSERTED.ServiceName
+        FROM dbo.[Groups] AS g
+        WHERE g.GroupCode = ?
+          AND EXISTS (
+              SELECT g.GroupName, g.ServiceName
+              EXCEPT
+              SELECT ?, ?
+          );
+        """,
+        "groups.update_sqlite": """
+        UPDATE dbo.[Groups]
+        SET GroupName = ?, ServiceName = ?
+        WHERE GroupCode = ?
+          AND (GroupName IS NOT ? OR ServiceName IS NOT ?);
+        """,
+        "groups.update_batch": """
+        UPDATE g
+        SET GroupName = s.GroupName, ServiceName = s.ServiceName
+        OUTPUT
+            DELETED.GroupCode, DELETED.GroupName, DELETED.ServiceName,
+            INSERTED.GroupCode, INSERTED.GroupName, INSERTED.ServiceName
+        FROM dbo.[Groups] AS g
+        INNER JOIN OPENJSON(?) WITH (
+            GroupCode NVARCHAR(MAX) '$[0]',
+            GroupName NVARCHAR(MAX) '$[1]',
+            ServiceName NVARCHAR(MAX) '$[2]'
+        ) AS s
+            ON s.GroupCode = g.GroupCode
+        WHERE EXISTS (
+            SELECT g.GroupName, g.ServiceName
+            EXCEPT
+            SELECT s.GroupName, s.ServiceName
+        );
+        """,
+        # Grupos que faltan para los jobs activos que los referencian (ver
+        # GroupsRepository.add_missing_groups): GroupName = GroupCode hasta que se edite
+        "groups.insert_missing": """
+        INSERT INTO dbo.[Groups] (GroupCode, GroupName, ServiceName, CreatedAtUtc)
+        OUTPUT INSERTED.GroupCode, INSERTED.GroupName, INSERTED.ServiceName
+        SELECT DISTINCT j.GroupCode, j.GroupCode, ?, GETUTCDATE()
+        FROM dbo.Jobs_information AS j
+        WHERE j.IsActive = 1
+          AND NOT EXISTS (
+              SELECT 1
+              FROM dbo.[Groups] AS g
+              WHERE g.GroupCode = j.GroupCode
+          )
+          AND (? IS NULL OR j.GroupCode IN (SELECT value FROM OPENJSON(?)));
+        """,
+        # Borra solo los que siguen sin ningún job (ni retirado) al momento del DELETE
+        "groups.delete_unused": """
+        DELETE g
+        OUTPUT DELETED.GroupCode, DELETED.GroupName, DELETED.ServiceName
+        FROM dbo.[Groups] AS g
+        WHERE g.GroupCode IN (SELECT value FROM OPENJSON(?))
+          AND NOT EXISTS (
+              SELECT 1
+              FROM dbo.Jobs_information AS j
+              WHERE j.GroupCode = g.GroupCode
+          );
+        """,
+        "groups.unused_by_codes": """
+        SELECT g.GroupCode, g.GroupName, g.ServiceName
+        FROM dbo.[Groups] AS g
+        WHERE g.GroupCode IN (SELECT value FROM OPENJSON(?))
+          AND NOT EXISTS (
+              SELECT 1
+              FROM dbo.Jobs_information AS j
+              WHERE j.GroupCode = g.GroupCode
+          );
+        """,
+        "groups.delete_sqlite": """
+        DELETE FROM dbo.[Groups]
+        WHERE GroupCode IN (SELECT value FROM OPENJSON(?));
+        """,
+
+        # ---------------- Búsqueda (tablas de tokens, ver job_search) ----------------
+        "search.job_tokens_delete": "DELETE FROM dbo.Jobs_search_tokens WHERE JobId = ?;",
+        "search.job_tokens_delete_many": """
+        DELETE FROM dbo.Jobs_search_tokens
+        WHERE JobId IN (SELECT CAST(value AS INT) FROM OPENJSON(?));
+        """,
+        "search.job_tokens_insert": "INSERT INTO dbo.Jobs_search_tokens (Token, JobId) VALUES (?, ?);",
+        "search.job_tokens_clear": "DELETE FROM dbo.Jobs_search_tokens;",
+        "search.group_tokens_delete": "DELETE FROM dbo.Groups_search_tokens WHERE GroupCode = ?;",
+        "search.group_tokens_insert": "INSERT INTO dbo.Groups_search_tokens (Token, GroupCode) VALUES (?, ?);",
+        "search.group_tokens_clear": "DELETE FROM dbo.Groups_search_tokens;",
+        "search.group_tokens_delete_many": """
+        DELETE FROM dbo.Groups_search_tokens
+        WHERE GroupCode IN (SELECT value FROM OPENJSON(?));
+        """,
+        # Modo fulltext: las dos tablas deben tener índice full-text (solo SQL Server)
+        "search.fulltext_indexes": """
+        SELECT COUNT(*)
+        FROM sys.fulltext_indexes
+        WHERE object_id IN (OBJECT_ID('dbo.Jobs_information'), OBJECT_ID('dbo.[Groups]'));
+        """,
+
+        # ---------------- Users (tabla/columnas desde env) ----------------
+        "users.list": f"""
+        SELECT TOP (?)
+            {u.col_user}, display_name, ISNULL(email,''), {u.col_role}, {u.col_active}, {u.col_must}
+        FROM {u.table}
+        ORDER BY {u.col_user} ASC;
+        """,
+        "users.get_by_username": f"""
+        SELECT
+            {u.col_user_id},
+            {u.col_user},
+            {u.col_pass},
+            {u.col_algo},
+            {u.col_role},
+            {u.col_must},
+            {u.col_active}
+        FROM {u.table}
+        WHERE {u.col_user} = ?;
+        """,
+        "users.update": f"""
+        UPDATE {u.table}
+        SET
+            display_name = ?,
+            email = ?,
+            {u.col_role} = ?,
+            {u.col_active} = ?
+        WHERE {u.col_user} = ?;
+        """,
+        "users.reset_password": f"""
+        UPDATE {u.table}
+        SET
+            {u.col_pass} = ?,
+            {u.col_algo} = ?,
+            {u.col_must} = 1
+        WHERE {u.col_user} = ?;
+        """,
+        "users.update_password": f"""
+        UPDATE {u.table}
+        SET
+            {u.col_pass} = ?,
+            {u.col_algo} = ?,
+            {u.col_must} = ?
+        WHERE {u.col_user} = ?;
+        """,
+        "users.update_password_legacy": f"""
+        UPDATE {u.table}
+        SET
+            {u.col_pass} = ?,
+            {u.col_algo} = ?,
+            {u.col_must} = 0
+        WHERE {u.col_user} = ?;
+        """,
+        "users.insert": f"""
+        INSERT INTO {u.table} (
+            {u.col_user},
+            display_name,
+            email,
+            {u.col_pass},
+            {u.col_algo},
+            {u.col_role},
+            {u.col_active},
+            {u.col_must}
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+
+        # ---------------- Change tracking ----------------
+        "delta.rowversion_now": "SELECT MIN_ACTIVE_ROWVERSION();",
+        "delta.rowversion_columns": """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = 'dbo'
+          AND TABLE_NAME IN ('Jobs_information', 'Groups')
+          AND COLUMN_NAME = 'RowVer'
+          AND DATA_TYPE = 'timestamp';
+        """,
+        "delta.audit_now": "SELECT ISNULL(MAX(audit_id), 0) FROM dbo.wt_audit_log;",
+        "delta.audit_rows": """
+        SELECT audit_id, entity_name, entity_id
+        FROM dbo.wt_audit_log
+        WHERE audit_id > ? AND audit_id <= ?;
+        """,
+
+        # ---------------- Import (ver import_repository) ----------------
+        # Staging por ImportKey: cada chunk se carga, se aplica con MERGE y se borra
+        # en una transacción corta
+        "import.stage_clear": "DELETE FROM dbo.Jobs_import_staging WHERE ImportKey = ?;",
+        "import.stage_insert": """
+        INSERT INTO dbo.Jobs_import_staging
+            (ImportKey, RowNum, Type, JobName, GroupCode, Severity, GroupName, ServiceName)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        "import.groups_merge": """
+        MERGE INTO dbo.[Groups] WITH (HOLDLOCK) AS t
+        USING (
+            SELECT GroupCode, MAX(GroupName) AS GroupName, MAX(ServiceName) AS ServiceName
+            FROM dbo.Jobs_import_staging
+            WHERE ImportKey = ? AND GroupName IS NOT NULL
+            GROUP BY GroupCode
+        ) AS s
+            ON t.GroupCode = s.GroupCode
+        WHEN MATCHED AND EXISTS (
+            SELECT t.GroupName, t.ServiceName
+            EXCEPT
+            SELECT s.GroupName, s.ServiceName
+        ) THEN
+            UPDATE SET GroupName = s.GroupName, ServiceName = s.ServiceName
+        WHEN NOT MATCHED THEN
+            INSERT (GroupCode, GroupName, ServiceName, CreatedAtUtc)
+            VALUES (s.GroupCode, s.GroupName, s.ServiceName, GETUTCDATE())
+        OUTPUT
+            $action,
+            INSERTED.GroupCode,
+            DELETED.GroupName,
+            DELETED.ServiceName,
+            INSERTED.GroupName,
+            INSERTED.ServiceName;
+        """,
+        # Clave de negocio (JobName, GroupCode): lo que existe se actualiza solo si cambia;
+        # un job retirado que vuelve a venir en el archivo se reactiva
+        "import.jobs_merge": """
+        MERGE INTO dbo.Jobs_information WITH (HOLDLOCK) AS t
+        USING (
+            SELECT Type, JobName, GroupCode, Severity
+            FROM dbo.Jobs_import_staging
+            WHERE ImportKey = ?
+        ) AS s
+            ON t.JobName = s.JobName AND t.GroupCode = s.GroupCode
+        WHEN MATCHED AND (
+            t.IsActive = 0
+            OR EXISTS (
+                SELECT t.Type, t.Severity
+                EXCEPT
+                SELECT s.Type, s.Severity
+            )
+        ) THEN
+            UPDATE SET Type = s.Type, Severity = s.Severity, IsActive = 1, RetiredAtUtc = NULL
+        WHEN NOT MATCHED THEN
+            INSERT (Type, JobName, GroupCode, Severity, CreatedAtUtc)
+            VALUES (s.Type, s.JobName, s.GroupCode, s.Severity, GETUTCDATE())
+        OUTPUT
+            $action,
+            INSERTED.Id,
+            DELETED.Type,
+            DELETED.Severity,
+            DELETED.IsActive;
+        """,
+        # SQLite no tiene MERGE: los mismos pasos con joins contra el staging
+        "import.groups_staged": """
+        SELECT s.GroupCode, MAX(s.GroupName), MAX(s.ServiceName), g.GroupCode, g.GroupName, g.ServiceName
+        FROM dbo.Jobs_import_staging AS s
+        LEFT JOIN dbo.[Groups] AS g
+            ON g.GroupCode = s.GroupCode
+        WHERE s.ImportKey = ? AND s.GroupName IS NOT NULL
+        GROUP BY s.GroupCode, g.GroupCode, g.GroupName, g.ServiceName;
+        """,
+        "import.jobs_matched": """
+        SELECT j.Id, j.Type, j.Severity, j.IsActive, s.Type, s.Severity
+        FROM dbo.Jobs_import_staging AS s
+        INNER JOIN dbo.Jobs_information AS j
+            ON j.JobName = s.JobName AND j.GroupCode = s.GroupCode
+        WHERE s.ImportKey = ?;
+        """,
+        "import.job_update_sqlite": """
+        UPDATE dbo.Jobs_information
+        SET Type = ?, Severity = ?, IsActive = 1, RetiredAtUtc = NULL
+        WHERE Id = ?;
+        """,
+        "import.jobs_insert_sqlite": """
+        INSERT INTO dbo.Jobs_information (Type, JobName, GroupCode, Severity, CreatedAtUtc)
+        SELECT s.Type, s.JobName, s.GroupCode, s.Severity, GETUTCDATE()
+        FROM dbo.Jobs_import_staging AS s
+        WHERE s.ImportKey = ?
+          AND NOT EXISTS (
+              SELECT 1
+              FROM dbo.Jobs_information AS j
+              WHERE j.JobName = s.JobName AND j.GroupCode = s.GroupCode
+          )
+        ORDER BY s.RowNum;
+        """,
+        "import.jobs_inserted_sqlite": """
+        SELECT j.Id
+        FROM dbo.Jobs_import_staging AS s
+        INNER JOIN dbo.Jobs_information AS j
+            ON j.JobName = s.JobName AND j.GroupCode = s.GroupCode
+        WHERE s.ImportKey = ? AND j.Id > ?;
+        """,
+        "import.max_job_id": "SELECT ISNULL(MAX(Id), 0) FROM dbo.Jobs_information;",
+        # Checkpoint de un import = su última fila de audit (se escribe en el commit de cada chunk)
+        "import.checkpoint": """
+        SELECT TOP (1) new_values_json
+        FROM dbo.wt_audit_log
+        WHERE entity_name = 'import' AND entity_id = ?
+        ORDER BY audit_id DESC;
+        """,
+
+        # ---------------- Calidad de datos (ver quality_repository) ----------------
+        # Todo por conjuntos (anti-joins / GROUP BY): el server cuenta, Python no recorre filas.
+        # Huérfano = job activo cuyo GroupCode no está en Groups; duplicado = mismo
+        # JobName + GroupCode entre activos (la clave del import); sin servicio =
+        # ServiceName vacío; sin uso = grupo sin ningún job (ni retirado).
+        "quality.summary": """
+        SELECT o.Jobs, o.Codes, d.DuplicateKeys, d.ExtraJobs, e.Groups, u.Groups
+        FROM (
+            SELECT COUNT(*) AS Jobs, COUNT(DISTINCT j.GroupCode) AS Codes
+            FROM dbo.Jobs_information AS j
+            WHERE j.IsActive = 1
+              AND NOT EXISTS (SELECT 1 FROM dbo.[Groups] AS g WHERE g.GroupCode = j.GroupCode)
+        ) AS o
+        CROSS JOIN (
+            SELECT COUNT(*) AS DuplicateKeys, ISNULL(SUM(k.n - 1), 0) AS ExtraJobs
+            FROM (
+                SELECT COUNT(*) AS n
+                FROM dbo.Jobs_information
+                WHERE IsActive = 1
+                GROUP BY JobName, GroupCode
+                HAVING COUNT(*) > 1
+            ) AS k
+        ) AS d
+        CROSS JOIN (
+            SELECT COUNT(*) AS Groups
+            FROM dbo.[Groups]
+            WHERE LTRIM(RTRIM(ISNULL(ServiceName, ''))) = ''
+        ) AS e
+        CROSS JOIN (
+            SELECT COUNT(*) AS Groups
+            FROM dbo.[Groups] AS g
+            WHERE NOT EXISTS (SELECT 1 FROM dbo.Jobs_information AS j WHERE j.GroupCode = g.GroupCode)
+        ) AS u;
+        """,
+        # Detalle de cada chequeo (columnas de quality_repository.COLUMNS)
+        "quality.orphan_jobs": """
+        SELECT TOP (?) j.GroupCode, COUNT(*) AS Jobs
+        FROM dbo.Jobs_information AS j
+        WHERE j.IsActive = 1
+          AND NOT EXISTS (SELECT 1 FROM dbo.[Groups] AS g WHERE g.GroupCode = j.GroupCode)
+        GROUP BY j.GroupCode
+        ORDER BY COUNT(*) DESC, j.GroupCode ASC;
+        """,
+        "quality.duplicate_jobs": """
+        SELECT TOP (?) MIN(Id) AS KeepId, JobName, GroupCode, COUNT(*) AS Jobs
+        FROM dbo.Jobs_information
+        WHERE IsActive = 1
+        GROUP BY JobName, GroupCode
+        HAVING COUNT(*) > 1
+        ORDER BY COUNT(*) DESC, JobName ASC, GroupCode ASC;
+        """,
+        "quality.empty_services": """
+        SELECT TOP (?)
+            g.GroupCode,
+            g.GroupName,
+            (SELECT COUNT(*) FROM dbo.Jobs_information AS j WHERE j.GroupCode = g.GroupCode AND j.IsActive = 1) AS Jobs
+        FROM dbo.[Groups] AS g
+        WHERE LTRIM(RTRIM(ISNULL(g.ServiceName, ''))) = ''
+        ORDER BY g.GroupCode ASC;
+        """,
+        "quality.unused_groups": """
+        SELECT TOP (?) g.GroupCode, g.GroupName, g.ServiceName
+        FROM dbo.[Groups] AS g
+        WHERE NOT EXISTS (SELECT 1 FROM dbo.Jobs_information AS j WHERE j.GroupCode = g.GroupCode)
+        ORDER BY g.GroupCode ASC;
+        """,
+        # Filas que toca cada arreglo. El filtro opcional (NULL = todas) es la
+        # selección del detalle: GroupCode, o KeepId para los duplicados.
+        "quality.orphan_job_ids": """
+        SELECT j.Id
+        FROM dbo.Jobs_information AS j
+        WHERE j.IsActive = 1
+          AND NOT EXISTS (SELECT 1 FROM dbo.[Groups] AS g WHERE g.GroupCode = j.GroupCode)
+          AND (? IS NULL OR j.GroupCode IN (SELECT value FROM OPENJSON(?)))
+        ORDER BY j.Id ASC;
+        """,
+        # Se conserva el más viejo (menor Id) de cada JobName + GroupCode
+        "quality.duplicate_job_ids": """
+        SELECT j.Id
+        FROM dbo.Jobs_information AS j
+        WHERE j.IsActive = 1
+          AND EXISTS (
+              SELECT 1
+              FROM dbo.Jobs_information AS k
+              WHERE k.IsActive = 1
+                AND k.JobName = j.JobName
+                AND k.GroupCode = j.GroupCode
+                AND k.Id < j.Id
+                AND (? IS NULL OR k.Id IN (SELECT CAST(value AS INT) FROM OPENJSON(?)))
+          )
+        ORDER BY j.Id ASC;
+        """,
+        "quality.empty_service_groups": """
+        SELECT GroupCode, GroupName
+        FROM dbo.[Groups]
+        WHERE LTRIM(RTRIM(ISNULL(ServiceName, ''))) = ''
+          AND (? IS NULL OR GroupCode IN (SELECT value FROM OPENJSON(?)))
+        ORDER BY GroupCode ASC;
+        """,
+        "quality.unused_group_codes": """
+        SELECT g.GroupCode
+        FROM dbo.[Groups] AS g
+        WHERE NOT EXISTS (SELECT 1 FROM dbo.Jobs_information AS j WHERE j.GroupCode = g.GroupCode)
+          AND (? IS NULL OR g.GroupCode IN (SELECT value FROM OPENJSON(?)))
+        ORDER BY g.GroupCode ASC;
+        """,
+
+        # ---------------- Audit ----------------
+        "audit.insert": """
+        INSERT INTO dbo.wt_audit_log
+        (
+          actor_user_id, action, entity_name, entity_id,
+          summary, old_values_json, new_values_json,
+          source_host, source_ip, correlation_id
+        )
+        VALUES
+        (
+          ?, ?, ?, ?,
+          ?, ?, ?,
+          ?, ?, ?
+        );
+        """,
+    }
+
+
+class StatementRegistry:
+    """
+    SQL de los repositorios generado una sola vez por proceso.
+    - Los límites van como TOP (?) para que el server reutilice el plan.
+    - La tabla/columnas de usuarios se leen del env al construir el registro
+      y se validan contra el esquema real la primera vez que se usa la DB.
+    """
+
+    def __init__(self, users: UsersMapping):
+        self.users = users
+        self._sql = _build(users)
+        self._lock = threading.Lock()
+        self._validated = False
+
+    def __getitem__(self, name: str) -> str:
+        return self._sql[name]
+
+    def jobs_where(self, where: str, seek: bool = False, status: str = "active") -> str:
+        """
+        SELECT TOP (?) de jobs con un WHERE armado en runtime (modos de búsqueda).
+        Se cachea por texto: el mismo número de palabras reutiliza el mismo SQL/plan.
+        seek=True agrega el predicado keyset de jobs.page_after.
+        status: active (default) | retired | all (ver JOB_STATUS_WHERE).
+        """
+        key = f"jobs.where:{int(seek)}:{status}:{where}"
+        sql = self._sql.get(key)
+        if sql is None:
+            where = f"{JOB_STATUS_WHERE[status]}\n            AND ({where})"
+            if seek:
+                where += "\n            AND (j.CreatedAtUtc < ? OR (j.CreatedAtUtc = ? AND j.Id < ?))"
+            sql = f"""
+        SELECT TOP (?)
+        {_JOB_SELECT}
+        WHERE
+            {where}
+        ORDER BY j.CreatedAtUtc DESC, j.Id DESC;
+        """
+            self._sql[key] = sql
+        return sql
+
+    def groups_where(self, where: str) -> str:
+        """SELECT de grupos (columnas de GroupInfo) con un WHERE armado en runtime."""
+        key = f"groups.where:{where}"
+        sql = self._sql.get(key)
+        if sql is None:
+            sql = f"""
+        SELECT GroupCode, GroupName, ServiceName
+        FROM dbo.[Groups]
+        WHERE {where};
+        """
+            self._sql[key] = sql
+        return sql
+
+    def export_page(self, kind: str, where: str) -> str:
+        """
+        SELECT TOP (?) de un export (ver export_repository) en orden de su clave:
+        WHERE clave > ? (la última exportada) AND where. Cacheado por texto como jobs_where.
+        """
+        key = f"export:{kind}:{where}"
+        sql = self._sql.get(key)
+        if sql is None:
+            select_from, key_column = _EXPORT_SOURCES[kind]
+            sql = f"""
+        SELECT TOP (?)
+        {select_from}
+        WHERE {key_column} > ?
+          AND ({where})
+        ORDER BY {key_column} ASC;
+        """
+            self._sql[key] = sql
+        return sql
+
+    def validate_users(self, db) -> None:
+        """
+        Valida USERS_TABLE / COL_* contra el esquema (una vez por proceso). Lo llama
+        main() al arrancar, antes del login: un mapeo mal configurado se ve ahí y
+        no como un error del primer login.
+        """
+        if self._validated:
+            return
+
+        with self._lock:
+            if self._validated:
+                return
+
+            schema, table = self.users.schema_and_table()
+            with db.get_connection() as conn:
+                cur = conn.cursor()
+                if db.dialect == "sqlite":
+                    rows = cur.execute(f"PRAGMA table_info([{table}]);").fetchall()
+                    existing = {str(r[1]).lower() for r in rows}
+                else:
+                    rows = cur.execute(
+                        """
+                        SELECT COLUMN_NAME
+                        FROM INFORMATION_SCHEMA.COLUMNS
+                        WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?;
+                        """,
+                        (schema, table),
+                    ).fetchall()
+                    existing = {str(r[0]).lower() for r in rows}
+
+            if not existing:
+                raise ValueError(f"USERS_TABLE no existe en la DB: {self.users.table}")
+
+            missing = [c for c in self.users.required_columns() if c.lower() not in existing]
+            if missing:
+                raise ValueError(
+                    f"Columnas de usuarios no encontradas en {self.users.table}: {', '.join(missing)}. "
+                    "Revisa USERS_TABLE / COL_* en el config."
+                )
+
+            self._validated = True
+
+
+_registry: Optional[StatementRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_statements() -> StatementRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = StatementRegistry(UsersMapping.from_env())
+    return _registry
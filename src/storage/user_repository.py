@@ -1,8 +1,9 @@
-﻿import os
-from dataclasses import dataclass
-from typing import Optional, List
+﻿from dataclasses import dataclass
+from typing import Iterator, Optional, List
 
-from src.storage.database import Database
+from src.storage.database import NO_LIMIT, Database, fetch_batches
+from src.storage.read_cache import TAG_USERS
+from src.storage.statements import get_statements
 
 
 @dataclass(frozen=True)
@@ -30,91 +31,76 @@ class UserRepository:
     def __init__(self, db: Database):
         self.db = db
 
-        self.table = os.getenv("USERS_TABLE", "dbo.wt_users").strip()
+        # Statements generados una vez por proceso (tabla/columnas desde env)
+        self.sql = get_statements()
+
+        m = self.sql.users
+        self.table = m.table
+        self.col_user_id = m.col_user_id
+        self.col_user = m.col_user
+        self.col_pass = m.col_pass
+        self.col_algo = m.col_algo
+        self.col_must = m.col_must
+        self.col_active = m.col_active
+        self.col_role = m.col_role
+
+    @staticmethod
+    def _row_to_user(r) -> UserRow:
+        return UserRow(
+            username="" if r[0] is None else str(r[0]),
+            display_name="" if r[1] is None else str(r[1]),
+            email="" if r[2] is None else str(r[2]),
+            role_code="" if r[3] is None else str(r[3]).lower(),
+            is_active=int(r[4]) if r[4] is not None else 1,
+            must_change_password=int(r[5]) if r[5] is not None else 0,
+        )
 
-        # ✅ NUEVO: columna user_id (default a tu tabla real)
-        self.col_user_id = os.getenv("COL_USER_ID", "user_id").strip()
+    def list_users(self, limit: int = 5000) -> List[UserRow]:
+        sql = self.sql["users.list"]
 
-        self.col_user = os.getenv("COL_USERNAME", "username").strip()
-        self.col_pass = os.getenv("COL_PASSWORD_HASH", "password_hash").strip()
-        self.col_algo = os.getenv("COL_PASSWORD_ALGO", "password_algo").strip()
-        self.col_must = os.getenv("COL_MUST_CHANGE", "must_change_password").strip()
-        self.col_active = os.getenv("COL_IS_ACTIVE", "is_active").strip()
-        self.col_role = os.getenv("COL_ROLE_CODE", "role_code").strip()
+        def load() -> List[UserRow]:
+            with self.db.get_connection(read_only=True) as conn:
+                cur = conn.cursor()
+                rows = cur.execute(sql, (int(limit),)).fetchall()
+            return [self._row_to_user(r) for r in rows]
 
-    def list_users(self, limit: int = 5000) -> List[UserRow]:
-        sql = f"""
-        SELECT TOP ({limit})
-            username, display_name, ISNULL(email,''), role_code, is_active, must_change_password
-        FROM {self.table}
-        ORDER BY username ASC;
-        """
-        with self.db.get_connection() as conn:
+        return self.db.cached(sql, (int(limit),), (TAG_USERS,), load)
+
+    def iter_users(self, limit: Optional[int] = None, batch_size: Optional[int] = None) -> Iterator[UserRow]:
+        """Como list_users, pero entrega filas a medida que llegan (fetchmany por lotes)."""
+        sql = self.sql["users.list"]
+        with self.db.get_connection(read_only=True) as conn:
             cur = conn.cursor()
-            rows = cur.execute(sql).fetchall()
-
-        out: List[UserRow] = []
-        for r in rows:
-            out.append(
-                UserRow(
-                    username="" if r[0] is None else str(r[0]),
-                    display_name="" if r[1] is None else str(r[1]),
-                    email="" if r[2] is None else str(r[2]),
-                    role_code="" if r[3] is None else str(r[3]).lower(),
-                    is_active=int(r[4]) if r[4] is not None else 1,
-                    must_change_password=int(r[5]) if r[5] is not None else 0,
-                )
-            )
-        return out
+            cur.execute(sql, (int(limit or NO_LIMIT),))
+            for rows in fetch_batches(cur, batch_size or self.db.fetch_batch):
+                for r in rows:
+                    yield self._row_to_user(r)
 
     def update_user(self, username: str, display_name: str, email: str | None, role_code: str, is_active: int) -> None:
-        sql = f"""
-        UPDATE {self.table}
-        SET
-            display_name = ?,
-            email = ?,
-            role_code = ?,
-            is_active = ?
-        WHERE username = ?;
-        """
-        with self.db.get_connection() as conn:
+        sql = self.sql["users.update"]
+        with self.db.get_connection("save") as conn:
             cur = conn.cursor()
             cur.execute(sql, (display_name, email, role_code, int(is_active), username))
             if cur.rowcount == 0:
                 raise ValueError("No se actualizó ningún usuario (username no encontrado).")
             conn.commit()
+        self.db.invalidate(TAG_USERS)
 
     def reset_password(self, username: str, password_hash: str, password_algo: str = "argon2id") -> None:
-        sql = f"""
-        UPDATE {self.table}
-        SET
-            password_hash = ?,
-            password_algo = ?,
-            must_change_password = 1
-        WHERE username = ?;
-        """
-        with self.db.get_connection() as conn:
+        sql = self.sql["users.reset_password"]
+        with self.db.get_connection("save") as conn:
             cur = conn.cursor()
             cur.execute(sql, (password_hash, password_algo, username))
             if cur.rowcount == 0:
                 raise ValueError("No se reseteó password (username no encontrado).")
             conn.commit()
+        self.db.invalidate(TAG_USERS)
 
     def get_by_username(self, username: str) -> Optional[UserRecord]:
-        sql = f"""
-        SELECT
-            {self.col_user_id},
-            {self.col_user},
-            {self.col_pass},
-            {self.col_algo},
-            {self.col_role},
-            {self.col_must},
-            {self.col_active}
-        FROM {self.table}
-        WHERE {self.col_user} = ?
-        """
+        sql = self.sql["users.get_by_username"]
 
-        with self.db.get_connection() as conn:
+        # Primario siempre: el login debe ver un cambio de password recién hecho
+        with self.db.get_connection("login") as conn:
             cur = conn.cursor()
             row = cur.execute(sql, (username,)).fetchone()
 
@@ -146,41 +132,29 @@ class UserRepository:
         - Para "change own password" normalmente must_change_password=0
         - Para "admin_change_password" puedes mandar 1 si quieres forzar cambio al login
         """
-        sql = f"""
-        UPDATE {self.table}
-        SET
-            {self.col_pass} = ?,
-            {self.col_algo} = ?,
-            {self.col_must} = ?
-        WHERE {self.col_user} = ?;
-        """
+        sql = self.sql["users.update_password"]
 
-        with self.db.get_connection() as conn:
+        with self.db.get_connection("save") as conn:
             cur = conn.cursor()
             cur.execute(sql, (password_hash, password_algo, int(must_change_password), username))
             if cur.rowcount == 0:
                 raise ValueError("No se actualizó password (username no encontrado).")
             conn.commit()
+        self.db.invalidate(TAG_USERS)
 
     # ==========================================================
     # (LEGACY) Tu método original preservado sin cambios de lógica
     # ==========================================================
     def _update_password_legacy(self, username: str, new_hash: str, algo: str = "argon2id") -> None:
-        sql = f"""
-        UPDATE {self.table}
-        SET
-            {self.col_pass} = ?,
-            {self.col_algo} = ?,
-            {self.col_must} = 0
-        WHERE {self.col_user} = ?
-        """
+        sql = self.sql["users.update_password_legacy"]
 
-        with self.db.get_connection() as conn:
+        with self.db.get_connection("save") as conn:
             cur = conn.cursor()
             cur.execute(sql, (new_hash, algo, username))
             if cur.rowcount == 0:
                 raise ValueError("No se actualizó ningún usuario (username no encontrado).")
             conn.commit()
+        self.db.invalidate(TAG_USERS)
 
     def add_user(
         self,
@@ -193,21 +167,9 @@ class UserRepository:
         is_active: int = 1,
         must_change_password: int = 1,
     ) -> None:
-        sql = f"""
-        INSERT INTO {self.table} (
-            username,
-            display_name,
-            email,
-            password_hash,
-            password_algo,
-            role_code,
-            is_active,
-            must_change_password
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-        """
+        sql = self.sql["users.insert"]
 
-        with self.db.get_connection() as conn:
+        with self.db.get_connection("save") as conn:
             cur = conn.cursor()
             cur.execute(
                 sql,
@@ -222,4 +184,5 @@ class UserRepository:
                     int(must_change_password),
                 ),
             )
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+        self.db.invalidate(TAG_USERS)
\ No newline at end of file
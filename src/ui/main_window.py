@@ -1,13 +1,19 @@
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from datetime import datetime, timedelta
+from tkinter import messagebox, simpledialog
 from tkinter import ttk
 
 from src.core.config import AppConfig
-from src.storage.database import Database
-from src.storage.jobs_repository import JobsRepository
+from src.storage.database import CancelToken, Database, QueryCancelledError
+from src.storage.job_index import JobSearchIndex
+from src.storage.job_query import parse_query
+from src.storage.job_search import SEARCH_FUZZY, SEARCH_LIKE
+from src.storage.jobs_repository import OUTCOME_UPDATED, STATUS_ACTIVE, STATUS_RETIRED, JobsRepository
 from src.storage.groups_repository import GroupsRepository
 from src.storage.user_repository import UserRepository
 from src.service.user_service import UserService
+from src.service.change_set import ChangeConflictError, ChangeSet
 
 from src.storage.audit_log_repository import AuditLogRepository
 
@@ -22,6 +28,8 @@ class MainWindow:
         5: "Priority 4",
     }
 
+    PENDING_BG = "#fff3bf"
+
     def __init__(self, config: AppConfig, user_id: int, username: str, role_code: str = ""):
         self.config = config
         self.user_id = int(user_id)
@@ -49,6 +57,7 @@ class MainWindow:
         self.input_text_color = self.config.input_text_color
 
         self.root.configure(bg=self.bg)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # --------------------------------------------------
         # DB + Repos
@@ -71,10 +80,42 @@ class MainWindow:
 
         self._search_after_id = None
 
+        # Carga de jobs en segundo plano: cada carga nueva cancela la anterior en el servidor
+        self._load_seq = 0
+        self._load_cancel = None
+
+        # Paginación keyset: siguiente página al acercarse al final del scroll
+        self._load_term = ""
+        self._load_status = STATUS_ACTIVE  # "Retirados" muestra solo los dados de baja
+        self._next_token = None
+        self._loading_more = False
+
+        # Índice en memoria (JOBS_LOCAL_INDEX=1): una carga por sesión y el grid
+        # se filtra localmente; mientras carga se sigue usando la DB.
+        self.job_index = (
+            JobSearchIndex(self.jobs_repo, self.groups_repo) if self.config.jobs_local_index else None
+        )
+        self._local_rows = None
+        self._local_pos = 0
+
+        # Sync incremental: solo filas nuevas/cambiadas desde el último watermark
+        self._jobs_watermark = None
+        self._syncing = False
+        self._sync_again = False
+
+        # Modo borrador: las ediciones se acumulan y se guardan juntas ("Guardar todo")
+        self.change_set = ChangeSet(self.db, self.jobs_repo, self.groups_repo)
+        self.staging_var = tk.BooleanVar(value=False)
+        self.retired_var = tk.BooleanVar(value=False)
+        self._purging = False
+
         self._setup_ttk_style()
         self._build_menu()
         self._build_ui()
         self._load_jobs()
+        self._start_index_load()
+        if self.config.jobs_sync_seconds:
+            self.root.after(self.config.jobs_sync_seconds * 1000, self._sync_tick)
 
     def _on_tree_double_click(self, _event=None):
         if not self.can_edit:
@@ -122,6 +163,16 @@ class MainWindow:
         if self.can_edit:
             jobs_menu.add_command(label="Agregar", command=self._jobs_add)
             jobs_menu.add_command(label="Editar", command=self._jobs_edit)
+            jobs_menu.add_command(label="Editar selección...", command=self._jobs_bulk_edit)
+            jobs_menu.add_command(label="Importar...", command=self._jobs_import)
+            jobs_menu.add_separator()
+            jobs_menu.add_command(label="Retirar selección", command=self._jobs_retire)
+            jobs_menu.add_command(label="Restaurar selección", command=self._jobs_restore)
+        if self.is_admin:
+            jobs_menu.add_command(label="Purgar retirados...", command=self._jobs_purge)
+        jobs_menu.add_separator()
+        jobs_menu.add_command(label="Exportar...", command=self._jobs_export)
+        jobs_menu.add_command(label="Calidad de datos...", command=self._data_quality)
         menubar.add_cascade(label="Jobs", menu=jobs_menu)
 
         groups_menu = tk.Menu(menubar, tearoff=0)
@@ -158,9 +209,70 @@ class MainWindow:
         )
         user_lbl.pack(side="left")
 
+        # Estado de la conexión (circuit breaker de Database)
+        self.db_status_lbl = tk.Label(
+            top,
+            text="",
+            bg=self.bg,
+            fg=self.button_bg,
+            font=("Segoe UI", 10, "bold"),
+        )
+        self.db_status_lbl.pack(side="left", padx=(16, 0))
+        self._refresh_db_status()
+
+        if self.can_edit:
+            staging_frame = tk.Frame(top, bg=self.bg)
+            staging_frame.pack(side="left", padx=(16, 0))
+
+            tk.Checkbutton(
+                staging_frame,
+                text="Borrador",
+                variable=self.staging_var,
+                command=self._on_staging_toggle,
+                bg=self.bg,
+                fg=self.text_color,
+                activebackground=self.bg,
+                selectcolor=self.input_bg,
+            ).pack(side="left")
+
+            self.save_all_btn = tk.Button(
+                staging_frame,
+                text="Guardar todo (0)",
+                command=self._save_all,
+                bg=self.button_bg,
+                fg=self.config.button_text_color,
+                relief="flat",
+                cursor="hand2",
+                state="disabled",
+            )
+            self.save_all_btn.pack(side="left", padx=(8, 0))
+
+            self.discard_btn = tk.Button(
+                staging_frame,
+                text="Descartar",
+                command=self._discard_all,
+                bg=self.box_bg,
+                fg=self.text_color,
+                relief="flat",
+                cursor="hand2",
+                state="disabled",
+            )
+            self.discard_btn.pack(side="left", padx=(6, 0))
+
         search_frame = tk.Frame(top, bg=self.bg)
         search_frame.pack(side="right")
 
+        tk.Checkbutton(
+            search_frame,
+            text="Retirados",
+            variable=self.retired_var,
+            command=self._on_retired_toggle,
+            bg=self.bg,
+            fg=self.text_color,
+            activebackground=self.bg,
+            selectcolor=self.input_bg,
+        ).pack(side="left", padx=(0, 12))
+
         tk.Label(
             search_frame,
             text="Search",
@@ -185,6 +297,22 @@ class MainWindow:
         self.search_entry.pack(side="left")
         self.search_entry.bind("<KeyRelease>", self._on_search_key)
 
+        # Motor de búsqueda: solo los modos configurados en esta base
+        # (like y fuzzy siempre; tokens / fulltext según available_search_modes)
+        modes = self.jobs_repo.available_search_modes()
+        if self.jobs_repo.search_mode not in modes:
+            self.jobs_repo.set_search_mode(SEARCH_LIKE)
+        self.search_mode_var = tk.StringVar(value=self.jobs_repo.search_mode)
+        search_mode_cb = ttk.Combobox(
+            search_frame,
+            textvariable=self.search_mode_var,
+            values=modes,
+            state="readonly",
+            width=9,
+        )
+        search_mode_cb.pack(side="left", padx=(8, 0))
+        search_mode_cb.bind("<<ComboboxSelected>>", self._on_search_mode)
+
         table_box = tk.Frame(self.root, bg=self.bg)
         table_box.pack(fill="both", expand=True, padx=16, pady=(6, 16))
 
@@ -205,14 +333,17 @@ class MainWindow:
             "CreatedAtUtc",
         )
 
-        self.tree = ttk.Treeview(inner, columns=cols, show="headings")
+        # extended: Ctrl/Shift + click para editar varios jobs a la vez
+        self.tree = ttk.Treeview(inner, columns=cols, show="headings", selectmode="extended")
         self.tree.pack(side="left", fill="both", expand=True)
 
-        vsb = ttk.Scrollbar(inner, orient="vertical", command=self.tree.yview)
-        vsb.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=vsb.set)
+        self.vsb = ttk.Scrollbar(inner, orient="vertical", command=self.tree.yview)
+        self.vsb.pack(side="right", fill="y")
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
 
         self.tree.bind("<Double-1>", self._on_tree_double_click)
+        # Filas con cambios sin guardar (modo borrador)
+        self.tree.tag_configure("pending", background=self.PENDING_BG)
 
         for c in cols:
             self.tree.heading(c, text=c)
@@ -226,6 +357,19 @@ class MainWindow:
         self.tree.column("IncidentPriority", width=130, anchor="w", stretch=False)
         self.tree.column("CreatedAtUtc", width=170, anchor="w", stretch=False)
 
+    def _refresh_db_status(self):
+        state = self.db.breaker.state
+        if state == self.db.breaker.OPEN:
+            text = "● DB no disponible"
+        elif state == self.db.breaker.HALF_OPEN:
+            text = "● DB reconectando..."
+        else:
+            text = ""
+
+        if self.db_status_lbl.cget("text") != text:
+            self.db_status_lbl.configure(text=text)
+        self.root.after(1000, self._refresh_db_status)
+
     # --------------------------------------------------
     # DATA
     # --------------------------------------------------
@@ -233,38 +377,278 @@ class MainWindow:
     def _on_search_key(self, _event=None):
         if self._search_after_id:
             self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
+
+        # Con el índice en memoria no hace falta debounce
+        if self._use_local_index():
+            self._load_jobs()
+            return
+
         self._search_after_id = self.root.after(250, self._load_jobs)
 
-    def _load_jobs(self):
+    def _start_index_load(self):
+        if self.job_index is None:
+            return
+
+        result = {}
+
+        def work():
+            try:
+                self.job_index.load()
+            except Exception as e:
+                result["error"] = e
+
+        t = threading.Thread(target=work, daemon=True)
+        t.start()
+        self._poll_index_load(t, result)
+
+    def _poll_index_load(self, t: threading.Thread, result: dict):
+        if t.is_alive():
+            self.root.after(100, lambda: self._poll_index_load(t, result))
+            return
+
+        # Si no se pudo cargar, se sigue buscando en la DB
+        if "error" in result:
+            self.job_index = None
+
+    def _use_local_index(self) -> bool:
+        # fuzzy tiene su propio índice en el repositorio (ordena por parecido);
+        # el índice local solo tiene jobs activos
+        return (
+            self.job_index is not None
+            and self.job_index.ready
+            and self.jobs_repo.search_mode != SEARCH_FUZZY
+            and self._load_status == STATUS_ACTIVE
+        )
+
+    def _on_tree_scroll(self, first, last):
+        self.vsb.set(first, last)
+        if float(last) >= 0.95:
+            self._load_more()
+
+    def _on_search_mode(self, _event=None):
         try:
-            term = (self.search_var.get() or "").strip()
-            jobs = self.jobs_repo.list_jobs(search=term if term else None, limit=2000)
-
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            for j in jobs:
-                severity_int = int(j.severity) if j.severity else None
-                incident_priority = self.SEVERITY_TO_PRIORITY.get(severity_int, "")
-
-                self.tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        j.id,
-                        j.type,
-                        j.job_name,
-                        j.group_code,
-                        j.group_name,
-                        j.service_name,
-                        incident_priority,
-                        j.created_at_utc,
-                    )
+            self.jobs_repo.set_search_mode(self.search_mode_var.get())
+        except ValueError as e:
+            self.search_mode_var.set(self.jobs_repo.search_mode)
+            messagebox.showerror("Búsqueda", str(e))
+            return
+        if (self.search_var.get() or "").strip():
+            self._load_jobs()
+
+    def _on_retired_toggle(self):
+        self._load_jobs()
+
+    def _load_jobs(self):
+        """Recarga el grid desde la primera página (nueva búsqueda o después de guardar)."""
+        self._load_term = (self.search_var.get() or "").strip()
+        self._load_status = STATUS_RETIRED if self.retired_var.get() else STATUS_ACTIVE
+        self._next_token = None
+        self._loading_more = False
+
+        if self._use_local_index():
+            self._filter_local()
+            return
+
+        self._local_rows = None
+        self._start_load(after=None, append=False)
+
+    def _filter_local(self):
+        # Lo que estuviera cargando desde la DB ya no sirve
+        if self._load_cancel is not None:
+            self._load_cancel.cancel()
+            self._load_cancel = None
+        self._load_seq += 1
+
+        self._local_rows = self.job_index.search(self._load_term)
+        self._local_pos = 0
+        self._fill_local(append=False)
+
+    def _fill_local(self, append: bool):
+        end = self._local_pos + self.config.jobs_page_size
+        self._fill_jobs(self._local_rows[self._local_pos:end], append=append)
+        self._local_pos = end
+
+    def _load_more(self):
+        if self._local_rows is not None:
+            if self._local_pos < len(self._local_rows):
+                self._fill_local(append=True)
+            return
+
+        # Ya hay una carga en curso o no quedan páginas
+        if self._next_token is None or self._loading_more or self._load_cancel is not None:
+            return
+        self._loading_more = True
+        self._start_load(after=self._next_token, append=True)
+
+    def _start_load(self, after, append: bool):
+        term = self._load_term
+        status = self._load_status
+
+        # La búsqueda anterior ya no sirve: se cancela en el servidor
+        if self._load_cancel is not None:
+            self._load_cancel.cancel()
+
+        cancel = CancelToken()
+        self._load_cancel = cancel
+        self._load_seq += 1
+        seq = self._load_seq
+        result = {}
+        need_watermark = self._jobs_watermark is None
+
+        def work():
+            try:
+                # El watermark se toma antes de leer: lo que cambie después llega por sync
+                if need_watermark:
+                    result["watermark"] = self.jobs_repo.current_watermark()
+                result["page"] = self.jobs_repo.page_jobs(
+                    search=term if term else None,
+                    after=after,
+                    page_size=self.config.jobs_page_size,
+                    cancel=cancel,
+                    status=status,
                 )
+            except Exception as e:
+                result["error"] = e
 
+        t = threading.Thread(target=work, daemon=True)
+        t.start()
+        self._poll_load(t, seq, result, append)
+
+    def _poll_load(self, t: threading.Thread, seq: int, result: dict, append: bool = False):
+        # Tk no es thread-safe: el hilo solo consulta, el grid se llena aquí
+        if t.is_alive():
+            self.root.after(30, lambda: self._poll_load(t, seq, result, append))
+            return
+
+        if self._jobs_watermark is None and "watermark" in result:
+            self._jobs_watermark = result["watermark"]
+
+        # Llegó una búsqueda más nueva: este resultado se descarta
+        if seq != self._load_seq:
+            return
+
+        self._load_cancel = None
+        self._loading_more = False
+        err = result.get("error")
+        if isinstance(err, QueryCancelledError):
+            return
+        if err is not None:
+            messagebox.showerror("Error", f"No se pudieron cargar los jobs:\n{err}")
+            return
+
+        page = result["page"]
+        self._next_token = page.next_token
+        try:
+            self._fill_jobs(page.items, append=append)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudieron cargar los jobs:\n{e}")
 
+    def _row_tags(self, j) -> tuple:
+        return ("pending",) if self.change_set.is_pending(j) else ()
+
+    def _job_values(self, j) -> tuple:
+        j = self.change_set.overlay_job(j)
+        severity_int = int(j.severity) if j.severity else None
+        incident_priority = self.SEVERITY_TO_PRIORITY.get(severity_int, "")
+
+        return (
+            j.id,
+            j.type,
+            j.job_name,
+            j.group_code,
+            j.group_name,
+            j.service_name,
+            incident_priority,
+            j.created_at_utc,
+        )
+
+    def _fill_jobs(self, jobs, append: bool = False):
+        if not append:
+            children = self.tree.get_children()
+            if children:
+                self.tree.delete(*children)
+
+        # iid = Id del job, para poder actualizar la fila en el sync incremental
+        for j in jobs:
+            iid = str(j.id)
+            if append and self.tree.exists(iid):
+                continue
+            self.tree.insert("", "end", iid=iid, values=self._job_values(j), tags=self._row_tags(j))
+
+    # --------------------------------------------------
+    # SYNC INCREMENTAL
+    # --------------------------------------------------
+
+    def _sync_tick(self):
+        self._sync_jobs()
+        self.root.after(self.config.jobs_sync_seconds * 1000, self._sync_tick)
+
+    def _refresh_after_save(self):
+        # Sin watermark (la carga inicial falló) no hay delta posible: recarga completa
+        if self._jobs_watermark is None:
+            self._load_jobs()
+        else:
+            self._sync_jobs()
+
+    def _sync_jobs(self):
+        """Trae solo los jobs nuevos/cambiados (periódico y después de guardar)."""
+        if self._jobs_watermark is None:
+            return
+        if self._syncing:
+            # Lo pedido después de un guardado no puede esperar al próximo tick
+            self._sync_again = True
+            return
+
+        self._syncing = True
+        since = self._jobs_watermark
+        result = {}
+
+        def work():
+            try:
+                result["delta"] = self.jobs_repo.changes_since(since)
+            except Exception as e:
+                result["error"] = e
+
+        t = threading.Thread(target=work, daemon=True)
+        t.start()
+        self._poll_sync(t, result)
+
+    def _poll_sync(self, t: threading.Thread, result: dict):
+        if t.is_alive():
+            self.root.after(50, lambda: self._poll_sync(t, result))
+            return
+
+        self._syncing = False
+        # Un sync fallido no molesta: el próximo reintenta desde el mismo watermark
+        if "error" not in result:
+            delta = result["delta"]
+            self._jobs_watermark = delta.watermark
+            if delta.items or delta.removed:
+                if self.job_index is not None:
+                    self.job_index.apply(delta.items, delta.removed)
+                self._merge_jobs(delta.items, delta.removed)
+
+        if self._sync_again:
+            self._sync_again = False
+            self._sync_jobs()
+
+    def _merge_jobs(self, jobs, removed=()):
+        # El delta es de jobs activos: con "Retirados" el grid se recarga a mano
+        if self._load_status != STATUS_ACTIVE:
+            return
+        self._remove_rows(removed)
+
+        # Las filas que ya están se actualizan en su lugar; las nuevas van arriba
+        # (son las más recientes) si coinciden con la búsqueda actual
+        query = parse_query(self._load_term)
+        for j in sorted(jobs, key=lambda x: (x.created_at_utc, x.id)):
+            iid = str(j.id)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self._job_values(j), tags=self._row_tags(j))
+            elif query.matches(j):
+                self.tree.insert("", 0, iid=iid, values=self._job_values(j), tags=self._row_tags(j))
+
     # --------------------------------------------------
     # MENU ACTIONS
     # --------------------------------------------------
@@ -282,11 +666,61 @@ class MainWindow:
             self.root.wait_window(w.win)
 
             if w.created:
-                self._load_jobs()
+                self._refresh_after_save()
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir Agregar Job:\n{e}")
 
+    def _jobs_import(self):
+        if not self.can_edit:
+            messagebox.showwarning("Permisos", "No tienes permisos para importar Jobs.")
+            return
+
+        try:
+            from src.service.import_service import ImportService
+            from src.storage.import_repository import ImportRepository
+            from src.ui.views.import_jobs_view import ImportJobsWindow
+
+            import_repo = ImportRepository(self.db, self.jobs_repo, self.groups_repo, self.audit_repo)
+            import_repo.set_actor(self.user_id)
+            w = ImportJobsWindow(self.root, self.config, ImportService(import_repo, self.groups_repo))
+            self.root.wait_window(w.win)
+
+            if w.imported:
+                self._refresh_after_save()
+
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir Importar Jobs:\n{e}")
+
+    def _jobs_export(self):
+        try:
+            from src.service.export_service import ExportService
+            from src.storage.export_repository import ExportRepository
+            from src.ui.views.export_view import ExportWindow
+
+            export_service = ExportService(ExportRepository(self.db, self.jobs_repo))
+            w = ExportWindow(
+                self.root, self.config, export_service, search=self._load_term, can_audit=self.is_admin
+            )
+            self.root.wait_window(w.win)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir Exportar:\n{e}")
+
+    def _data_quality(self):
+        try:
+            from src.storage.quality_repository import QualityRepository
+            from src.ui.views.data_quality_view import DataQualityWindow
+
+            quality_repo = QualityRepository(self.db, self.jobs_repo, self.groups_repo)
+            w = DataQualityWindow(self.root, self.config, quality_repo, can_fix=self.can_edit)
+            self.root.wait_window(w.win)
+            if w.changed:
+                self._load_jobs()
+
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir Calidad de datos:\n{e}")
+
     def _jobs_edit(self):
         if not self.can_edit:
             messagebox.showwarning("Permisos", "No tienes permisos para editar Jobs.")
@@ -297,6 +731,10 @@ class MainWindow:
             messagebox.showwarning("Jobs", "Selecciona un Job para editar.")
             return
 
+        if len(selected) > 1:
+            self._jobs_bulk_edit()
+            return
+
         item_id = selected[0]
         values = self.tree.item(item_id, "values")
 
@@ -327,15 +765,168 @@ class MainWindow:
             groups = self.groups_repo.list_groups(limit=2000)
 
             from src.ui.views.edit_job_view import EditJobWindow
-            w = EditJobWindow(self.root, self.config, self.jobs_repo, groups, job)
+            change_set = self.change_set if self.staging_var.get() else None
+            w = EditJobWindow(self.root, self.config, self.jobs_repo, groups, job, change_set=change_set)
             self.root.wait_window(w.win)
 
-            if w.updated:
-                self._load_jobs()
+            if w.updated and change_set is not None:
+                self._refresh_rows([job_id])
+                self._update_staging_buttons()
+            elif w.updated:
+                self._refresh_after_save()
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir Editar Job:\n{e}")
 
+    def _jobs_bulk_edit(self):
+        if not self.can_edit:
+            messagebox.showwarning("Permisos", "No tienes permisos para editar Jobs.")
+            return
+
+        job_ids = self._selected_job_ids()
+        if not job_ids:
+            messagebox.showwarning("Jobs", "Selecciona uno o más Jobs para editar.")
+            return
+
+        try:
+            groups = self.groups_repo.list_groups(limit=2000)
+
+            from src.ui.views.bulk_edit_jobs_view import BulkEditJobsWindow
+            w = BulkEditJobsWindow(self.root, self.config, self.jobs_repo, groups, job_ids)
+            self.root.wait_window(w.win)
+
+            if w.updated_ids:
+                self._refresh_rows(w.updated_ids)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir Editar selección:\n{e}")
+
+    def _selected_job_ids(self) -> list:
+        job_ids = []
+        for item_id in self.tree.selection():
+            try:
+                job_ids.append(int(self.tree.item(item_id, "values")[0]))
+            except Exception:
+                continue
+        return job_ids
+
+    def _remove_rows(self, job_ids):
+        for job_id in job_ids:
+            iid = str(job_id)
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+
+    def _jobs_retire(self):
+        self._set_selection_active(active=False)
+
+    def _jobs_restore(self):
+        self._set_selection_active(active=True)
+
+    def _set_selection_active(self, active: bool):
+        if not self.can_edit:
+            messagebox.showwarning("Permisos", "No tienes permisos para retirar o restaurar Jobs.")
+            return
+
+        job_ids = self._selected_job_ids()
+        if not job_ids:
+            messagebox.showwarning("Jobs", "Selecciona uno o más Jobs.")
+            return
+
+        if active:
+            question = f"¿Restaurar {len(job_ids)} jobs? Vuelven a aparecer en el grid y las búsquedas."
+        else:
+            question = (
+                f"¿Retirar {len(job_ids)} jobs? Dejan de aparecer en el grid y las búsquedas "
+                "(se pueden restaurar desde \"Retirados\")."
+            )
+        if not messagebox.askyesno("Jobs", question):
+            return
+
+        # Un cambio pendiente de un job retirado ya no tiene dónde verse
+        if not active:
+            self.change_set.discard(job_ids=job_ids)
+            self._update_staging_buttons()
+
+        self.root.configure(cursor="watch")
+        self.root.update_idletasks()
+        try:
+            if active:
+                outcomes = self.jobs_repo.restore_jobs(job_ids)
+            else:
+                outcomes = self.jobs_repo.retire_jobs(job_ids)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron actualizar los jobs:\n{e}")
+            return
+        finally:
+            self.root.configure(cursor="")
+
+        # En cualquiera de las dos vistas, lo que cambió de estado ya no corresponde
+        changed = [o.id for o in outcomes if o.status == OUTCOME_UPDATED]
+        self._remove_rows(changed)
+        msg = f"{len(changed)} jobs {'restaurados' if active else 'retirados'}."
+        if len(changed) < len(outcomes):
+            msg += f"\n{len(outcomes) - len(changed)} sin cambios o ya no existen."
+        messagebox.showinfo("Jobs", msg)
+
+    def _jobs_purge(self):
+        if not self.is_admin:
+            messagebox.showwarning("Permisos", "Solo admin puede purgar jobs.")
+            return
+        if self._purging:
+            messagebox.showinfo("Purgar", "Ya hay una purga en curso.")
+            return
+
+        days = simpledialog.askinteger(
+            "Purgar retirados",
+            "Borrar definitivamente los jobs retirados hace más de N días (0 = todos):",
+            initialvalue=30,
+            minvalue=0,
+            parent=self.root,
+        )
+        if days is None:
+            return
+        if not messagebox.askyesno(
+            "Purgar retirados",
+            "Los jobs purgados se borran de la tabla (queda su fila en el audit log). ¿Continuar?",
+        ):
+            return
+
+        retired_before = datetime.utcnow() - timedelta(days=days) if days else None
+        self._purging = True
+        result = {}
+
+        def work():
+            try:
+                result["count"] = self.jobs_repo.purge_retired_jobs(retired_before=retired_before)
+            except Exception as e:
+                result["error"] = e
+
+        # En lotes cortos en segundo plano: el grid se sigue usando mientras tanto
+        t = threading.Thread(target=work, daemon=True)
+        t.start()
+        self._poll_purge(t, result)
+
+    def _poll_purge(self, t: threading.Thread, result: dict):
+        if t.is_alive():
+            self.root.after(200, lambda: self._poll_purge(t, result))
+            return
+
+        self._purging = False
+        if "error" in result:
+            messagebox.showerror("Error", f"La purga se cortó (lo ya borrado queda borrado):\n{result['error']}")
+        else:
+            messagebox.showinfo("Purgar retirados", f"{result['count']} jobs purgados.")
+        if self._load_status == STATUS_RETIRED:
+            self._load_jobs()
+
+    def _refresh_rows(self, job_ids):
+        """Relee solo esas filas (una consulta) y las reemplaza en el grid."""
+        jobs = self.jobs_repo.get_jobs_by_ids(job_ids)
+        for j in jobs.values():
+            iid = str(j.id)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self._job_values(j), tags=self._row_tags(j))
+
     def _groups_add(self):
         if not self.can_edit:
             messagebox.showwarning("Permisos", "No tienes permisos para agregar Groups.")
@@ -347,7 +938,7 @@ class MainWindow:
             self.root.wait_window(w.win)
 
             if w.created:
-                self._load_jobs()
+                self._refresh_after_save()
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir Agregar Group:\n{e}")
@@ -359,15 +950,105 @@ class MainWindow:
 
         try:
             from src.ui.views.groups_manager_view import GroupsManagerWindow
-            w = GroupsManagerWindow(self.root, self.config, self.groups_repo)
+            change_set = self.change_set if self.staging_var.get() else None
+            w = GroupsManagerWindow(self.root, self.config, self.groups_repo, change_set=change_set)
             self.root.wait_window(w.win)
 
+            if w.staged_codes:
+                self._refresh_rows(self._grid_ids(group_codes=w.staged_codes))
+                self._update_staging_buttons()
             if w.changed:
-                self._load_jobs()
+                self._refresh_after_save()
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir Groups Manager:\n{e}")
 
+    # --------------------------------------------------
+    # MODO BORRADOR
+    # --------------------------------------------------
+
+    def _grid_ids(self, job_ids=(), group_codes=()) -> list:
+        """Ids del grid afectados por esos jobs/grupos."""
+        wanted = {str(x) for x in job_ids}
+        codes = set(group_codes)
+        out = []
+        for iid in self.tree.get_children():
+            if iid in wanted or (codes and self.tree.set(iid, "GroupCode") in codes):
+                out.append(int(iid))
+        return out
+
+    def _update_staging_buttons(self):
+        n = len(self.change_set)
+        state = "normal" if n else "disabled"
+        self.save_all_btn.configure(text=f"Guardar todo ({n})", state=state)
+        self.discard_btn.configure(state=state)
+
+    def _on_staging_toggle(self):
+        if self.staging_var.get() or not self.change_set:
+            return
+
+        # Se apaga con cambios pendientes: guardar, descartar o seguir en borrador
+        answer = messagebox.askyesnocancel(
+            "Borrador",
+            f"Hay {len(self.change_set)} cambios sin guardar.\n¿Guardarlos ahora? (No = descartarlos)",
+        )
+        if answer is None:
+            self.staging_var.set(True)
+        elif answer:
+            if not self._save_all():
+                self.staging_var.set(True)
+        else:
+            self._discard_all(confirm=False)
+
+    def _save_all(self) -> bool:
+        """Guarda todo el borrador en una transacción. Retorna True si quedó vacío."""
+        job_ids, group_codes = self.change_set.job_ids, self.change_set.group_codes
+        while self.change_set:
+            try:
+                result = self.change_set.save()
+            except ChangeConflictError as e:
+                discard = messagebox.askyesno(
+                    "Conflictos",
+                    f"{e}\n\nNo se guardó nada. ¿Descartar esos cambios y guardar el resto?",
+                )
+                if not discard:
+                    break
+                self.change_set.discard_conflicts(e.conflicts)
+                continue
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudieron guardar los cambios:\n{e}")
+                break
+            messagebox.showinfo(
+                "Guardar todo",
+                f"{len(result.jobs)} jobs y {len(result.groups)} grupos actualizados.",
+            )
+
+        self._refresh_rows(self._grid_ids(job_ids, group_codes))
+        self._update_staging_buttons()
+        return not self.change_set
+
+    def _discard_all(self, confirm: bool = True):
+        if not self.change_set:
+            return
+        if confirm and not messagebox.askyesno("Descartar", f"¿Descartar {len(self.change_set)} cambios sin guardar?"):
+            return
+        job_ids, group_codes = self.change_set.job_ids, self.change_set.group_codes
+        self.change_set.clear()
+        self._refresh_rows(self._grid_ids(job_ids, group_codes))
+        self._update_staging_buttons()
+
+    def _on_close(self):
+        if self.change_set:
+            answer = messagebox.askyesnocancel(
+                "Salir",
+                f"Hay {len(self.change_set)} cambios sin guardar.\n¿Guardarlos antes de salir? (No = descartarlos)",
+            )
+            if answer is None:
+                return
+            if answer and not self._save_all():
+                return
+        self.root.destroy()
+
     def _user_change_password(self):
         try:
             mode = "admin" if self.is_admin else "self"
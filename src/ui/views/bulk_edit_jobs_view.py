@@ -0,0 +1,210 @@
+# src/ui/views/bulk_edit_jobs_view.py
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import ttk
+
+from src.core.config import AppConfig
+from src.storage.jobs_repository import OUTCOME_UPDATED
+
+
+class BulkEditJobsWindow:
+    """
+    Modal para editar varios Jobs a la vez (selección múltiple del grid).
+    - job_ids: Ids seleccionados
+    - groups: lista GroupInfo (group_code, group_name, service_name)
+    - jobs_repo: bulk_update_jobs()
+    Solo se cambian los campos que no quedan en "(sin cambios)".
+    """
+
+    PRIORITY_TO_SEVERITY = {
+        "Priority 2": 3,
+        "Priority 3": 4,
+        "Priority 4": 5,
+    }
+    NO_CHANGE = "(sin cambios)"
+
+    def __init__(self, parent: tk.Tk, config: AppConfig, jobs_repo, groups, job_ids):
+        self.parent = parent
+        self.config = config
+        self.jobs_repo = jobs_repo
+        self.groups = groups or []
+        self.job_ids = list(job_ids)
+
+        self.updated_ids = []  # Ids que cambiaron (para refrescar solo esas filas)
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Editar Jobs seleccionados")
+        self.win.geometry("560x320")
+        self.win.resizable(False, False)
+
+        # Theme
+        self.bg = self.config.back_color
+        self.box_bg = self.config.box_color
+        self.label_bg = self.config.label_color
+        self.button_bg = self.config.button_color
+        self.accent = self.config.accent_color
+        self.text_color = self.config.text_color
+        self.button_text_color = self.config.button_text_color
+        self.input_bg = self.config.input_bg
+        self.input_text_color = self.config.input_text_color
+
+        self.win.configure(bg=self.bg)
+
+        # Modal
+        self.win.transient(parent)
+        self.win.grab_set()
+        self.win.protocol("WM_DELETE_WINDOW", self._on_cancel)
+
+        self._build_ui()
+        self.win.bind("<Return>", lambda e: self._on_save())
+
+    def _build_ui(self):
+        root = tk.Frame(self.win, bg=self.bg)
+        root.pack(fill="both", expand=True, padx=18, pady=18)
+
+        tk.Label(
+            root,
+            text=f"Editar {len(self.job_ids)} Jobs",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 12, "bold"),
+        ).pack(anchor="w", pady=(0, 4))
+
+        tk.Label(
+            root,
+            text="Type vacío y \"(sin cambios)\" dejan el valor actual de cada job.",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 9),
+        ).pack(anchor="w", pady=(0, 8))
+
+        form = tk.Frame(root, bg=self.bg)
+        form.pack(fill="x")
+
+        self.type_var = tk.StringVar()
+
+        self.group_map = {}  # display -> group_code
+        group_display_list = [self.NO_CHANGE]
+        for g in self.groups:
+            display = f"{g.group_code} - {g.group_name}".strip()
+            if getattr(g, "service_name", ""):
+                display = f"{display} ({g.service_name})"
+            self.group_map[display] = g.group_code
+            group_display_list.append(display)
+        self.group_var = tk.StringVar(value=self.NO_CHANGE)
+
+        pri_values = [self.NO_CHANGE] + list(self.PRIORITY_TO_SEVERITY.keys())
+        self.priority_var = tk.StringVar(value=self.NO_CHANGE)
+
+        tk.Label(form, text="Type", bg=self.label_bg, fg="#111111", padx=10, pady=6).grid(
+            row=0, column=0, sticky="e", padx=(0, 12), pady=8
+        )
+        self._type_entry = tk.Entry(
+            form,
+            textvariable=self.type_var,
+            bg=self.input_bg,
+            fg=self.input_text_color,
+            relief="flat",
+            highlightthickness=2,
+            highlightbackground=self.box_bg,
+            highlightcolor=self.button_bg,
+            insertbackground=self.input_text_color,
+            width=32
+        )
+        self._type_entry.grid(row=0, column=1, sticky="w", pady=8)
+
+        self._row_combo(form, 1, "Group", self.group_var, values=group_display_list)
+        self._row_combo(form, 2, "Incident Priority", self.priority_var, values=pri_values)
+
+        buttons = tk.Frame(root, bg=self.bg)
+        buttons.pack(fill="x", pady=(18, 0))
+
+        tk.Button(
+            buttons,
+            text="Cancelar",
+            command=self._on_cancel,
+            bg=self.box_bg,
+            fg=self.text_color,
+            relief="flat",
+            cursor="hand2",
+            width=14
+        ).pack(side="left")
+
+        save_btn = tk.Button(
+            buttons,
+            text="Aplicar",
+            command=self._on_save,
+            bg=self.button_bg,
+            fg=self.button_text_color,
+            relief="flat",
+            cursor="hand2",
+            activebackground=self.accent,
+            activeforeground=self.button_text_color,
+            width=14
+        )
+        save_btn.pack(side="right")
+
+        save_btn.bind("<Enter>", lambda e: save_btn.configure(bg=self.accent))
+        save_btn.bind("<Leave>", lambda e: save_btn.configure(bg=self.button_bg))
+
+        self._type_entry.focus_set()
+
+    def _row_combo(self, parent: tk.Frame, row: int, label: str, var: tk.StringVar, values):
+        tk.Label(parent, text=label, bg=self.label_bg, fg="#111111", padx=10, pady=6).grid(
+            row=row, column=0, sticky="e", padx=(0, 12), pady=8
+        )
+        combo = ttk.Combobox(
+            parent,
+            textvariable=var,
+            values=values,
+            state="readonly",
+            width=31
+        )
+        combo.grid(row=row, column=1, sticky="w", pady=8)
+
+    def _on_cancel(self):
+        self.updated_ids = []
+        self.win.destroy()
+
+    def _on_save(self):
+        type_ = (self.type_var.get() or "").strip() or None
+        group_display = (self.group_var.get() or "").strip()
+        priority_display = (self.priority_var.get() or "").strip()
+
+        group_code = None
+        if group_display and group_display != self.NO_CHANGE:
+            group_code = self.group_map.get(group_display)
+            if not group_code:
+                messagebox.showerror("Validación", "Group seleccionado inválido.", parent=self.win)
+                return
+
+        severity = None
+        if priority_display and priority_display != self.NO_CHANGE:
+            severity = self.PRIORITY_TO_SEVERITY.get(priority_display)
+            if severity is None:
+                messagebox.showerror("Validación", "Incident Priority inválida.", parent=self.win)
+                return
+
+        if type_ is None and group_code is None and severity is None:
+            messagebox.showwarning("Validación", "No hay cambios para aplicar.", parent=self.win)
+            return
+
+        self.win.configure(cursor="watch")
+        self.win.update_idletasks()
+        try:
+            outcomes = self.jobs_repo.bulk_update_jobs(
+                self.job_ids, type_=type_, group_code=group_code, severity=severity
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron actualizar los jobs:\n{e}", parent=self.win)
+            return
+        finally:
+            self.win.configure(cursor="")
+
+        self.updated_ids = [o.id for o in outcomes if o.status == OUTCOME_UPDATED]
+        skipped = len(outcomes) - len(self.updated_ids)
+        msg = f"{len(self.updated_ids)} jobs actualizados."
+        if skipped:
+            msg += f"\n{skipped} sin cambios o ya no existen."
+        messagebox.showinfo("Jobs", msg, parent=self.win)
+        self.win.destroy()
@@ -0,0 +1,307 @@
+# src/ui/views/data_quality_view.py
+import threading
+import tkinter as tk
+from tkinter import messagebox, simpledialog
+from tkinter import ttk
+
+from src.core.config import AppConfig
+from src.storage.jobs_repository import OUTCOME_UPDATED
+from src.storage.quality_repository import (
+    CHECK_DUPLICATE_JOBS, CHECK_EMPTY_SERVICES, CHECK_ORPHAN_JOBS, CHECK_UNUSED_GROUPS, COLUMNS, QUALITY_CHECKS,
+)
+
+
+class DataQualityWindow:
+    """
+    Reporte de calidad de datos (jobs huérfanos, duplicados, grupos sin servicio o sin uso).
+    - quality_repo: QualityRepository (scan / details / arreglos; corren en un hilo)
+    - can_fix: muestra los botones de arreglo (operator/admin)
+    Los arreglos se aplican a las filas seleccionadas del detalle, o a todas si no hay selección.
+    """
+
+    CHECK_LABELS = {
+        CHECK_ORPHAN_JOBS: "Jobs con grupo inexistente",
+        CHECK_DUPLICATE_JOBS: "JobName repetido en el grupo",
+        CHECK_EMPTY_SERVICES: "Grupos sin ServiceName",
+        CHECK_UNUSED_GROUPS: "Grupos sin jobs",
+    }
+
+    def __init__(self, parent: tk.Tk, config: AppConfig, quality_repo, can_fix: bool = False):
+        self.parent = parent
+        self.config = config
+        self.quality_repo = quality_repo
+        self.can_fix = can_fix
+
+        self.changed = False  # algún arreglo tocó jobs o grupos (el grid se recarga)
+        self._report = None
+        self._check = CHECK_ORPHAN_JOBS
+        self._busy = False
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Calidad de datos")
+        self.win.geometry("900x560")
+        self.win.minsize(760, 420)
+
+        # Theme
+        self.bg = self.config.back_color
+        self.box_bg = self.config.box_color
+        self.label_bg = self.config.label_color
+        self.button_bg = self.config.button_color
+        self.accent = self.config.accent_color
+        self.text_color = self.config.text_color
+        self.button_text_color = self.config.button_text_color
+        self.input_bg = self.config.input_bg
+        self.input_text_color = self.config.input_text_color
+
+        self.win.configure(bg=self.bg)
+
+        # Modal
+        self.win.transient(parent)
+        self.win.grab_set()
+        self.win.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self._build_ui()
+        self._scan()
+
+    def _button(self, parent: tk.Frame, text: str, command) -> tk.Button:
+        btn = tk.Button(
+            parent, text=text, command=command,
+            bg=self.button_bg, fg=self.button_text_color, relief="flat",
+            cursor="hand2", activebackground=self.accent, activeforeground=self.button_text_color,
+        )
+        btn.bind("<Enter>", lambda e: btn.configure(bg=self.accent))
+        btn.bind("<Leave>", lambda e: btn.configure(bg=self.button_bg))
+        return btn
+
+    def _build_ui(self):
+        top = tk.Frame(self.win, bg=self.bg)
+        top.pack(fill="x", padx=16, pady=(14, 8))
+
+        tk.Label(
+            top,
+            text="Calidad de datos",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 12, "bold"),
+        ).pack(side="left")
+
+        self.scan_btn = self._button(top, "Volver a revisar", self._scan)
+        self.scan_btn.pack(side="right")
+
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self.win, textvariable=self.status_var, bg=self.bg, fg=self.text_color, anchor="w").pack(
+            fill="x", padx=16
+        )
+
+        body = tk.Frame(self.win, bg=self.bg)
+        body.pack(fill="both", expand=True, padx=16, pady=(6, 8))
+
+        # Resumen: un chequeo por fila; al elegir uno se carga su detalle
+        self.summary = ttk.Treeview(body, columns=("Chequeo", "Cantidad"), show="headings", height=4,
+                                    selectmode="browse")
+        self.summary.heading("Chequeo", text="Chequeo")
+        self.summary.heading("Cantidad", text="Cantidad")
+        self.summary.column("Chequeo", width=220, anchor="w")
+        self.summary.column("Cantidad", width=80, anchor="e", stretch=False)
+        self.summary.pack(side="left", fill="y", padx=(0, 12))
+        for check in QUALITY_CHECKS:
+            self.summary.insert("", "end", iid=check, values=(self.CHECK_LABELS[check], ""))
+        self.summary.bind("<<TreeviewSelect>>", self._on_check_select)
+
+        border = tk.Frame(body, bg=self.accent)
+        border.pack(side="left", fill="both", expand=True)
+        inner = tk.Frame(border, bg=self.bg)
+        inner.pack(fill="both", expand=True, padx=2, pady=2)
+
+        self.detail = ttk.Treeview(inner, show="headings")
+        self.detail.pack(side="left", fill="both", expand=True)
+        vsb = ttk.Scrollbar(inner, orient="vertical", command=self.detail.yview)
+        vsb.pack(side="right", fill="y")
+        self.detail.configure(yscrollcommand=vsb.set)
+
+        self.fix_bar = tk.Frame(self.win, bg=self.bg)
+        self.fix_bar.pack(fill="x", padx=16, pady=(0, 14))
+
+    # ---------------- hilo ----------------
+
+    def _run(self, message: str, work, done):
+        """Corre work() en un hilo; done(resultado) vuelve al hilo de la UI."""
+        if self._busy:
+            return
+        self._busy = True
+        self.status_var.set(message)
+        self.win.configure(cursor="watch")
+        result = {}
+
+        def target():
+            try:
+                result["value"] = work()
+            except Exception as e:
+                result["error"] = e
+
+        t = threading.Thread(target=target, daemon=True)
+        t.start()
+
+        def poll():
+            if t.is_alive():
+                self.win.after(150, poll)
+                return
+            self._busy = False
+            if not self.win.winfo_exists():
+                return
+            self.win.configure(cursor="")
+            if "error" in result:
+                self.status_var.set("")
+                messagebox.showerror("Error", str(result["error"]), parent=self.win)
+                return
+            done(result["value"])
+
+        poll()
+
+    # ---------------- reporte ----------------
+
+    def _scan(self):
+        def work():
+            report = self.quality_repo.scan()
+            return report, self.quality_repo.details(self._check)
+
+        self._run("Revisando...", work, self._show_report)
+
+    def _show_report(self, value):
+        self._report, rows = value
+        r = self._report
+        for check in QUALITY_CHECKS:
+            self.summary.set(check, "Cantidad", r.count(check))
+
+        self.status_var.set(
+            f"{r.orphan_jobs} jobs huérfanos en {r.orphan_codes} grupos, "
+            f"{r.duplicate_jobs} jobs duplicados, {r.empty_services} grupos sin servicio, "
+            f"{r.unused_groups} grupos sin jobs."
+            if not r.clean else "Sin problemas."
+        )
+        self.summary.selection_set(self._check)
+        self._show_detail(rows)
+
+    def _on_check_select(self, _event=None):
+        sel = self.summary.selection()
+        if not sel or sel[0] == self._check:
+            return
+        if self._busy:
+            self.summary.selection_set(self._check)
+            return
+        self._check = sel[0]
+        check = self._check
+        self._run("Cargando detalle...", lambda: self.quality_repo.details(check), self._show_detail)
+
+    def _show_detail(self, rows):
+        cols = COLUMNS[self._check]
+        self.detail.delete(*self.detail.get_children())
+        self.detail.configure(columns=cols)
+        for c in cols:
+            self.detail.heading(c, text=c)
+            self.detail.column(c, width=90 if c in ("Jobs", "KeepId") else 220, anchor="w")
+        for r in rows:
+            self.detail.insert("", "end", values=r)
+
+        if self._report is not None:
+            total = self._report.count(self._check)
+            if total > len(rows):
+                self.status_var.set(f"Mostrando {len(rows)} de {total}; los arreglos sin selección aplican a todos.")
+        self._build_fix_bar()
+
+    def _build_fix_bar(self):
+        for w in self.fix_bar.winfo_children():
+            w.destroy()
+        if not self.can_fix:
+            return
+
+        buttons = {
+            CHECK_ORPHAN_JOBS: [("Crear grupos faltantes", self._fix_create_groups), ("Mover a grupo...", self._fix_move)],
+            CHECK_DUPLICATE_JOBS: [("Retirar duplicados", self._fix_duplicates)],
+            CHECK_EMPTY_SERVICES: [("Asignar servicio...", self._fix_service)],
+            CHECK_UNUSED_GROUPS: [("Borrar grupos", self._fix_unused)],
+        }[self._check]
+        for text, command in buttons:
+            self._button(self.fix_bar, text, command).pack(side="right", padx=(8, 0))
+
+    # ---------------- arreglos ----------------
+
+    def _selected_keys(self):
+        """Primera columna de las filas seleccionadas, o None (= todas)."""
+        sel = self.detail.selection()
+        if not sel:
+            return None
+        keys = [self.detail.item(i, "values")[0] for i in sel]
+        return [int(k) for k in keys] if self._check == CHECK_DUPLICATE_JOBS else [str(k) for k in keys]
+
+    def _scope(self, keys) -> str:
+        return f"las {len(keys)} filas seleccionadas" if keys is not None else "todas las filas del chequeo"
+
+    def _apply(self, question: str, work, describe):
+        if not messagebox.askyesno("Calidad de datos", question, parent=self.win):
+            return
+
+        def done(result):
+            self.changed = True
+            messagebox.showinfo("Calidad de datos", describe(result), parent=self.win)
+            self._scan()
+
+        self._run("Aplicando...", work, done)
+
+    @staticmethod
+    def _updated(outcomes) -> int:
+        return sum(1 for o in outcomes if o.status == OUTCOME_UPDATED)
+
+    def _fix_create_groups(self):
+        keys = self._selected_keys()
+        self._apply(
+            f"¿Crear los grupos que faltan para {self._scope(keys)}? (GroupName = GroupCode)",
+            lambda: self.quality_repo.create_missing_groups(keys),
+            lambda codes: f"{len(codes)} grupos creados.",
+        )
+
+    def _fix_move(self):
+        keys = self._selected_keys()
+        group_code = simpledialog.askstring("Mover jobs", "GroupCode destino (debe existir):", parent=self.win)
+        if not group_code:
+            return
+        self._apply(
+            f"¿Mover los jobs huérfanos de {self._scope(keys)} a {group_code.strip()}?",
+            lambda: self.quality_repo.move_orphans(group_code, keys),
+            lambda outcomes: f"{self._updated(outcomes)} jobs movidos.",
+        )
+
+    def _fix_duplicates(self):
+        keys = self._selected_keys()
+        self._apply(
+            f"¿Retirar los duplicados de {self._scope(keys)}? Se conserva el más viejo de cada "
+            "JobName + GroupCode; los retirados se pueden restaurar.",
+            lambda: self.quality_repo.retire_duplicates(keys),
+            lambda outcomes: f"{self._updated(outcomes)} jobs retirados.",
+        )
+
+    def _fix_service(self):
+        keys = self._selected_keys()
+        service_name = simpledialog.askstring("Asignar servicio", "ServiceName:", parent=self.win)
+        if not service_name or not service_name.strip():
+            return
+        self._apply(
+            f"¿Asignar ServiceName '{service_name.strip()}' a {self._scope(keys)}?",
+            lambda: self.quality_repo.set_service(service_name, keys),
+            lambda codes: f"{len(codes)} grupos actualizados.",
+        )
+
+    def _fix_unused(self):
+        keys = self._selected_keys()
+        self._apply(
+            f"¿Borrar {self._scope(keys)}? Solo se borran los grupos que sigan sin ningún job.",
+            lambda: self.quality_repo.delete_unused_groups(keys),
+            lambda codes: f"{len(codes)} grupos borrados.",
+        )
+
+    def _on_close(self):
+        if self._busy:
+            # Las escrituras no se cortan a mitad: se cierra cuando termina
+            self.status_var.set("Esperando a que termine la operación en curso...")
+            return
+        self.win.destroy()
@@ -5,10 +5,20 @@ from src.core.config import AppConfig
 
 
 class EditGroupWindow:
-    def __init__(self, parent: tk.Tk, config: AppConfig, groups_repo, group_code: str, group_name: str, service_name: str):
+    def __init__(
+        self,
+        parent: tk.Tk,
+        config: AppConfig,
+        groups_repo,
+        group_code: str,
+        group_name: str,
+        service_name: str,
+        change_set=None,
+    ):
         self.parent = parent
         self.config = config
         self.groups_repo = groups_repo
+        self.change_set = change_set  # modo borrador: el cambio queda pendiente
 
         self.updated = False
         self.group_code = group_code
@@ -127,10 +137,25 @@ class EditGroupWindow:
             messagebox.showwarning("Validación", "GroupName es requerido.")
             return
 
-        try:
-            self.groups_repo.update_group(self.group_code, name, service)
+        if self.change_set is not None:
+            try:
+                pending = self.change_set.stage_group(self.group_code, name, service)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo registrar el cambio:\n{e}")
+                return
             self.updated = True
-            messagebox.showinfo("Groups", "Group actualizado correctamente.")
+            if not pending:
+                messagebox.showinfo("Groups", "El group quedó igual a lo guardado (sin cambios pendientes).")
+            self.win.destroy()
+            return
+
+        try:
+            changed = self.groups_repo.update_group(self.group_code, name, service)
+            self.updated = bool(changed)
+            if changed:
+                messagebox.showinfo("Groups", "Group actualizado correctamente.")
+            else:
+                messagebox.showinfo("Groups", "No hay cambios que guardar.")
             self.win.destroy()
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el group:\n{e}")
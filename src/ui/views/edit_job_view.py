@@ -11,6 +11,7 @@ class EditJobWindow:
     - job: dict con campos mínimos
     - groups: lista GroupInfo (group_code, group_name, service_name)
     - jobs_repo: update_job()
+    - change_set: en modo borrador el cambio queda pendiente en vez de guardarse
     """
 
     PRIORITY_TO_SEVERITY = {
@@ -20,12 +21,13 @@ class EditJobWindow:
     }
     SEVERITY_TO_PRIORITY = {v: k for k, v in PRIORITY_TO_SEVERITY.items()}
 
-    def __init__(self, parent: tk.Tk, config: AppConfig, jobs_repo, groups, job: dict):
+    def __init__(self, parent: tk.Tk, config: AppConfig, jobs_repo, groups, job: dict, change_set=None):
         self.parent = parent
         self.config = config
         self.jobs_repo = jobs_repo
         self.groups = groups or []
         self.job = job
+        self.change_set = change_set
 
         self.updated = False  # True si guardó cambios
 
@@ -241,16 +243,32 @@ class EditJobWindow:
             messagebox.showerror("Validación", "Incident Priority inválida.")
             return
 
+        if self.change_set is not None:
+            try:
+                pending = self.change_set.stage_job(job_id, type_, job_name, group_code, int(severity))
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo registrar el cambio:\n{e}")
+                return
+            # También cuando vuelve al valor guardado: la fila deja de estar pendiente
+            self.updated = True
+            if not pending:
+                messagebox.showinfo("Jobs", "El job quedó igual a lo guardado (sin cambios pendientes).")
+            self.win.destroy()
+            return
+
         try:
-            self.jobs_repo.update_job(
+            changed = self.jobs_repo.update_job(
                 job_id=job_id,
                 type_=type_,
                 job_name=job_name,
                 group_code=group_code,
                 severity=int(severity),
             )
-            self.updated = True
-            messagebox.showinfo("Jobs", "Job actualizado correctamente.")
+            self.updated = bool(changed)
+            if changed:
+                messagebox.showinfo("Jobs", "Job actualizado correctamente.")
+            else:
+                messagebox.showinfo("Jobs", "No hay cambios que guardar.")
             self.win.destroy()
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el job:\n{e}")
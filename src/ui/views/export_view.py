@@ -0,0 +1,275 @@
+# src/ui/views/export_view.py
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from tkinter import ttk
+
+from src.core.config import AppConfig
+from src.service.export_service import EXPORT_FORMATS, FORMAT_PARQUET, ExportServiceError, parse_date
+from src.storage.export_repository import KIND_AUDIT, KIND_GROUPS, KIND_JOBS
+
+
+class ExportWindow:
+    """
+    Modal para exportar jobs / grupos / audit log a CSV, JSONL o Parquet (gzip opcional).
+    - export_service: ExportService (corre en un hilo; la ventana consulta el avance)
+    - search: búsqueda actual del grid (mismo filtro para jobs)
+    - Cancelar deja el archivo parcial: exportar lo mismo al mismo archivo sigue desde ahí.
+    """
+
+    KIND_LABELS = {
+        "Jobs": KIND_JOBS,
+        "Groups": KIND_GROUPS,
+        "Audit log": KIND_AUDIT,
+    }
+
+    def __init__(self, parent: tk.Tk, config: AppConfig, export_service, search: str = "", can_audit: bool = False):
+        self.parent = parent
+        self.config = config
+        self.export_service = export_service
+        self.search = search or ""
+        self.can_audit = can_audit
+
+        self._thread = None
+        self._cancel = threading.Event()
+        self._progress = None  # último ExportSummary informado por el hilo
+        self._result = {}
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Exportar")
+        self.win.geometry("620x380")
+        self.win.resizable(False, False)
+
+        # Theme
+        self.bg = self.config.back_color
+        self.box_bg = self.config.box_color
+        self.label_bg = self.config.label_color
+        self.button_bg = self.config.button_color
+        self.accent = self.config.accent_color
+        self.text_color = self.config.text_color
+        self.button_text_color = self.config.button_text_color
+        self.input_bg = self.config.input_bg
+        self.input_text_color = self.config.input_text_color
+
+        self.win.configure(bg=self.bg)
+
+        # Modal
+        self.win.transient(parent)
+        self.win.grab_set()
+        self.win.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self._build_ui()
+
+    def _build_ui(self):
+        root = tk.Frame(self.win, bg=self.bg)
+        root.pack(fill="both", expand=True, padx=18, pady=18)
+
+        tk.Label(
+            root,
+            text="Exportar (CSV / JSONL / Parquet)",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 12, "bold"),
+        ).pack(anchor="w", pady=(0, 4))
+
+        tk.Label(
+            root,
+            text="Fechas YYYY-MM-DD (opcionales). Buscar usa la misma sintaxis que el grid.",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 9),
+        ).pack(anchor="w", pady=(0, 8))
+
+        form = tk.Frame(root, bg=self.bg)
+        form.pack(fill="x")
+
+        kinds = [label for label, kind in self.KIND_LABELS.items() if kind != KIND_AUDIT or self.can_audit]
+        self.kind_var = tk.StringVar(value=kinds[0])
+        self.format_var = tk.StringVar(value=EXPORT_FORMATS[0])
+        self.gzip_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar(value=self.search)
+        self.from_var = tk.StringVar()
+        self.to_var = tk.StringVar()
+
+        self._row_combo(form, 0, "Datos", self.kind_var, kinds)
+        self._row_combo(form, 1, "Formato", self.format_var, list(EXPORT_FORMATS))
+        tk.Checkbutton(
+            form,
+            text="gzip",
+            variable=self.gzip_var,
+            bg=self.bg,
+            fg=self.text_color,
+            selectcolor=self.input_bg,
+            activebackground=self.bg,
+        ).grid(row=1, column=2, sticky="w", padx=(12, 0))
+        self._row_entry(form, 2, "Buscar", self.search_var, width=40)
+        self._row_entry(form, 3, "Desde", self.from_var, width=16)
+        self._row_entry(form, 4, "Hasta", self.to_var, width=16)
+
+        self.progress = ttk.Progressbar(root, mode="indeterminate")
+        self.progress.pack(fill="x", pady=(14, 4))
+
+        self.status_var = tk.StringVar(value="")
+        tk.Label(root, textvariable=self.status_var, bg=self.bg, fg=self.text_color, anchor="w").pack(fill="x")
+
+        buttons = tk.Frame(root, bg=self.bg)
+        buttons.pack(fill="x", pady=(14, 0))
+
+        self.cancel_btn = tk.Button(
+            buttons,
+            text="Cerrar",
+            command=self._on_close,
+            bg=self.box_bg,
+            fg=self.text_color,
+            relief="flat",
+            cursor="hand2",
+            width=14
+        )
+        self.cancel_btn.pack(side="left")
+
+        self.export_btn = tk.Button(
+            buttons,
+            text="Exportar...",
+            command=self._on_export,
+            bg=self.button_bg,
+            fg=self.button_text_color,
+            relief="flat",
+            cursor="hand2",
+            activebackground=self.accent,
+            activeforeground=self.button_text_color,
+            width=14
+        )
+        self.export_btn.pack(side="right")
+
+        self.export_btn.bind("<Enter>", lambda e: self.export_btn.configure(bg=self.accent))
+        self.export_btn.bind("<Leave>", lambda e: self.export_btn.configure(bg=self.button_bg))
+
+    def _row_combo(self, parent: tk.Frame, row: int, label: str, var: tk.StringVar, values):
+        tk.Label(parent, text=label, bg=self.label_bg, fg="#111111", padx=10, pady=6).grid(
+            row=row, column=0, sticky="e", padx=(0, 12), pady=6
+        )
+        ttk.Combobox(
+            parent,
+            textvariable=var,
+            values=values,
+            state="readonly",
+            width=20
+        ).grid(row=row, column=1, sticky="w", pady=6)
+
+    def _row_entry(self, parent: tk.Frame, row: int, label: str, var: tk.StringVar, width: int):
+        tk.Label(parent, text=label, bg=self.label_bg, fg="#111111", padx=10, pady=6).grid(
+            row=row, column=0, sticky="e", padx=(0, 12), pady=6
+        )
+        tk.Entry(
+            parent,
+            textvariable=var,
+            bg=self.input_bg,
+            fg=self.input_text_color,
+            relief="flat",
+            highlightthickness=2,
+            highlightbackground=self.box_bg,
+            highlightcolor=self.button_bg,
+            insertbackground=self.input_text_color,
+            width=width
+        ).grid(row=row, column=1, columnspan=2, sticky="w", pady=6)
+
+    def _on_export(self):
+        kind = self.KIND_LABELS[self.kind_var.get()]
+        fmt = self.format_var.get()
+        use_gzip = bool(self.gzip_var.get())
+        try:
+            date_from = parse_date(self.from_var.get())
+            date_to = parse_date(self.to_var.get(), end=True)
+        except ExportServiceError as e:
+            messagebox.showerror("Validación", str(e), parent=self.win)
+            return
+
+        if fmt == FORMAT_PARQUET:
+            # Parquet se escribe como un directorio de partes
+            path = filedialog.asksaveasfilename(
+                parent=self.win,
+                title="Directorio Parquet",
+                initialfile=f"{kind}.parquet",
+                defaultextension=".parquet",
+            )
+        else:
+            ext = f".{fmt}.gz" if use_gzip else f".{fmt}"
+            path = filedialog.asksaveasfilename(
+                parent=self.win,
+                title="Exportar a",
+                initialfile=f"{kind}{ext}",
+                defaultextension=ext,
+                filetypes=[(fmt.upper(), f"*{ext}"), ("Todos", "*.*")],
+                confirmoverwrite=False,  # el mismo archivo retoma un export cortado
+            )
+        if not path:
+            return
+
+        self._cancel.clear()
+        self._progress = None
+        self._result = {}
+        self.export_btn.configure(state="disabled")
+        self.cancel_btn.configure(text="Cancelar")
+        self.status_var.set("Exportando...")
+        self.progress.start(15)
+
+        def on_progress(summary):
+            self._progress = summary
+
+        def work():
+            try:
+                self._result["summary"] = self.export_service.run(
+                    kind,
+                    path,
+                    fmt=fmt,
+                    use_gzip=use_gzip,
+                    search=self.search_var.get().strip() or None,
+                    date_from=date_from,
+                    date_to=date_to,
+                    progress=on_progress,
+                    cancel=self._cancel,
+                )
+            except Exception as e:
+                self._result["error"] = e
+
+        self._thread = threading.Thread(target=work, daemon=True)
+        self._thread.start()
+        self._poll()
+
+    def _poll(self):
+        s = self._progress
+        if s is not None:
+            self.status_var.set(self._describe(s))
+
+        if self._thread.is_alive():
+            self.win.after(200, self._poll)
+            return
+
+        self._thread = None
+        self.progress.stop()
+        self.export_btn.configure(state="normal")
+        self.cancel_btn.configure(text="Cerrar")
+
+        if "error" in self._result:
+            self.status_var.set("El export falló (exportar de nuevo al mismo archivo sigue desde el último bloque).")
+            messagebox.showerror("Error", f"No se pudo exportar:\n{self._result['error']}", parent=self.win)
+            return
+
+        s = self._result["summary"]
+        prefix = "Cancelado" if s.cancelled else "Terminado"
+        self.status_var.set(f"{prefix}: {self._describe(s)}")
+
+    @staticmethod
+    def _describe(s) -> str:
+        text = f"{s.rows} filas escritas en {s.path}"
+        if s.resumed_from:
+            text += f" (retomado desde la fila {s.resumed_from})"
+        return text
+
+    def _on_close(self):
+        if self._thread is not None:
+            # Corta al terminar la página en curso; la ventana queda abierta hasta ese momento
+            self._cancel.set()
+            self.status_var.set("Cancelando al terminar el bloque actual...")
+            return
+        self.win.destroy()
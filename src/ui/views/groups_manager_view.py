@@ -8,12 +8,14 @@ from src.ui.views.edit_group_view import EditGroupWindow
 
 
 class GroupsManagerWindow:
-    def __init__(self, parent: tk.Tk, config: AppConfig, groups_repo):
+    def __init__(self, parent: tk.Tk, config: AppConfig, groups_repo, change_set=None):
         self.parent = parent
         self.config = config
         self.groups_repo = groups_repo
+        self.change_set = change_set  # modo borrador: las ediciones quedan pendientes
 
         self.changed = False  # True si se creó o actualizó algo
+        self.staged_codes = set()  # GroupCode editados en borrador
 
         self.win = tk.Toplevel(parent)
         self.win.title("Groups Manager")
@@ -124,6 +126,8 @@ class GroupsManagerWindow:
                 self.tree.delete(item)
 
             for g in groups:
+                if self.change_set is not None:
+                    g = self.change_set.overlay_group(g)
                 self.tree.insert("", "end", values=(g.group_code, g.group_name, g.service_name))
 
         except Exception as e:
@@ -146,8 +150,14 @@ class GroupsManagerWindow:
         values = self.tree.item(item_id, "values")
         group_code, group_name, service_name = values[0], values[1], values[2]
 
-        w = EditGroupWindow(self.win, self.config, self.groups_repo, group_code, group_name, service_name)
+        w = EditGroupWindow(
+            self.win, self.config, self.groups_repo, group_code, group_name, service_name,
+            change_set=self.change_set,
+        )
         self.win.wait_window(w.win)
         if w.updated:
-            self.changed = True
+            if self.change_set is not None:
+                self.staged_codes.add(group_code)
+            else:
+                self.changed = True
             self._load_groups()
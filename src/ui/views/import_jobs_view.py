@@ -0,0 +1,245 @@
+# src/ui/views/import_jobs_view.py
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from tkinter import ttk
+
+from src.core.config import AppConfig
+
+
+class ImportJobsWindow:
+    """
+    Modal para importar Jobs desde CSV/XLSX.
+    - import_service: ImportService (corre en un hilo; la ventana consulta el avance)
+    - Cancelar deja lo ya aplicado: importar el mismo archivo sigue desde ahí.
+    """
+
+    def __init__(self, parent: tk.Tk, config: AppConfig, import_service):
+        self.parent = parent
+        self.config = config
+        self.import_service = import_service
+
+        self.imported = False  # True si se aplicó al menos un chunk
+
+        self._thread = None
+        self._cancel = threading.Event()
+        self._progress = None  # último ImportSummary informado por el hilo
+        self._result = {}
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Importar Jobs")
+        self.win.geometry("620x440")
+        self.win.resizable(False, False)
+
+        # Theme
+        self.bg = self.config.back_color
+        self.box_bg = self.config.box_color
+        self.label_bg = self.config.label_color
+        self.button_bg = self.config.button_color
+        self.accent = self.config.accent_color
+        self.text_color = self.config.text_color
+        self.button_text_color = self.config.button_text_color
+        self.input_bg = self.config.input_bg
+        self.input_text_color = self.config.input_text_color
+
+        self.win.configure(bg=self.bg)
+
+        # Modal
+        self.win.transient(parent)
+        self.win.grab_set()
+        self.win.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self._build_ui()
+
+    def _build_ui(self):
+        root = tk.Frame(self.win, bg=self.bg)
+        root.pack(fill="both", expand=True, padx=18, pady=18)
+
+        tk.Label(
+            root,
+            text="Importar Jobs (CSV / XLSX)",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 12, "bold"),
+        ).pack(anchor="w", pady=(0, 4))
+
+        tk.Label(
+            root,
+            text="Columnas: Type, JobName, GroupCode, Priority o Severity; opcionales GroupName, ServiceName.",
+            bg=self.bg,
+            fg=self.text_color,
+            font=("Segoe UI", 9),
+        ).pack(anchor="w", pady=(0, 10))
+
+        file_row = tk.Frame(root, bg=self.bg)
+        file_row.pack(fill="x")
+
+        self.path_var = tk.StringVar()
+        tk.Entry(
+            file_row,
+            textvariable=self.path_var,
+            bg=self.input_bg,
+            fg=self.input_text_color,
+            relief="flat",
+            highlightthickness=2,
+            highlightbackground=self.box_bg,
+            highlightcolor=self.button_bg,
+            insertbackground=self.input_text_color,
+            width=58
+        ).pack(side="left", fill="x", expand=True)
+
+        self.browse_btn = tk.Button(
+            file_row,
+            text="Examinar...",
+            command=self._on_browse,
+            bg=self.box_bg,
+            fg=self.text_color,
+            relief="flat",
+            cursor="hand2",
+            width=12
+        )
+        self.browse_btn.pack(side="right", padx=(8, 0))
+
+        self.progress = ttk.Progressbar(root, mode="determinate", maximum=1)
+        self.progress.pack(fill="x", pady=(14, 4))
+
+        self.status_var = tk.StringVar(value="Selecciona un archivo.")
+        tk.Label(root, textvariable=self.status_var, bg=self.bg, fg=self.text_color, anchor="w").pack(fill="x")
+
+        self.errors_text = tk.Text(
+            root,
+            height=10,
+            bg=self.input_bg,
+            fg=self.input_text_color,
+            relief="flat",
+            state="disabled",
+            font=("Consolas", 9),
+        )
+        self.errors_text.pack(fill="both", expand=True, pady=(8, 0))
+
+        buttons = tk.Frame(root, bg=self.bg)
+        buttons.pack(fill="x", pady=(14, 0))
+
+        self.cancel_btn = tk.Button(
+            buttons,
+            text="Cerrar",
+            command=self._on_close,
+            bg=self.box_bg,
+            fg=self.text_color,
+            relief="flat",
+            cursor="hand2",
+            width=14
+        )
+        self.cancel_btn.pack(side="left")
+
+        self.import_btn = tk.Button(
+            buttons,
+            text="Importar",
+            command=self._on_import,
+            bg=self.button_bg,
+            fg=self.button_text_color,
+            relief="flat",
+            cursor="hand2",
+            activebackground=self.accent,
+            activeforeground=self.button_text_color,
+            width=14
+        )
+        self.import_btn.pack(side="right")
+
+        self.import_btn.bind("<Enter>", lambda e: self.import_btn.configure(bg=self.accent))
+        self.import_btn.bind("<Leave>", lambda e: self.import_btn.configure(bg=self.button_bg))
+
+    def _on_browse(self):
+        path = filedialog.askopenfilename(
+            parent=self.win,
+            title="Archivo a importar",
+            filetypes=[("CSV / Excel", "*.csv *.txt *.xlsx"), ("Todos", "*.*")],
+        )
+        if path:
+            self.path_var.set(path)
+
+    def _on_import(self):
+        path = (self.path_var.get() or "").strip()
+        if not path:
+            messagebox.showwarning("Validación", "Selecciona un archivo.", parent=self.win)
+            return
+
+        self._cancel.clear()
+        self._progress = None
+        self._result = {}
+        self._set_errors([])
+        self.import_btn.configure(state="disabled")
+        self.browse_btn.configure(state="disabled")
+        self.cancel_btn.configure(text="Cancelar")
+        self.status_var.set("Leyendo archivo...")
+
+        def on_progress(summary):
+            self._progress = summary
+
+        def work():
+            try:
+                self._result["summary"] = self.import_service.run(path, progress=on_progress, cancel=self._cancel)
+            except Exception as e:
+                self._result["error"] = e
+
+        self._thread = threading.Thread(target=work, daemon=True)
+        self._thread.start()
+        self._poll()
+
+    def _poll(self):
+        s = self._progress
+        if s is not None:
+            self.imported = True
+            self.progress.configure(maximum=max(1, s.total_rows, s.rows_done), value=s.rows_done)
+            self.status_var.set(self._describe(s))
+
+        if self._thread.is_alive():
+            self.win.after(200, self._poll)
+            return
+
+        self._thread = None
+        self.import_btn.configure(state="normal")
+        self.browse_btn.configure(state="normal")
+        self.cancel_btn.configure(text="Cerrar")
+
+        if "error" in self._result:
+            self.status_var.set("El import falló (lo ya aplicado queda; reintentar sigue desde ahí).")
+            messagebox.showerror("Error", f"No se pudo importar:\n{self._result['error']}", parent=self.win)
+            return
+
+        s = self._result["summary"]
+        self.progress.configure(maximum=max(1, s.total_rows, s.rows_done), value=s.rows_done)
+        prefix = "Cancelado" if s.cancelled else "Terminado"
+        self.status_var.set(f"{prefix}: {self._describe(s)}")
+        self._set_errors(s.errors, s.invalid)
+
+    @staticmethod
+    def _describe(s) -> str:
+        text = (
+            f"{s.rows_done}/{max(s.total_rows, s.rows_done)} filas - "
+            f"{s.inserted} nuevos, {s.updated} actualizados, {s.unchanged} sin cambios, "
+            f"{s.invalid} con errores"
+        )
+        if s.groups_inserted or s.groups_updated:
+            text += f" - grupos: {s.groups_inserted} nuevos, {s.groups_updated} actualizados"
+        if s.resumed_from:
+            text += f" (retomado desde la fila {s.resumed_from})"
+        return text
+
+    def _set_errors(self, errors, invalid: int = 0):
+        lines = [f"Fila {e.row_num}: {e.message}" for e in errors]
+        if invalid > len(errors):
+            lines.append(f"... y {invalid - len(errors)} filas más con errores.")
+
+        self.errors_text.configure(state="normal")
+        self.errors_text.delete("1.0", "end")
+        self.errors_text.insert("1.0", "\n".join(lines))
+        self.errors_text.configure(state="disabled")
+
+    def _on_close(self):
+        if self._thread is not None:
+            # Corta al terminar el chunk en curso; la ventana queda abierta hasta ese momento
+            self._cancel.set()
+            self.status_var.set("Cancelando al terminar el bloque actual...")
+            return
+        self.win.destroy()
@@ -1,11 +1,12 @@
 ﻿# src/ui/views/login_view.py
 import tkinter as tk
 from tkinter import messagebox
+from typing import Optional
 
 from PIL import Image, ImageTk
 
 from src.core.config import AppConfig
-from src.storage.database import Database
+from src.storage.database import Database, DatabaseUnavailableError
 from src.storage.user_repository import UserRepository
 from src.service.auth_service import AuthService, AuthError
 
@@ -20,7 +21,7 @@ from src.ui.views.change_password_view import ChangePasswordWindow
 
 
 class LoginWindow:
-    def __init__(self, config: AppConfig):
+    def __init__(self, config: AppConfig, db: Optional[Database] = None):
         self.config = config
 
         self.root = tk.Tk()
@@ -49,7 +50,7 @@ class LoginWindow:
         self.root.configure(bg=self.bg)
 
         # Services
-        self.db = Database()
+        self.db = db if db is not None else Database()
         self.user_repo = UserRepository(self.db)
         self.auth = AuthService(self.user_repo)
 
@@ -242,6 +243,8 @@ class LoginWindow:
 
         except AuthError as e:
             messagebox.showerror("Login", str(e))
+        except DatabaseUnavailableError as e:
+            messagebox.showerror("DB no disponible", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo conectar/consultar la DB:\n{e}")
 
@@ -1 +1,26 @@
-﻿# TODO: datetime helpers (UTC/local)
+﻿# Helpers de fecha/hora (UTC)
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+
+_EPOCH = datetime(1970, 1, 1)
+NULL_TS = -(2 ** 63)
+
+
+def to_micros(value: Any) -> int:
+    """CreatedAtUtc (datetime de pyodbc o texto ISO de SQLite) -> microsegundos desde 1970."""
+    if value is None or value == "":
+        return NULL_TS
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(value: int) -> str:
+    """Inverso de to_micros, como texto (mismo formato que str(datetime))."""
+    if value == NULL_TS:
+        return ""
+    return str(_EPOCH + timedelta(microseconds=value))
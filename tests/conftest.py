@@ -0,0 +1,32 @@
+from typing import NamedTuple
+
+import pytest
+
+from src.storage.audit_log_repository import AuditLogRepository
+from src.storage.database import Database
+from src.storage.groups_repository import GroupsRepository
+from src.storage.jobs_repository import JobsRepository
+
+
+class Repos(NamedTuple):
+    db: Database
+    jobs_repo: JobsRepository
+    groups_repo: GroupsRepository
+    audit_repo: AuditLogRepository
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Database sobre un SQLite nuevo en tmp_path (esquema completo, sin datos)."""
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("DB_SQLITE_PATH", str(tmp_path / "ctl.db"))
+    database = Database()
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def repos(db) -> Repos:
+    """Repositorios de jobs y grupos con audit, sobre el db del test."""
+    audit_repo = AuditLogRepository(db)
+    return Repos(db, JobsRepository(db, audit_repo), GroupsRepository(db, audit_repo), audit_repo)
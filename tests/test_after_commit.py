@@ -0,0 +1,65 @@
+import pytest
+
+from src.service.change_set import ChangeSet
+
+
+@pytest.fixture(autouse=True)
+def groups(repos):
+    repos.groups_repo.add_group("FIN01", "Finance", "Payments")
+
+
+def test_after_commit_runs_once_after_the_outer_commit(repos):
+    db = repos.db
+    calls = []
+    db.after_commit(lambda: calls.append("now"))
+    assert calls == ["now"]  # fuera de una transacción corre ya
+
+    with db.transaction():
+        with db.transaction():
+            db.after_commit(lambda: calls.append("inner"))
+        assert calls == ["now"]
+    assert calls == ["now", "inner"]
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.after_commit(lambda: calls.append("rolled back"))
+            raise RuntimeError("falla")
+    assert calls == ["now", "inner"]
+
+
+def test_rollback_leaves_fuzzy_and_listeners_untouched(repos):
+    db, jobs_repo, groups_repo, _audit = repos
+    job_id = jobs_repo.add_job("cmd", "BACKUP_NIGHTLY", "FIN01", 3)
+    assert [j.id for j in jobs_repo.fuzzy_jobs("backup")] == [job_id]
+
+    job_events, group_events = [], []
+    jobs_repo.add_listener(job_events.append)
+    groups_repo.add_listener(group_events.append)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            jobs_repo.update_jobs([(job_id, "cmd", "RESTORE_WEEKLY", "FIN01", 3)])
+            groups_repo.update_groups([("FIN01", "Finanzas", "Payments")])
+            raise RuntimeError("falla después de guardar")
+
+    assert job_events == [] and group_events == []
+    assert jobs_repo.fuzzy_jobs("restore") == []
+    assert [j.job_name for j in jobs_repo.fuzzy_jobs("backup")] == ["BACKUP_NIGHTLY"]
+
+
+def test_change_set_save_publishes_after_commit(repos):
+    db, jobs_repo, groups_repo, _audit = repos
+    job_id = jobs_repo.add_job("cmd", "BACKUP_NIGHTLY", "FIN01", 3)
+    jobs_repo.fuzzy_jobs("backup")
+
+    seen_in_tx = []
+    jobs_repo.add_listener(lambda ids: seen_in_tx.append((ids, db.in_transaction())))
+    groups_repo.add_listener(lambda code: seen_in_tx.append((code, db.in_transaction())))
+
+    changes = ChangeSet(db, jobs_repo, groups_repo)
+    changes.stage_job(job_id, "cmd", "RESTORE_WEEKLY", "FIN01", 4)
+    changes.stage_group("FIN01", "Finanzas", "Payments")
+    changes.save()
+
+    assert sorted(seen_in_tx, key=str) == sorted([([job_id], False), ("FIN01", False)], key=str)
+    assert [j.job_name for j in jobs_repo.fuzzy_jobs("restore")] == ["RESTORE_WEEKLY"]
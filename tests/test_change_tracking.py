@@ -0,0 +1,69 @@
+import pytest
+
+import src.storage.change_tracking as change_tracking
+from src.storage.change_tracking import MODE_AUDIT, ChangeTracker, Watermark
+from src.storage.database import Database
+
+
+def _audit(db: Database, audit_id: int, entity_name: str, entity_id: str) -> None:
+    # audit_id explícito: simula identidades asignadas antes de confirmar
+    with db.transaction() as conn:
+        conn.cursor().execute(
+            "INSERT INTO wt_audit_log (audit_id, action, entity_name, entity_id) VALUES (?, 'UPDATE', ?, ?);",
+            (audit_id, entity_name, entity_id),
+        )
+
+
+def test_out_of_order_commit_is_not_lost(db):
+    tracker = ChangeTracker(db)
+    assert tracker.mode == MODE_AUDIT
+    start = tracker.current()
+    assert start == Watermark(MODE_AUDIT, 0)
+
+    _audit(db, 1, "jobs", "10")
+    _audit(db, 3, "jobs", "30")  # el 2 sigue "en vuelo"
+    changed, wm = tracker.audit_changes(("jobs",), start)
+    assert changed == {"jobs": ["10", "30"]}
+    assert wm.value == 3
+    assert [(a, b) for a, b, _t in wm.gaps] == [(2, 2)]
+
+    # Nada nuevo: no se repite lo ya leído
+    changed, wm = tracker.audit_changes(("jobs",), wm)
+    assert changed == {"jobs": []}
+    assert [(a, b) for a, b, _t in wm.gaps] == [(2, 2)]
+
+    _audit(db, 2, "jobs", "20")  # confirma por debajo del watermark
+    _audit(db, 4, "groups", "FIN")
+    changed, wm = tracker.audit_changes(("jobs", "groups"), wm)
+    assert changed == {"jobs": ["20"], "groups": ["FIN"]}
+    assert wm.value == 4
+    assert wm.gaps == ()
+
+
+def test_expired_gaps_are_dropped(db, monkeypatch):
+    tracker = ChangeTracker(db)
+    _audit(db, 1, "jobs", "1")
+    _audit(db, 5, "jobs", "5")
+    _changed, wm = tracker.audit_changes(("jobs",), Watermark(MODE_AUDIT, 0))
+    assert [(a, b) for a, b, _t in wm.gaps] == [(2, 4)]
+
+    # Un hueco que no aparece en DELTA_AUDIT_GAP_SECONDS fue un rollback
+    now = change_tracking.time.monotonic()
+    monkeypatch.setattr(change_tracking.time, "monotonic", lambda: now + tracker.gap_seconds + 1)
+    _audit(db, 3, "jobs", "3")
+    changed, wm = tracker.audit_changes(("jobs",), wm)
+    assert changed == {"jobs": []}
+    assert wm.gaps == ()
+
+
+def test_current_records_gaps_below_the_top(db):
+    _audit(db, 1, "jobs", "1")
+    _audit(db, 4, "jobs", "4")
+    wm = ChangeTracker(db).current()
+    assert wm.value == 4
+    assert [(a, b) for a, b, _t in wm.gaps] == [(2, 3)]
+
+    _audit(db, 2, "jobs", "2")
+    changed, wm = ChangeTracker(db).audit_changes(("jobs",), wm)
+    assert changed == {"jobs": ["2"]}
+    assert [(a, b) for a, b, _t in wm.gaps] == [(3, 3)]
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import src.storage.database as database
+from src.storage.database import CircuitBreaker, ConnectionPool, DatabaseUnavailableError, PoolTimeoutError
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, _sql):
+        if not self.alive:
+            raise RuntimeError("conexión caída")
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_bounds_reuse_and_ping():
+    opened = []
+
+    def factory():
+        opened.append(_FakeConnection())
+        return opened[-1]
+
+    pool = ConnectionPool(factory, max_size=2, acquire_timeout=0, ping_after=0)
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()  # nunca más de max_size
+
+    pool.release(a)
+    assert pool.acquire() is a  # la libre se reusa
+    a.alive = False
+    pool.release(a)
+    c = pool.acquire()  # la caída se descarta (SELECT 1) y se abre otra
+    assert c is not a and a.closed
+    assert len(opened) == 3
+
+    pool.release(b, discard=True)
+    assert b.closed
+    pool.release(c)
+    pool.close()
+    assert c.closed
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.005)
+
+
+def test_breaker_open_half_open_closed(monkeypatch):
+    # Cada "espera" del hilo de prueba avanza cuando el test lo decide
+    ticks = threading.Semaphore(0)
+    real_sleep = time.sleep
+    monkeypatch.setattr(database.time, "sleep", lambda s: ticks.acquire() if s >= 1 else real_sleep(s))
+
+    probed = threading.Semaphore(0)
+    states, results = [], [RuntimeError("sigue caída"), None]
+
+    def probe():
+        states.append(breaker.state)
+        result = results.pop(0)
+        probed.release()
+        if result is not None:
+            raise result
+
+    breaker = CircuitBreaker(probe, failure_threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # un éxito reinicia la cuenta
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.is_available()
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+    ticks.release()
+    assert probed.acquire(timeout=5)
+    _wait_for(lambda: breaker.state == CircuitBreaker.OPEN)  # la prueba falló: sigue abierto
+
+    ticks.release()
+    assert probed.acquire(timeout=5)
+    _wait_for(lambda: breaker.state == CircuitBreaker.CLOSED)
+    assert states == [CircuitBreaker.HALF_OPEN, CircuitBreaker.HALF_OPEN]
+    breaker.before_call()
+
+    breaker.record_failure()  # cuenta de nuevo desde cero
+    assert breaker.is_available()
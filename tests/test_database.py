@@ -0,0 +1,38 @@
+import pytest
+
+from src.storage.database import Database
+
+
+def _groups(db: Database) -> list:
+    with db.get_connection() as conn:
+        return [r[0] for r in conn.cursor().execute("SELECT GroupCode FROM Groups ORDER BY GroupCode;").fetchall()]
+
+
+def test_nested_transaction_cannot_commit_the_outer_one(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            with db.transaction() as conn:
+                conn.cursor().execute("INSERT INTO Groups (GroupCode, GroupName, ServiceName) VALUES ('A', 'A', '');")
+                conn.commit()  # se une a la externa: no confirma nada
+            with db.transaction() as conn:
+                with conn:
+                    pass  # salir del `with` tampoco cierra ni confirma
+            assert db.in_transaction()
+            raise RuntimeError("falla después del bloque anidado")
+    assert _groups(db) == []
+
+    with db.transaction():
+        with db.transaction() as conn:
+            conn.cursor().execute("INSERT INTO Groups (GroupCode, GroupName, ServiceName) VALUES ('B', 'B', '');")
+    assert _groups(db) == ["B"]
+
+
+def test_nested_transaction_rejects_another_isolation(db):
+    with db.transaction(isolation="SERIALIZABLE"):
+        with db.transaction(isolation="SERIALIZABLE"):
+            pass
+        with db.transaction():
+            pass
+        with pytest.raises(ValueError, match="Isolation"):
+            with db.transaction(isolation="READ COMMITTED"):
+                pass
@@ -0,0 +1,166 @@
+import csv
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+import src.service.export_service as export_service
+from src.service.export_service import ExportService
+from src.storage.export_repository import KIND_AUDIT, KIND_GROUPS, KIND_JOBS, ExportRepository
+
+
+class _FixedClock:
+    """gzip pone la hora en el encabezado de cada miembro: fija para comparar bytes."""
+
+    @staticmethod
+    def time() -> float:
+        return 1_800_000_000.0
+
+
+@pytest.fixture
+def export(repos, monkeypatch):
+    monkeypatch.setattr(gzip, "time", _FixedClock)
+    db, jobs_repo, groups_repo, _audit = repos
+    groups_repo.add_group("FIN01", "Finanzas", "Pagos")
+    groups_repo.add_group("OPS", "Operación", "Nocturno")
+    jobs_repo.add_jobs([
+        ("cmd", f"JOB_{i:02d}_{'LOAD' if i % 2 else 'SEND'}", "FIN01" if i % 3 else "OPS", i % 3 + 3)
+        for i in range(11)
+    ])
+    export_repo = ExportRepository(db, jobs_repo)
+    export_repo.page_size = 3
+    return ExportService(export_repo)
+
+
+def _cancel_after(pages: int):
+    cancel = threading.Event()
+    seen = []
+
+    def progress(summary):
+        seen.append(summary.rows)
+        if len(seen) == pages:
+            cancel.set()
+
+    return progress, cancel
+
+
+def _set_dates(db, table: str, key: str, column: str, dates: dict) -> None:
+    """Fechas fijas (texto ISO, como en SQLite) para probar los filtros."""
+    with db.transaction() as conn:
+        conn.cursor().executemany(
+            f"UPDATE {table} SET {column} = ? WHERE {key} = ?;", [(at, k) for k, at in dates.items()]
+        )
+
+
+@pytest.mark.parametrize("name", ["jobs.csv", "jobs.csv.gz", "jobs.jsonl"])
+def test_resume_is_byte_identical(export, tmp_path, name):
+    full = tmp_path / "full" / name
+    full.parent.mkdir()
+    assert export.run(KIND_JOBS, str(full)).rows == 11
+
+    path = tmp_path / name
+    progress, cancel = _cancel_after(2)
+    first = export.run(KIND_JOBS, str(path), progress=progress, cancel=cancel)
+    assert (first.cancelled, first.rows) == (True, 6)
+    checkpoint = json.loads((tmp_path / f"{name}.export.json").read_text(encoding="utf-8"))
+    assert (checkpoint["rows"], checkpoint["offset"]) == (6, os.path.getsize(path))
+
+    # Basura después del checkpoint (p.ej. una página a medias): al retomar se trunca
+    with open(path, "ab") as f:
+        f.write(b"partial page")
+    second = export.run(KIND_JOBS, str(path))
+    assert (second.resumed_from, second.rows, second.cancelled) == (6, 11, False)
+    assert path.read_bytes() == full.read_bytes()
+    assert not (tmp_path / f"{name}.export.json").exists()
+
+    if name.endswith(".gz"):
+        # Varios miembros gzip (uno por página) se leen como un solo archivo
+        rows = list(csv.reader(gzip.open(path, "rt", encoding="utf-8-sig")))
+        assert len(rows) == 12 and rows[0][0] == "Id"
+
+
+def test_params_mismatch_restarts(export, tmp_path):
+    path = tmp_path / "jobs.csv"
+    progress, cancel = _cancel_after(1)
+    assert export.run(KIND_JOBS, str(path), search="load", progress=progress, cancel=cancel).cancelled
+
+    # Otros filtros: el checkpoint no sirve y el archivo se escribe de cero
+    summary = export.run(KIND_JOBS, str(path))
+    assert (summary.resumed_from, summary.rows) == (0, 11)
+    full = tmp_path / "full.csv"
+    export.run(KIND_JOBS, str(full))
+    assert path.read_bytes() == full.read_bytes()
+
+
+def _exported(path) -> list:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_keyset_pages_with_search_and_dates(export, repos, tmp_path):
+    db, jobs_repo = repos.db, repos.jobs_repo
+    jobs = sorted(jobs_repo.list_jobs(), key=lambda j: j.id)
+    _set_dates(db, "Jobs_information", "Id", "CreatedAtUtc", {
+        j.id: f"2026-0{1 + i % 3}-15 10:00:00.000" for i, j in enumerate(jobs)
+    })
+
+    # Búsqueda del grid sobre varias páginas: en orden de Id, sin repetir ni saltear
+    path = tmp_path / "load.csv"
+    export.run(KIND_JOBS, str(path), search="load")
+    assert [int(r["Id"]) for r in _exported(path)] == [j.id for j in jobs if "LOAD" in j.job_name]
+
+    path = tmp_path / "feb.csv"
+    export.run(KIND_JOBS, str(path), date_from=datetime(2026, 2, 1), date_to=datetime(2026, 3, 1))
+    assert [int(r["Id"]) for r in _exported(path)] == [j.id for i, j in enumerate(jobs) if i % 3 == 1]
+
+    # Retirados no se exportan
+    jobs_repo.retire_jobs([jobs[0].id])
+    path = tmp_path / "active.csv"
+    assert export.run(KIND_JOBS, str(path)).rows == 10
+
+    path = tmp_path / "groups.csv"
+    export.run(KIND_GROUPS, str(path), search="noct")
+    assert [r["GroupCode"] for r in _exported(path)] == ["OPS"]
+
+
+def test_audit_date_and_entity_filters(export, repos, tmp_path):
+    db = repos.db
+    with db.get_connection() as conn:
+        audit = conn.cursor().execute("SELECT audit_id, entity_name FROM wt_audit_log ORDER BY audit_id;").fetchall()
+    _set_dates(db, "wt_audit_log", "audit_id", "event_time_utc", {
+        audit_id: "2026-01-10 08:00:00.000" if i < 5 else "2026-02-10 08:00:00.000"
+        for i, (audit_id, _e) in enumerate(audit)
+    })
+
+    path = tmp_path / "audit.jsonl"
+    summary = export.run(KIND_AUDIT, str(path), date_from=datetime(2026, 2, 1), entity_name="jobs")
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    expected = [a for i, (a, e) in enumerate(audit) if i >= 5 and e == "jobs"]
+    assert summary.rows == len(lines) == len(expected)
+    assert [r["audit_id"] for r in lines] == expected
+    assert {r["event_time_utc"] for r in lines} == {"2026-02-10 08:00:00.000"}
+
+
+def test_parquet_resume_drops_open_and_leftover_parts(export, tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export_service, "PAGES_PER_PART", 2)
+
+    full = tmp_path / "full.parquet"
+    export.run(KIND_JOBS, str(full))
+
+    path = tmp_path / "jobs.parquet"
+    path.mkdir()
+    (path / "part-00007.parquet").write_bytes(b"de un export anterior")
+    progress, cancel = _cancel_after(3)  # parte 0 cerrada, parte 1 abierta
+    first = export.run(KIND_JOBS, str(path), progress=progress, cancel=cancel)
+    assert (first.cancelled, first.rows) == (True, 6)
+    assert not (path / "part-00007.parquet").exists()
+    assert json.loads((tmp_path / "jobs.parquet.export.json").read_text(encoding="utf-8"))["parts"] == 1
+
+    second = export.run(KIND_JOBS, str(path))
+    assert (second.resumed_from, second.rows) == (6, 11)
+    assert sorted(os.listdir(path)) == sorted(os.listdir(full))
+    assert pq.read_table(str(path)).to_pylist() == pq.read_table(str(full)).to_pylist()
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from src.service.import_service import ImportService, ImportServiceError
+from src.storage.import_repository import ImportRepository
+
+
+def _service(repos) -> ImportService:
+    db, jobs_repo, groups_repo, audit_repo = repos
+    return ImportService(ImportRepository(db, jobs_repo, groups_repo, audit_repo), groups_repo)
+
+
+def test_import_repository_requires_audit(repos):
+    db, jobs_repo, groups_repo, _audit = repos
+    with pytest.raises(ValueError, match="audit_repo"):
+        ImportRepository(db, jobs_repo, groups_repo, None)
+
+
+def test_csv_quoted_newlines_semicolon_and_cp1252(repos, tmp_path):
+    path = tmp_path / "jobs.csv"
+    text = (
+        "Type;JobName;GroupCode;Priority;GroupName;ServiceName\r\n"
+        'cmd;ETL_LOAD;FIN01;2;"Finanzas\r\nCierre";Pagos\r\n'
+        "cmd;ETL_SEND;FIN01;Priority 3;;\r\n"
+        "script;BACKUP;OPS;4;Operación;Nocturno\r\n"
+    )
+    path.write_bytes(text.encode("cp1252"))
+
+    seen = []
+    summary = _service(repos).run(str(path), progress=lambda s: seen.append((s.rows_done, s.total_rows)))
+    assert (summary.inserted, summary.invalid, summary.groups_inserted) == (3, 0, 2)
+    # Registros del CSV, no líneas: el salto dentro de comillas no cuenta como fila
+    assert summary.total_rows == summary.rows_done == 3
+    assert seen[-1] == (3, 3)
+
+    _db, jobs_repo, groups_repo, _audit = repos
+    assert groups_repo.get_by_code("FIN01").group_name == "Finanzas\r\nCierre"
+    assert groups_repo.get_by_code("OPS").group_name == "Operación"
+    assert sorted(j.job_name for j in jobs_repo.list_jobs()) == ["BACKUP", "ETL_LOAD", "ETL_SEND"]
+
+
+def test_resume_after_cancel(repos, tmp_path):
+    path = tmp_path / "big.csv"
+    lines = ["Type,JobName,GroupCode,Severity,GroupName,ServiceName"]
+    lines += [f"cmd,JOB_{i:03d},G{i % 3},3,Grupo {i % 3},Svc" for i in range(25)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8-sig")
+
+    cancel = threading.Event()
+
+    def stop_after_first(summary):
+        cancel.set()
+
+    first = _service(repos).run(str(path), progress=stop_after_first, cancel=cancel, chunk_rows=10)
+    assert first.cancelled
+    assert first.inserted == 10
+
+    second = _service(repos).run(str(path), chunk_rows=10)
+    assert second.resumed_from == 10
+    assert (second.inserted, second.rows_done) == (25, 25)
+    assert len(repos[1].list_jobs()) == 25
+
+    # Terminado: el mismo archivo empieza de cero (todo sin cambios)
+    third = _service(repos).run(str(path), chunk_rows=10)
+    assert (third.resumed_from, third.inserted, third.unchanged) == (0, 0, 25)
+
+
+def test_bad_header_and_missing_file(repos, tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("JobName,GroupCode\nA,B\n", encoding="utf-8")
+    with pytest.raises(ImportServiceError, match="Encabezado"):
+        _service(repos).run(str(path))
+    with pytest.raises(ImportServiceError, match="No se pudo leer"):
+        _service(repos).run(str(tmp_path / "nope.csv"))
+
+
+def test_import_publishes_to_fuzzy_and_listeners(repos, tmp_path):
+    _db, jobs_repo, _groups, _audit = repos
+    jobs_repo.fuzzy_jobs("warmup")  # carga el índice fuzzy antes del import
+    heard = []
+    jobs_repo.add_listener(heard.extend)
+
+    path = tmp_path / "jobs.csv"
+    path.write_text(
+        "Type,JobName,GroupCode,Severity,GroupName,ServiceName\n"
+        "cmd,NIGHTLY_BACKUP,OPS,3,Operations,Night Ops\n",
+        encoding="utf-8",
+    )
+    _service(repos).run(str(path))
+    job = jobs_repo.list_jobs()[0]
+    assert heard == [job.id]
+    assert [j.id for j in jobs_repo.fuzzy_jobs("nightly backup")] == [job.id]
+
+    # Reactivado por el import: vuelve al índice y se avisa de nuevo
+    jobs_repo.retire_jobs([job.id])
+    assert jobs_repo.fuzzy_jobs("nightly backup") == []
+    heard.clear()
+    path.write_text(
+        "Type,JobName,GroupCode,Severity,GroupName,ServiceName\n"
+        "cmd,NIGHTLY_BACKUP,OPS,4,Operations,Night Ops\n",
+        encoding="utf-8",
+    )
+    assert _service(repos).run(str(path)).updated == 1
+    assert heard == [job.id]
+    assert [j.id for j in jobs_repo.fuzzy_jobs("nightly backup")] == [job.id]
@@ -0,0 +1,160 @@
+import random
+
+from src.storage.job_fuzzy import PREFIX, FuzzyJobIndex, max_distance_for, prefix_distance
+
+
+def _osa_prefix(term: str, text: str) -> int:
+    """Referencia sin bandas: OSA de term contra el mejor prefijo de text (DP completa)."""
+    n, m = len(term), len(text)
+    d = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        d[i][0] = i
+    for j in range(m + 1):
+        d[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            v = min(
+                d[i - 1][j] + 1,
+                d[i][j - 1] + 1,
+                d[i - 1][j - 1] + (term[i - 1] != text[j - 1]),
+            )
+            if i > 1 and j > 1 and term[i - 1] == text[j - 2] and term[i - 2] == text[j - 1]:
+                v = min(v, d[i - 2][j - 2] + 1)
+            d[i][j] = v
+    return min(d[n])
+
+
+def _mutate(rng: random.Random, s: str, edits: int, alphabet: str) -> str:
+    s = list(s)
+    for _ in range(edits):
+        op = rng.randrange(4)
+        i = rng.randrange(len(s) + 1)
+        if op == 0 or not s:
+            s.insert(i, rng.choice(alphabet))
+        elif op == 1:
+            del s[min(i, len(s) - 1)]
+        elif op == 2:
+            s[min(i, len(s) - 1)] = rng.choice(alphabet)
+        elif len(s) > 1:
+            i = min(i, len(s) - 2)
+            s[i], s[i + 1] = s[i + 1], s[i]
+    return "".join(s)
+
+
+def _effective_k(term: str, k: int) -> int:
+    # Con pocos trigramas el filtro no puede garantizar k errores: (len - 1) // 4
+    return min(k, (len(term) - 1) // 4)
+
+
+def _catalog(rng: random.Random, size: int, alphabet: str):
+    groups = ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 8))) for _ in range(12)]
+    rows = []
+    for job_id in range(1, size + 1):
+        name = "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 18)))
+        rows.append((job_id, name, rng.choice(groups)))
+    return rows
+
+
+def _expected(rows, term: str, k: int):
+    out = {}
+    by_group = {group: _osa_prefix(term, group) for _job_id, _name, group in rows}
+    for job_id, name, group in rows:
+        d = min(_osa_prefix(term, name), by_group[group])
+        if d <= k:
+            out[job_id] = d
+    return out
+
+
+def test_prefix_distance_matches_reference():
+    rng = random.Random(1)
+    alphabet = "abcd"
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        term = _mutate(rng, text[:rng.randint(1, 10)] or "a", rng.randint(0, 3), alphabet) or "a"
+        k = rng.randint(0, 3)
+        ref = _osa_prefix(term, text)
+        got = prefix_distance(term, text, k)
+        assert got == (ref if ref <= k else k + 1), (term, text, k)
+
+
+def test_search_matches_brute_force():
+    rng = random.Random(2)
+    alphabet = "abcdefg_"
+    rows = _catalog(rng, 250, alphabet)
+    index = FuzzyJobIndex()
+    index.load(rows)
+
+    for _ in range(150):
+        _job_id, name, group = rng.choice(rows)
+        base = name if rng.random() < 0.8 else group
+        term = _mutate(rng, base[:rng.randint(3, len(base))], rng.randint(0, 3), alphabet)
+        if not term:
+            continue
+        k = rng.randint(0, 2)
+        expected = _expected(rows, term, _effective_k(term, k))
+
+        got = dict(index.search(term, limit=10 ** 6, max_distance=k))
+        assert got == expected, (term, k)
+
+
+def test_search_limit_keeps_the_closest():
+    rng = random.Random(3)
+    alphabet = "abc_"
+    rows = _catalog(rng, 300, alphabet)
+    index = FuzzyJobIndex()
+    index.load(rows)
+
+    for _ in range(50):
+        term = _mutate(rng, rng.choice(rows)[1], 1, alphabet)
+        if len(term) < 5:
+            continue
+        expected = sorted(_expected(rows, term, _effective_k(term, 2)).values())
+        got = index.search(term, limit=5, max_distance=2)
+        assert [d for _job_id, d in got] == expected[:5], term
+
+
+def test_effective_k_for_short_terms():
+    index = FuzzyJobIndex()
+    index.load([(1, "abcx", "zzz"), (2, "abcdefgx", "zzz")])
+    # 4 letras: (4 - 1) // 4 = 0 errores aunque se pidan 2
+    assert index.search("abcy", max_distance=2) == []
+    # 5 letras: 1 error
+    assert index.search("abcdy", max_distance=2) == [(2, 1)]
+
+
+def test_long_names_match_by_prefix():
+    name = "x" * (PREFIX + 10)
+    index = FuzzyJobIndex()
+    index.load([(1, name, "grp")])
+    assert index.search(name[:PREFIX - 2] + "y", max_distance=1) == [(1, 1)]
+
+
+def test_index_job_and_remove():
+    index = FuzzyJobIndex()
+    index.index_job(1, "ignored", "grp")  # antes de load no hace nada
+    index.load([(1, "payments_daily", "fin"), (2, "backup_nightly", "ops")])
+    assert len(index) == 2
+
+    assert index.search("paymnets") == [(1, 1)]
+    index.index_job(1, "invoices_daily", "fin")
+    assert index.search("paymnets") == []
+    assert index.search("invoces") == [(1, 1)]
+
+    index.index_job(3, "payments_weekly", "fin")
+    assert index.search("paymnets") == [(3, 1)]
+
+    # Cambio de grupo: deja de aparecer por el grupo viejo
+    assert {job_id for job_id, _d in index.search("ops", max_distance=0)} == {2}
+    index.index_job(2, "backup_nightly", "infra")
+    assert index.search("ops", max_distance=0) == []
+
+    index.remove_jobs([3])
+    assert index.search("paymnets") == []
+    assert {job_id for job_id, _d in index.search("fin", max_distance=0)} == {1}
+    assert len(index) == 2
+
+
+def test_max_distance_for():
+    assert max_distance_for("abcd") == 0
+    assert max_distance_for("abcde") == 1
+    assert max_distance_for("abcdefghij") == 2
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from src.storage.job_query import Condition, parse_query
+from src.storage.jobs_repository import JobInfo
+
+
+def _job(**kw) -> JobInfo:
+    values = dict(
+        id=7, type="cmd", job_name="ETL_LOAD", group_code="FIN01", group_name="Finance",
+        service_name="Payments Hub", severity="3", created_at_utc="2026-01-02 10:00:00.000",
+    )
+    values.update(kw)
+    return JobInfo(**values)
+
+
+def test_free_text_only():
+    q = parse_query("etl load")
+    assert not q.is_fielded
+    assert q.text == "etl load"
+
+
+def test_field_value_and_aliases():
+    q = parse_query("group:FIN01 job:ETL_LOAD")
+    assert q.conditions == (
+        Condition("group", "=", "FIN01"),
+        Condition("name", "=", "ETL_LOAD"),
+    )
+    assert q.text == ""
+
+
+def test_prefix_forms():
+    assert parse_query("group:FIN*").conditions == (Condition("group", "prefix", "FIN"),)
+    assert parse_query("name:^ETL_").conditions == (Condition("name", "prefix", "ETL_"),)
+
+
+def test_quoted_values():
+    q = parse_query('svc:"Payments Hub" "free text"')
+    assert q.conditions == (Condition("svc", "=", "Payments Hub"),)
+    assert q.text == "free text"
+
+
+def test_unterminated_quote_takes_the_rest():
+    q = parse_query('svc:"Payments Hub')
+    assert q.conditions == (Condition("svc", "=", "Payments Hub"),)
+
+
+def test_int_comparisons_and_ranges():
+    assert parse_query("id:>10").conditions == (Condition("id", ">", 10),)
+    assert parse_query("sev:<=4").conditions == (Condition("sev", "<=", 4),)
+    assert parse_query("id:5..9").conditions == (Condition("id", ">=", 5), Condition("id", "<=", 9))
+    assert parse_query("id:5..").conditions == (Condition("id", ">=", 5),)
+    assert parse_query("id:..9").conditions == (Condition("id", "<=", 9),)
+
+
+def test_date_day_is_half_open_range():
+    q = parse_query("created:2026-01-02")
+    assert q.conditions == (
+        Condition("created", ">=", datetime(2026, 1, 2)),
+        Condition("created", "<", datetime(2026, 1, 3)),
+    )
+    assert parse_query("created:>2026-01-02").conditions == (Condition("created", ">=", datetime(2026, 1, 3)),)
+    assert parse_query("created:>=2026-01-02T10:30").conditions == (
+        Condition("created", ">=", datetime(2026, 1, 2, 10, 30)),
+    )
+
+
+def test_priority_maps_to_severity_plus_one():
+    # Priority 2 del grid = Severity 3
+    assert parse_query("prio:2").conditions == (Condition("sev", "=", 3),)
+    assert parse_query("priority:>=3").conditions == (Condition("sev", ">=", 4),)
+    assert parse_query("prio:2..3").conditions == (Condition("sev", ">=", 3), Condition("sev", "<=", 4))
+    assert parse_query("prio:2").matches_fields(_job(severity="3"))
+    assert not parse_query("prio:2").matches_fields(_job(severity="4"))
+
+
+def test_unknown_field_is_not_a_condition():
+    q = parse_query("owner:bob group:FIN01")
+    assert q.conditions == (Condition("group", "=", "FIN01"),)
+    assert q.text == "owner:bob"
+
+
+def test_invalid_value_falls_back_to_text():
+    q = parse_query("id:abc created:>2026-0")
+    assert not q.is_fielded
+    assert q.text == "id:abc created:>2026-0"
+
+
+def test_empty_value_is_text():
+    assert parse_query("group:").text == "group:"
+
+
+def test_to_sql_mssql():
+    where, params = parse_query("group:FIN* sev:>=3").to_sql("like", "mssql")
+    assert "j.GroupCode LIKE ? ESCAPE" in where
+    assert "j.Severity >= ?" in where
+    assert params == ("FIN%", 3)
+
+
+def test_to_sql_escapes_like_wildcards():
+    _where, params = parse_query("name:ETL_*").to_sql("like", "mssql")
+    assert params == ("ETL\\_%",)
+
+
+def test_to_sql_sqlite_dates_and_nocase():
+    where, params = parse_query("group:fin01 created:>=2026-01-02T10:00").to_sql("like", "sqlite")
+    assert "COLLATE NOCASE" in where
+    assert params == ("fin01", "2026-01-02 10:00:00.000")
+
+
+def test_matches_is_case_insensitive_and_uses_free_text():
+    assert parse_query("group:fin01 payments").matches(_job())
+    assert not parse_query("group:fin01 payroll").matches(_job())
+    assert parse_query("created:2026-01-02").matches(_job())
+    assert not parse_query("created:<2026-01-02").matches(_job())
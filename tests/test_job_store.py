@@ -0,0 +1,208 @@
+import random
+
+import src.storage.job_store as job_store
+from src.storage.job_index import JobSearchIndex
+from src.storage.job_store import JobStore
+from src.storage.jobs_repository import JobInfo
+
+
+GROUPS = [
+    ("FIN01", "Finance", "Payments Hub"),
+    ("FIN02", "Finance Batch", ""),
+    ("OPS", "Operations", "Night Ops"),
+    ("HR", "People", "Payroll"),
+]
+TYPES = ["cmd", "script", "ftp"]
+
+
+def _job(i: int, group=None, **kw) -> JobInfo:
+    code, name, service = group or GROUPS[i % len(GROUPS)]
+    values = dict(
+        id=i, type=TYPES[i % len(TYPES)], job_name=f"JOB_{i:04d}_{'LOAD' if i % 2 else 'SEND'}",
+        group_code=code, group_name=name, service_name=service,
+        severity="" if i % 5 == 0 else str(i % 4 + 1),
+        created_at_utc=f"2026-01-{i % 28 + 1:02d} 10:00:00",
+    )
+    values.update(kw)
+    return JobInfo(**values)
+
+
+def _expected(jobs, term=None, group_codes=None, types=None, severities=None, created_from=None, created_to=None):
+    """Mismo filtro que JobStore.select, fila por fila sobre JobInfo."""
+    out = []
+    for j in jobs:
+        if group_codes is not None and j.group_code not in group_codes:
+            continue
+        if types is not None and j.type not in types:
+            continue
+        if severities is not None and (int(j.severity) if j.severity else -1) not in severities:
+            continue
+        day = j.created_at_utc[:10]
+        if created_from is not None and day < created_from:
+            continue
+        if created_to is not None and day >= created_to:
+            continue
+        if term:
+            t = term.lower()
+            fields = (j.job_name, j.group_code, j.group_name, j.service_name)
+            if not any(t in f.lower() for f in fields):
+                continue
+        out.append(j.id)
+    return sorted(out)
+
+
+def _ids(store: JobStore, indices) -> list:
+    return sorted(store.ids[i] for i in indices)
+
+
+def test_select_matches_row_by_row_filter():
+    jobs = [_job(i) for i in range(1, 301)]
+    store = JobStore.from_jobs(jobs)
+    # Un valor por grupo / tipo distinto, no por fila
+    assert len(store.groups) == len(GROUPS)
+    assert len(store.types) == len(TYPES)
+
+    cases = [
+        {},
+        {"term": "load"},
+        {"term": "payments"},      # solo en ServiceName (diccionario de grupos)
+        {"term": "FINANCE"},       # GroupName, sin distinguir mayúsculas
+        {"term": "job_01"},
+        {"group_codes": ["FIN02", "HR"]},
+        {"types": ["ftp"]},
+        {"severities": [2, 3]},
+        {"severities": [-1]},      # Severity NULL
+        {"created_from": "2026-01-10", "created_to": "2026-01-20"},
+        {"term": "send", "group_codes": ["OPS"], "types": ["cmd", "script"]},
+    ]
+    for kw in cases:
+        assert _ids(store, store.select(**kw)) == _expected(jobs, **kw), kw
+
+
+def test_select_on_given_indices():
+    jobs = [_job(i) for i in range(1, 101)]
+    store = JobStore.from_jobs(jobs)
+    some = list(range(0, 100, 3))
+    got = store.select(term="load", indices=some)
+    assert set(got) <= set(some)
+    assert _ids(store, got) == _expected([jobs[i] for i in some], term="load")
+
+
+def test_row_views_and_order():
+    store = JobStore.from_jobs([_job(1), _job(2), _job(5)])
+    row = store.row(store.index_of(5))
+    assert row.to_info() == _job(5)
+    assert row.severity == ""
+
+    by_created = store.order(store.select())
+    assert [store.ids[i] for i in by_created] == [5, 2, 1]
+    by_group = store.order(store.select(), by="group_code", descending=False)
+    assert [r.group_code for r in store.rows(by_group)] == ["FIN02", "FIN02", "OPS"]
+
+
+def test_upsert_updates_in_place_and_encodes_new_values():
+    store = JobStore.from_jobs([_job(1), _job(2)])
+    i = store.index_of(2)
+    store.upsert([_job(2, job_name="RENAMED", group=("NEW", "New Group", "Svc"), type="sap")])
+    assert store.index_of(2) == i
+    assert store.row(i).job_name == "RENAMED"
+    assert store.row(i).group_name == "New Group"
+    assert store.row(i).type == "sap"
+    assert _ids(store, store.select(term="new group")) == [2]
+    assert _ids(store, store.select(types=["sap"])) == [2]
+
+
+def test_remove_and_compacted():
+    jobs = [_job(i) for i in range(1, 201)]
+    store = JobStore.from_jobs(jobs)
+    store.select(term="x")  # arma los nombres en minúscula
+    removed = list(range(1, 201, 2))
+    store.remove(removed)
+    store.upsert([_job(4, group=("TMP", "Temp", ""))])
+    store.upsert([_job(3)])  # vuelve un Id sacado: fila nueva al final
+
+    live = [j for j in jobs if j.id not in removed or j.id == 3]
+    live = [_job(4, group=("TMP", "Temp", "")) if j.id == 4 else j for j in live]
+    assert len(store) == len(live)
+    assert store.index_of(1) is None
+    assert _ids(store, store.select()) == sorted(j.id for j in live)
+
+    small = store.compacted()
+    assert len(small.ids) == len(small) == len(store)
+    assert small.index_of(1) is None
+    for j in live:
+        assert small.row(small.index_of(j.id)).to_info() == j
+    # Los valores que solo usaban filas muertas se van del diccionario
+    assert len(small.groups) == len({(j.group_code, j.group_name, j.service_name) for j in live})
+    for kw in ({}, {"term": "load"}, {"term": "temp"}, {"group_codes": ["OPS"]}, {"severities": [-1]}):
+        assert _ids(small, small.select(**kw)) == _expected(live, **kw), kw
+    # El original no cambia: vistas ya entregadas siguen siendo válidas
+    assert store.row(store.index_of(2)).to_info() == _job(2)
+
+
+def test_needs_compaction_threshold(monkeypatch):
+    monkeypatch.setattr(job_store, "COMPACT_MIN_ROWS", 10)
+    store = JobStore.from_jobs(_job(i) for i in range(1, 101))
+    store.remove(range(1, 10))
+    assert not store.needs_compaction()  # menos que el mínimo
+    store.remove(range(10, 26))
+    assert not store.needs_compaction()  # 25 de 100: no pasa la proporción
+    store.remove([26])
+    assert store.needs_compaction()
+
+
+class _FakeJobsRepo:
+    """Lo que usa JobSearchIndex del repositorio: filas crudas y listeners."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def add_listener(self, callback):
+        pass
+
+    def iter_job_rows(self, search=None, batch_size=None):
+        for j in self.jobs:
+            yield (j.id, j.type, j.job_name, j.group_code, j.group_name, j.service_name,
+                   j.severity or None, j.created_at_utc)
+
+
+def _search_ids(index: JobSearchIndex, term=None) -> list:
+    return sorted(r.id for r in index.search(term))
+
+
+def test_index_apply_delta_and_compaction(monkeypatch):
+    monkeypatch.setattr(job_store, "COMPACT_MIN_ROWS", 20)
+    rng = random.Random(15)
+    jobs = {i: _job(i) for i in range(1, 121)}
+    index = JobSearchIndex(_FakeJobsRepo(list(jobs.values())))
+    assert index.load() == 120
+
+    next_id = 1000
+    for step in range(12):
+        changed = []
+        for job_id in rng.sample(sorted(jobs), 5):
+            jobs[job_id] = _job(job_id, job_name=f"EDIT_{step}_{job_id}")
+            changed.append(jobs[job_id])
+        for _ in range(3):
+            next_id += 1
+            jobs[next_id] = _job(next_id)
+            changed.append(jobs[next_id])
+        removed = rng.sample(sorted(jobs), 8)
+        for job_id in removed:
+            del jobs[job_id]
+        index.apply(changed, removed=removed)
+
+        assert len(index) == len(jobs)
+        # Nunca hay más muertas que las que permite el umbral
+        assert not index.store.needs_compaction()
+        for term in (None, "edit", f"edit_{step}_", "load", "payments", "job_00"):
+            expected = sorted(
+                j.id for j in jobs.values()
+                if not term or any(term.lower() in f.lower()
+                                   for f in (j.job_name, j.group_code, j.group_name, j.service_name))
+            )
+            assert _search_ids(index, term) == expected, (step, term)
+
+    assert len(index.store.ids) < 120 + 12 * 3  # compactó al menos una vez
+    rows = index.search()
+    assert [r.id for r in rows] == [r.id for r in sorted(rows, key=lambda r: (r.created_at_utc, r.id), reverse=True)]
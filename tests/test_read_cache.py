@@ -0,0 +1,101 @@
+import src.storage.read_cache as read_cache
+from src.storage.read_cache import TAG_GROUPS, TAG_JOBS, ReadCache
+
+
+class _Loader:
+    """loader() que cuenta sus llamadas (y puede hacer algo en medio de la lectura)."""
+
+    def __init__(self, value, during=None):
+        self.value = value
+        self.during = during
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.during is not None:
+            self.during()
+        return self.value
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(read_cache.time, "monotonic", lambda: now[0])
+    cache = ReadCache(max_entries=8, ttl=30)
+    load = _Loader(["a"])
+
+    assert cache.get_or_load("k", (TAG_JOBS,), load) == ["a"]
+    now[0] += 29
+    cache.get_or_load("k", (TAG_JOBS,), load)
+    assert (load.calls, cache.hits, cache.misses) == (1, 1, 1)
+
+    now[0] += 2  # vencida
+    cache.get_or_load("k", (TAG_JOBS,), load)
+    assert load.calls == 2
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ReadCache(max_entries=2, ttl=60)
+    loads = {k: _Loader(k) for k in "abc"}
+    cache.get_or_load("a", (), loads["a"])
+    cache.get_or_load("b", (), loads["b"])
+    cache.get_or_load("a", (), loads["a"])  # "a" pasa a ser la más reciente
+    cache.get_or_load("c", (), loads["c"])  # sale "b"
+
+    assert len(cache) == 2
+    cache.get_or_load("a", (), loads["a"])
+    cache.get_or_load("b", (), loads["b"])
+    assert (loads["a"].calls, loads["b"].calls) == (1, 2)
+
+
+def test_invalidate_by_tag():
+    cache = ReadCache()
+    jobs, groups = _Loader("jobs"), _Loader("groups")
+    cache.get_or_load("jobs", (TAG_JOBS, TAG_GROUPS), jobs)
+    cache.get_or_load("groups", (TAG_GROUPS,), groups)
+
+    cache.invalidate(TAG_JOBS)
+    cache.get_or_load("jobs", (TAG_JOBS, TAG_GROUPS), jobs)
+    cache.get_or_load("groups", (TAG_GROUPS,), groups)
+    assert (jobs.calls, groups.calls) == (2, 1)
+
+    cache.invalidate(TAG_GROUPS)  # invalida las dos (jobs también depende de Groups)
+    assert len(cache) == 0
+
+
+def test_load_started_before_invalidate_is_not_cached():
+    cache = ReadCache()
+    load = _Loader("viejo", during=lambda: cache.invalidate(TAG_JOBS))
+    assert cache.get_or_load("k", (TAG_JOBS,), load) == "viejo"  # se devuelve, pero no se guarda
+    assert len(cache) == 0
+
+    load.during = cache.clear  # clear() también corta las lecturas en vuelo
+    cache.get_or_load("k", (TAG_JOBS,), load)
+    assert len(cache) == 0
+
+    load.during = None
+    cache.get_or_load("k", (TAG_JOBS,), load)
+    cache.get_or_load("k", (TAG_JOBS,), load)
+    assert (load.calls, len(cache)) == (3, 1)
+
+
+def test_disabled_cache():
+    assert not ReadCache(max_entries=0).enabled
+    assert not ReadCache(ttl=0).enabled
+
+
+def test_database_cached_copies_and_defers_invalidation(db):
+    db.cache = ReadCache()  # prendida aunque el entorno tenga DB_CACHE_TTL=0
+    load = _Loader(["a", "b"])
+
+    rows = db.cached("SELECT 1;", (), (TAG_JOBS,), load)
+    rows.append("c")  # el que llama puede modificar su copia
+    assert db.cached("SELECT 1;", (), (TAG_JOBS,), load) == ["a", "b"]
+    assert load.calls == 1
+
+    with db.transaction():
+        # Adentro se lee sin cache (escrituras propias) y se invalida recién al confirmar
+        db.cached("SELECT 1;", (), (TAG_JOBS,), load)
+        assert load.calls == 2
+        db.invalidate(TAG_JOBS)
+        assert len(db.cache) == 1
+    assert len(db.cache) == 0
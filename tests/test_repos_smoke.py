@@ -1 +1,142 @@
-﻿# TODO: repository smoke tests
+﻿import csv
+
+import pytest
+
+from src.service.export_service import ExportService
+from src.service.import_service import ImportService
+from src.storage.export_repository import KIND_JOBS, ExportRepository
+from src.storage.import_repository import ImportRepository
+from src.storage.jobs_repository import (
+    OUTCOME_INSERTED, OUTCOME_INVALID, OUTCOME_NOT_FOUND, OUTCOME_UNCHANGED, OUTCOME_UPDATED,
+    STATUS_ALL, STATUS_RETIRED,
+)
+
+
+@pytest.fixture(autouse=True)
+def groups(repos):
+    repos.groups_repo.add_group("FIN01", "Finance", "Payments")
+    repos.groups_repo.add_group("OPS", "Operations", "Night Ops")
+
+
+def _statuses(outcomes) -> list:
+    return [o.status for o in outcomes]
+
+
+def test_add_update_get(repos):
+    _db, jobs_repo, _groups, _audit = repos
+    job_id = jobs_repo.add_job("cmd", "ETL_LOAD", "FIN01", "3")
+    job = jobs_repo.get_by_id(job_id)
+    assert (job.type, job.job_name, job.group_code, job.group_name, job.severity) == (
+        "cmd", "ETL_LOAD", "FIN01", "Finance", "3"
+    )
+
+    assert jobs_repo.update_job(job_id, "script", "ETL_LOAD_V2", "OPS", 5)
+    job = jobs_repo.get_by_id(job_id)
+    assert (job.type, job.job_name, job.group_code, job.service_name, job.severity) == (
+        "script", "ETL_LOAD_V2", "OPS", "Night Ops", "5"
+    )
+    assert jobs_repo.get_by_id(job_id + 100) is None
+
+
+def test_list_and_page_jobs(repos):
+    _db, jobs_repo, _groups, _audit = repos
+    outcomes = jobs_repo.add_jobs([("cmd", f"JOB_{i:02d}", "FIN01" if i % 2 else "OPS", i % 3 + 3) for i in range(7)])
+    ids = [o.id for o in outcomes]
+
+    assert sorted(j.id for j in jobs_repo.list_jobs()) == sorted(ids)
+    assert sorted(j.job_name for j in jobs_repo.list_jobs("job_0")) == [f"JOB_{i:02d}" for i in range(7)]
+    assert {j.group_code for j in jobs_repo.list_jobs("night ops")} == {"OPS"}
+    assert len(jobs_repo.list_jobs(limit=3)) == 3
+
+    seen, after, pages = [], None, 0
+    while True:
+        page = jobs_repo.page_jobs(after=after, page_size=3)
+        seen += [j.id for j in page.items]
+        pages += 1
+        if page.next_token is None:
+            break
+        after = page.next_token
+    # (CreatedAtUtc, Id) DESC sin repetir ni saltear filas
+    assert pages == 3
+    assert seen == [j.id for j in jobs_repo.list_jobs()]
+    assert sorted(seen) == sorted(ids)
+
+
+def test_batch_outcomes(repos):
+    _db, jobs_repo, _groups, _audit = repos
+    outcomes = jobs_repo.add_jobs([
+        ("cmd", "A", "FIN01", 3),
+        ("cmd", "", "FIN01", 3),       # JobName vacío
+        ("cmd", "B", "OPS", "x"),      # Severity no numérica
+        ("script", "C", "OPS", 4),
+    ])
+    assert _statuses(outcomes) == [OUTCOME_INSERTED, OUTCOME_INVALID, OUTCOME_INVALID, OUTCOME_INSERTED]
+    assert [o.index for o in outcomes] == [0, 1, 2, 3]
+    assert outcomes[1].error and outcomes[1].id == 0
+    a, c = outcomes[0].id, outcomes[3].id
+
+    outcomes = jobs_repo.update_jobs([
+        (a, "cmd", "A", "FIN01", 3),          # igual
+        (c, "script", "C2", "OPS", 4),
+        (c + 100, "cmd", "X", "OPS", 3),
+        (a, "cmd", "", "FIN01", 3),
+    ])
+    assert _statuses(outcomes) == [OUTCOME_UNCHANGED, OUTCOME_UPDATED, OUTCOME_NOT_FOUND, OUTCOME_INVALID]
+    assert jobs_repo.get_by_id(c).job_name == "C2"
+
+    outcomes = jobs_repo.bulk_update_jobs([a, c, a, c + 100], group_code="OPS", severity=5)
+    assert _statuses(outcomes) == [OUTCOME_UPDATED, OUTCOME_UPDATED, OUTCOME_INVALID, OUTCOME_NOT_FOUND]
+    assert {(j.group_code, j.severity) for j in jobs_repo.get_jobs_by_ids([a, c]).values()} == {("OPS", "5")}
+    outcomes = jobs_repo.bulk_update_jobs([a], group_code="OPS", severity=5)
+    assert _statuses(outcomes) == [OUTCOME_UNCHANGED]
+
+
+def test_retire_restore_purge(repos):
+    _db, jobs_repo, _groups, _audit = repos
+    ids = [o.id for o in jobs_repo.add_jobs([("cmd", f"J{i}", "FIN01", 3) for i in range(4)])]
+
+    assert _statuses(jobs_repo.retire_jobs(ids[:2])) == [OUTCOME_UPDATED, OUTCOME_UPDATED]
+    assert _statuses(jobs_repo.retire_jobs([ids[0]])) == [OUTCOME_UNCHANGED]
+    assert sorted(j.id for j in jobs_repo.list_jobs()) == ids[2:]
+    assert sorted(j.id for j in jobs_repo.list_jobs(status=STATUS_RETIRED)) == ids[:2]
+    assert len(jobs_repo.list_jobs(status=STATUS_ALL)) == 4
+
+    assert _statuses(jobs_repo.restore_jobs([ids[1]])) == [OUTCOME_UPDATED]
+    assert sorted(j.id for j in jobs_repo.list_jobs()) == ids[1:]
+
+    assert jobs_repo.purge_retired_jobs(batch_size=1) == 1
+    assert jobs_repo.get_by_id(ids[0]) is None
+    assert jobs_repo.purge_retired_jobs() == 0
+    assert sorted(j.id for j in jobs_repo.list_jobs(status=STATUS_ALL)) == ids[1:]
+
+
+def test_export_import_round_trip(repos, tmp_path):
+    db, jobs_repo, groups_repo, audit_repo = repos
+    jobs_repo.add_jobs([("cmd", f"EXP_{i}", "FIN01" if i % 2 else "OPS", i % 3 + 3) for i in range(12)])
+
+    path = tmp_path / "jobs.csv"
+    summary = ExportService(ExportRepository(db, jobs_repo)).run(KIND_JOBS, str(path))
+    assert summary.rows == 12
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        exported = list(csv.DictReader(f))
+    assert len(exported) == 12
+
+    # El mismo archivo de vuelta: nada cambia
+    importer = ImportService(ImportRepository(db, jobs_repo, groups_repo, audit_repo), groups_repo)
+    result = importer.run(str(path))
+    assert (result.inserted, result.unchanged, result.invalid) == (0, 12, 0)
+
+    # Editado a mano: una fila cambia y una nueva entra con su grupo
+    exported[0]["Severity"] = "5" if exported[0]["Severity"] != "5" else "3"
+    exported.append(dict(exported[1], Id="", JobName="EXP_NEW", GroupCode="HR", GroupName="People", ServiceName=""))
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(exported[0]))
+        writer.writeheader()
+        writer.writerows(exported)
+
+    result = importer.run(str(path))
+    assert (result.inserted, result.updated, result.unchanged, result.groups_inserted) == (1, 1, 11, 1)
+    names = {j.job_name: j for j in jobs_repo.list_jobs()}
+    assert len(names) == 13
+    assert names["EXP_NEW"].group_name == "People"
+    assert names[exported[0]["JobName"]].severity == exported[0]["Severity"]
@@ -0,0 +1,93 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.storage.jobs_repository import OUTCOME_NOT_FOUND, OUTCOME_UNCHANGED, OUTCOME_UPDATED, STATUS_ALL
+
+
+@pytest.fixture
+def jobs(repos):
+    repos.groups_repo.add_group("FIN01", "Finance", "Payments")
+    outcomes = repos.jobs_repo.add_jobs([("cmd", f"NIGHTLY_{i}", "FIN01", 3) for i in range(8)])
+    return [o.id for o in outcomes]
+
+
+def _retire_at(db, retired_at: dict) -> None:
+    """Fija RetiredAtUtc de jobs ya retirados (texto ISO, como en SQLite)."""
+    with db.transaction() as conn:
+        conn.cursor().executemany(
+            "UPDATE Jobs_information SET RetiredAtUtc = ? WHERE Id = ?;",
+            [(at, job_id) for job_id, at in retired_at.items()],
+        )
+
+
+def _token_ids(db) -> set:
+    with db.get_connection() as conn:
+        return {int(r[0]) for r in conn.cursor().execute("SELECT DISTINCT JobId FROM Jobs_search_tokens;")}
+
+
+def _audit(db, action: str) -> list:
+    with db.get_connection() as conn:
+        return conn.cursor().execute(
+            "SELECT entity_id, correlation_id, old_values_json, new_values_json FROM wt_audit_log "
+            "WHERE entity_name = 'jobs' AND action = ? ORDER BY audit_id;",
+            (action,),
+        ).fetchall()
+
+
+def test_retire_and_restore(repos, jobs):
+    db, jobs_repo = repos.db, repos.jobs_repo
+    outcomes = jobs_repo.retire_jobs([jobs[0], jobs[1], jobs[0], 999])
+    assert [o.status for o in outcomes][:2] == [OUTCOME_UPDATED, OUTCOME_UPDATED]
+    assert outcomes[3].status == OUTCOME_NOT_FOUND
+    assert not {jobs[0], jobs[1]} & _token_ids(db)
+    assert jobs_repo.list_jobs("nightly_0") == []
+
+    retired = _audit(db, "RETIRE")
+    assert [int(r[0]) for r in retired] == [jobs[0], jobs[1]]
+    assert len({r[1] for r in retired}) == 1  # un correlation_id por llamada
+
+    assert [o.status for o in jobs_repo.restore_jobs([jobs[0], jobs[2]])] == [OUTCOME_UPDATED, OUTCOME_UNCHANGED]
+    assert jobs[0] in _token_ids(db)
+    assert [j.id for j in jobs_repo.list_jobs("nightly_0")] == [jobs[0]]
+
+
+def test_purge_in_batches_keeps_recent_retired(repos, jobs):
+    db, jobs_repo = repos.db, repos.jobs_repo
+    retired = jobs[:7]
+    jobs_repo.retire_jobs(retired)
+    # Viejos y recientes intercalados: cada lote sigue desde el último Id borrado
+    old, recent = retired[0::2] + [retired[5]], [retired[1], retired[3]]
+    _retire_at(db, {**{j: "2026-01-01 08:00:00.000" for j in old}, **{j: "2026-03-01 08:00:00.000" for j in recent}})
+
+    seen = []
+    count = jobs_repo.purge_retired_jobs(
+        retired_before=datetime(2026, 2, 1), batch_size=2, progress=seen.append
+    )
+    assert count == len(old) == 5
+    assert seen == [2, 4, 5]
+
+    left = {j.id for j in jobs_repo.list_jobs(status=STATUS_ALL)}
+    assert left == set(recent) | {jobs[7]}
+    assert not set(old) & _token_ids(db)
+
+    purged = _audit(db, "DELETE")
+    assert sorted(int(r[0]) for r in purged) == sorted(old)
+    assert len({r[1] for r in purged}) == 1  # toda la purga comparte correlation_id
+    assert all(r[3] is None and '"retired_at_utc": "2026-01-01' in r[2] for r in purged)
+
+    # Sin cutoff se van también los recientes; el activo nunca
+    assert jobs_repo.purge_retired_jobs() == 2
+    assert {j.id for j in jobs_repo.list_jobs(status=STATUS_ALL)} == {jobs[7]}
+
+
+def test_purge_cancel_between_batches(repos, jobs):
+    jobs_repo = repos.jobs_repo
+    jobs_repo.retire_jobs(jobs)
+    cancel = threading.Event()
+
+    assert jobs_repo.purge_retired_jobs(batch_size=3, progress=lambda n: cancel.set(), cancel=cancel) == 3
+    # Lo borrado queda borrado; el resto sigue retirado para la próxima purga
+    assert len(jobs_repo.list_jobs(status=STATUS_ALL)) == 5
+    assert jobs_repo.purge_retired_jobs(batch_size=3) == 5
@@ -0,0 +1,30 @@
+import pytest
+
+from src.storage.job_search import SEARCH_FULLTEXT, SEARCH_FUZZY, SEARCH_LIKE, SEARCH_TOKENS
+
+
+@pytest.fixture
+def jobs_repo(repos):
+    return repos.jobs_repo
+
+
+def test_only_configured_modes_are_offered(jobs_repo, monkeypatch):
+    # SQLite: tokens siempre mantenidos, sin CONTAINS (aunque se fuerce el flag)
+    monkeypatch.setenv("JOBS_SEARCH_FULLTEXT", "1")
+    assert jobs_repo.available_search_modes() == [SEARCH_LIKE, SEARCH_TOKENS, SEARCH_FUZZY]
+
+
+def test_set_search_mode_rejects_unconfigured(jobs_repo):
+    jobs_repo.set_search_mode(SEARCH_TOKENS)
+    with pytest.raises(ValueError, match="no está configurado"):
+        jobs_repo.set_search_mode(SEARCH_FULLTEXT)
+    with pytest.raises(ValueError, match="inválido"):
+        jobs_repo.set_search_mode("regex")
+    assert jobs_repo.search_mode == SEARCH_TOKENS
+
+
+def test_tokens_off_is_not_offered(jobs_repo):
+    assert SEARCH_TOKENS in jobs_repo.available_search_modes()
+    jobs_repo.search_index.enabled = False
+    assert SEARCH_TOKENS in jobs_repo.available_search_modes()  # se revisa una vez
+    assert jobs_repo.available_search_modes(refresh=True) == [SEARCH_LIKE, SEARCH_FUZZY]